@@ -0,0 +1,67 @@
+import math
+from typing import Tuple
+
+import torch
+from torch import Tensor
+
+
+def make_batch(num_points: int, batch_size: int) -> Tensor:
+    r"""Returns a sorted batch vector that splits :obj:`num_points` points
+    into :obj:`batch_size` examples of (roughly) equal size."""
+    batch = torch.arange(num_points) * batch_size // max(num_points, 1)
+    return batch.to(torch.long)
+
+
+def uniform_points(num_points: int, dim: int, batch_size: int = 1,
+                   dtype: torch.dtype = torch.float) -> Tuple[Tensor, Tensor]:
+    r"""Samples points uniformly in the unit cube."""
+    pos = torch.rand(num_points, dim, dtype=dtype)
+    return pos, make_batch(num_points, batch_size)
+
+
+def clustered_points(num_points: int, dim: int, batch_size: int = 1,
+                     dtype: torch.dtype = torch.float, num_clusters: int = 32,
+                     std: float = 0.02) -> Tuple[Tensor, Tensor]:
+    r"""Samples points from isotropic Gaussian blobs, whose centers are
+    distributed uniformly in the unit cube."""
+    center = torch.rand(num_clusters, dim, dtype=dtype)
+    assignment = torch.randint(num_clusters, (num_points, ))
+    pos = center[assignment] + std * torch.randn(num_points, dim, dtype=dtype)
+    return pos, make_batch(num_points, batch_size)
+
+
+def points(distribution: str, num_points: int, dim: int, batch_size: int = 1,
+           dtype: torch.dtype = torch.float) -> Tuple[Tensor, Tensor]:
+    if distribution == 'uniform':
+        return uniform_points(num_points, dim, batch_size, dtype)
+    if distribution == 'clustered':
+        return clustered_points(num_points, dim, batch_size, dtype)
+    raise ValueError(f"Unknown distribution '{distribution}'")
+
+
+def radius_for(num_neighbors: int, num_points: int, dim: int) -> float:
+    r"""Returns the radius at which a point has :obj:`num_neighbors` expected
+    neighbors among :obj:`num_points` uniform points in the unit cube."""
+    ball = math.pi**(dim / 2) / math.gamma(dim / 2 + 1)
+    return (num_neighbors / (num_points * ball))**(1 / dim)
+
+
+def power_law_graph(num_nodes: int, avg_degree: int,
+                    exponent: float = 2.5) -> Tuple[Tensor, Tensor]:
+    r"""Samples an undirected graph with a power-law degree distribution from
+    the Chung-Lu model, and returns its edges sorted by source nodes."""
+    weight = torch.arange(1, num_nodes + 1, dtype=torch.double)
+    weight = weight.pow(-1 / (exponent - 1))
+    num_edges = num_nodes * avg_degree // 2
+
+    row = torch.multinomial(weight, num_edges, replacement=True)
+    col = torch.multinomial(weight, num_edges, replacement=True)
+    perm = torch.randperm(num_nodes)
+    row, col = perm[row], perm[col]
+
+    mask = row != col
+    row, col = row[mask], col[mask]
+    row, col = torch.cat([row, col]), torch.cat([col, row])
+
+    idx = (row * num_nodes + col).unique()
+    return idx // num_nodes, idx % num_nodes
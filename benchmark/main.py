@@ -0,0 +1,280 @@
+r"""Benchmarks the operators of :obj:`torch_cluster` on synthetic data.
+
+Run a sweep and write its results to a JSON file::
+
+    python benchmark/main.py run --preset quick --threads 1 4 \
+        --output results.json
+
+Compare two result files and flag regressions (exits with a non-zero status
+code if any case got slower by more than :obj:`--threshold`)::
+
+    python benchmark/main.py compare base.json results.json --threshold 0.1
+"""
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import torch
+from generators import points, power_law_graph, radius_for
+
+import torch_cluster
+from torch_cluster import (CSRGraph, fps, graclus_cluster, grid_cluster, knn,
+                           nearest, neighbor_sampler, radius, random_walk)
+
+SWEEPS: Dict[str, Dict[str, List[Any]]] = {
+    'quick': {
+        'num_points': [10_000],
+        'dim': [3],
+        'k': [16],
+        'batch_size': [1, 64],
+        'dtype': ['float32'],
+        'distribution': ['uniform'],
+        'num_workers': [1],
+        'num_nodes': [10_000],
+    },
+    'full': {
+        'num_points': [10_000, 100_000, 1_000_000],
+        'dim': [3, 16],
+        'k': [8, 32],
+        'batch_size': [1, 64],
+        'dtype': ['float32', 'float64'],
+        'distribution': ['uniform', 'clustered'],
+        'num_workers': [1, 4],
+        'num_nodes': [10_000, 100_000, 1_000_000],
+    },
+}
+
+Params = Dict[str, Any]
+
+
+def point_data(params: Params, device: torch.device):
+    dtype = getattr(torch, params['dtype'])
+    pos, batch = points(params['distribution'], params['num_points'],
+                        params.get('dim', 3), params['batch_size'], dtype)
+    if params['batch_size'] == 1:
+        return pos.to(device), None
+    return pos.to(device), batch.to(device)
+
+
+def graph_data(params: Params, device: torch.device) -> CSRGraph:
+    row, col = power_law_graph(params['num_nodes'], avg_degree=10)
+    graph = CSRGraph.from_edge_index(row, col, num_nodes=params['num_nodes'])
+    return CSRGraph(graph.rowptr.to(device), graph.col.to(device),
+                    validate=False)
+
+
+def setup_knn(params: Params, device: torch.device) -> Callable:
+    x, batch = point_data(params, device)
+    return lambda: knn(x, x, params['k'], batch, batch,
+                       num_workers=params['num_workers'],
+                       batch_size=params['batch_size'])
+
+
+def setup_radius(params: Params, device: torch.device) -> Callable:
+    x, batch = point_data(params, device)
+    r = radius_for(params['k'], params['num_points'] // params['batch_size'],
+                   params['dim'])
+    return lambda: radius(x, x, r, batch, batch,
+                          max_num_neighbors=2 * params['k'],
+                          num_workers=params['num_workers'],
+                          batch_size=params['batch_size'])
+
+
+def setup_nearest(params: Params, device: torch.device) -> Callable:
+    x, batch = point_data(params, device)
+    y = x[::10].contiguous()
+    batch_y = None if batch is None else batch[::10].contiguous()
+    return lambda: nearest(x, y, batch, batch_y)
+
+
+def setup_fps(params: Params, device: torch.device) -> Callable:
+    pos, batch = point_data(params, device)
+    return lambda: fps(pos, batch, ratio=0.25,
+                       batch_size=params['batch_size'])
+
+
+def setup_grid_cluster(params: Params, device: torch.device) -> Callable:
+    pos, batch = point_data(params, device)
+    size = torch.tensor([0.01, 0.01, 0.01], dtype=pos.dtype, device=device)
+    return lambda: grid_cluster(pos, size, batch=batch)
+
+
+def setup_graclus_cluster(params: Params, device: torch.device) -> Callable:
+    graph = graph_data(params, device)
+    return lambda: graclus_cluster(graph)
+
+
+def setup_random_walk(params: Params, device: torch.device) -> Callable:
+    graph = graph_data(params, device)
+    start = torch.arange(graph.num_nodes, device=device)
+    return lambda: random_walk(graph, None, start, walk_length=20)
+
+
+def setup_neighbor_sampler(params: Params, device: torch.device) -> Callable:
+    graph = graph_data(params, device)
+    start = torch.arange(graph.num_nodes, device=device)
+    return lambda: neighbor_sampler(start, graph, size=10)
+
+
+POINT_PARAMS = ['num_points', 'batch_size', 'dtype', 'distribution']
+
+# Maps each operator to the parameters it gets benchmarked over, its setup
+# function, and a predicate to skip infeasible parameter combinations.
+OPS: Dict[str, Tuple[List[str], Callable, Callable[[Params], bool]]] = {
+    'knn': (POINT_PARAMS + ['dim', 'k', 'num_workers'], setup_knn,
+            lambda p: p['num_workers'] > 1 and p['batch_size'] > 1),
+    'radius': (POINT_PARAMS + ['dim', 'k', 'num_workers'], setup_radius,
+               lambda p: p['num_workers'] > 1 and p['batch_size'] > 1),
+    'nearest': (POINT_PARAMS + ['dim'], setup_nearest, lambda p: False),
+    'fps': (POINT_PARAMS, setup_fps,
+            lambda p: p['num_points'] // p['batch_size'] > 100_000),
+    'grid_cluster': (POINT_PARAMS, setup_grid_cluster, lambda p: False),
+    'graclus_cluster': (['num_nodes'], setup_graclus_cluster,
+                        lambda p: False),
+    'random_walk': (['num_nodes'], setup_random_walk, lambda p: False),
+    'neighbor_sampler': (['num_nodes'], setup_neighbor_sampler,
+                         lambda p: False),
+}
+
+
+def cases(preset: str, ops: List[str]) -> Iterator[Tuple[str, Params]]:
+    sweep = SWEEPS[preset]
+    for op in ops:
+        names, _, skip = OPS[op]
+        for values in itertools.product(*[sweep[name] for name in names]):
+            params = dict(zip(names, values))
+            if not skip(params):
+                yield op, params
+
+
+def measure(fn: Callable, device: torch.device, warmup: int,
+            repeat: int) -> List[float]:
+    def sync():
+        if device.type == 'cuda':
+            torch.cuda.synchronize(device)
+
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        sync()
+        t = time.perf_counter()
+        fn()
+        sync()
+        times.append(time.perf_counter() - t)
+    return times
+
+
+def run(args: argparse.Namespace) -> int:
+    device = torch.device(args.device)
+    threads = args.threads or [torch.get_num_threads()]
+    results = []
+
+    for num_threads in threads:
+        torch.set_num_threads(num_threads)
+        for op, params in cases(args.preset, args.ops):
+            torch.manual_seed(args.seed)
+            result: Dict[str, Any] = dict(op=op, params=params,
+                                          threads=num_threads,
+                                          device=str(device))
+            try:
+                fn = OPS[op][1](params, device)
+                times = measure(fn, device, args.warmup, args.repeat)
+                result.update(median=statistics.median(times),
+                              min=min(times), mean=statistics.mean(times),
+                              times=times)
+                status = f'{1000 * result["median"]:10.3f}ms'
+            except (RuntimeError, AssertionError) as e:
+                result.update(error=str(e).split('\n')[0])
+                status = f'{"error":>12}'
+            results.append(result)
+            print(f'{status}  {op} threads={num_threads} {params}',
+                  flush=True)
+
+    meta = dict(
+        date=datetime.datetime.now().isoformat(),
+        torch=torch.__version__,
+        torch_cluster=torch_cluster.__version__,
+        python=platform.python_version(),
+        machine=platform.machine(),
+        processor=platform.processor(),
+        preset=args.preset,
+        warmup=args.warmup,
+        repeat=args.repeat,
+    )
+    with open(args.output, 'w') as f:
+        json.dump(dict(meta=meta, results=results), f, indent=2)
+    print(f'Wrote {len(results)} results to {args.output}')
+    return 0
+
+
+def key(result: Dict[str, Any]) -> Tuple[str, str, int, str]:
+    params = json.dumps(result['params'], sort_keys=True)
+    return result['op'], params, result['threads'], result['device']
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.base) as f:
+        base = {key(r): r for r in json.load(f)['results'] if 'median' in r}
+    with open(args.new) as f:
+        new = {key(r): r for r in json.load(f)['results'] if 'median' in r}
+
+    num_regressions = num_improvements = 0
+    for k in sorted(set(base) & set(new)):
+        ratio = new[k]['median'] / base[k]['median']
+        if ratio > 1 + args.threshold:
+            status = 'REGRESSION'
+            num_regressions += 1
+        elif ratio < 1 / (1 + args.threshold):
+            status = 'improvement'
+            num_improvements += 1
+        else:
+            status = ''
+        if status or args.verbose:
+            op, params, threads, device = k
+            print(f'{ratio:6.2f}x {status:>11}  {op} threads={threads} '
+                  f'device={device} {params}')
+
+    num_missing = len(set(base) - set(new))
+    print(f'Compared {len(set(base) & set(new))} cases: {num_regressions} '
+          f'regressions, {num_improvements} improvements, {num_missing} '
+          f'missing in {args.new}')
+    return 1 if num_regressions > 0 else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run benchmarks')
+    run_parser.add_argument('--preset', choices=list(SWEEPS), default='quick')
+    run_parser.add_argument('--ops', nargs='+', choices=list(OPS),
+                            default=list(OPS))
+    run_parser.add_argument('--threads', nargs='+', type=int, default=None)
+    run_parser.add_argument('--device', default='cpu')
+    run_parser.add_argument('--warmup', type=int, default=1)
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--seed', type=int, default=12345)
+    run_parser.add_argument('--output', default='results.json')
+
+    compare_parser = subparsers.add_parser(
+        'compare', help='Compare two result files')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+    compare_parser.add_argument('--verbose', action='store_true')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        return run(args)
+    return compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -13,12 +13,55 @@ CLUSTER_INLINE_VARIABLE int64_t _cuda_version = cuda_version();
 CLUSTER_API torch::Tensor fps(torch::Tensor src, torch::Tensor ptr, double ratio,
                   bool random_start);
 
+CLUSTER_API std::tuple<std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+                       std::vector<torch::Tensor>>
+fps_group(torch::Tensor src, torch::Tensor ptr, std::vector<double> ratio,
+          std::vector<double> r, std::vector<int64_t> k, bool random_start);
+
 CLUSTER_API torch::Tensor graclus(torch::Tensor rowptr, torch::Tensor col,
                       torch::optional<torch::Tensor> optional_weight);
 
+CLUSTER_API torch::Tensor
+graclus_parallel(torch::Tensor rowptr, torch::Tensor col,
+                 torch::optional<torch::Tensor> optional_weight);
+
+CLUSTER_API std::tuple<std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+                       std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+                       std::vector<torch::Tensor>>
+graclus_coarsen(torch::Tensor rowptr, torch::Tensor col,
+                torch::optional<torch::Tensor> optional_weight,
+                int64_t num_levels, bool parallel);
+
 CLUSTER_API torch::Tensor grid(torch::Tensor pos, torch::Tensor size,
                    torch::optional<torch::Tensor> optional_start,
-                   torch::optional<torch::Tensor> optional_end);
+                   torch::optional<torch::Tensor> optional_end,
+                   torch::optional<torch::Tensor> optional_batch = torch::nullopt,
+                   torch::optional<int64_t> optional_batch_size = torch::nullopt);
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor, torch::Tensor,
+                       torch::Tensor, torch::Tensor>
+grid_pool(torch::Tensor pos, torch::Tensor size,
+          torch::optional<torch::Tensor> optional_start,
+          torch::optional<torch::Tensor> optional_batch,
+          torch::optional<torch::Tensor> optional_x, std::string reduce);
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+sparse_grid(torch::Tensor pos, torch::Tensor size,
+            torch::optional<torch::Tensor> optional_start);
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor, torch::Tensor,
+                       torch::Tensor>
+kd_tree(torch::Tensor pos, int64_t leaf_size);
+
+CLUSTER_API torch::Tensor kd_tree_knn(torch::Tensor pos, torch::Tensor perm,
+                                      torch::Tensor node, torch::Tensor split,
+                                      torch::Tensor bbox, torch::Tensor y,
+                                      int64_t k);
+
+CLUSTER_API torch::Tensor
+kd_tree_radius(torch::Tensor pos, torch::Tensor perm, torch::Tensor node,
+               torch::Tensor split, torch::Tensor bbox, torch::Tensor y,
+               double r, int64_t max_num_neighbors);
 
 CLUSTER_API torch::Tensor knn(torch::Tensor x, torch::Tensor y, torch::Tensor ptr_x,
                   torch::Tensor ptr_y, int64_t k, bool cosine);
@@ -33,5 +76,50 @@ CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
 random_walk(torch::Tensor rowptr, torch::Tensor col, torch::Tensor start,
             int64_t walk_length, double p, double q);
 
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+alias_table(torch::Tensor rowptr, torch::Tensor weight);
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+weighted_random_walk(torch::Tensor rowptr, torch::Tensor col,
+                     torch::Tensor prob, torch::Tensor alias,
+                     torch::Tensor start, int64_t walk_length, double p,
+                     double q);
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+skipgram(torch::Tensor rowptr, torch::Tensor col,
+         torch::optional<torch::Tensor> optional_prob,
+         torch::optional<torch::Tensor> optional_alias, torch::Tensor start,
+         int64_t walk_length, double p, double q, int64_t window_size,
+         int64_t num_negatives,
+         torch::optional<torch::Tensor> optional_neg_prob,
+         torch::optional<torch::Tensor> optional_neg_alias);
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+ppr(torch::Tensor rowptr, torch::Tensor col,
+    torch::optional<torch::Tensor> optional_prob,
+    torch::optional<torch::Tensor> optional_alias, torch::Tensor start,
+    double alpha, int64_t num_walks, int64_t topk);
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor, torch::Tensor>
+saint_subgraph(torch::Tensor rowptr, torch::Tensor col,
+               torch::optional<torch::Tensor> optional_prob,
+               torch::optional<torch::Tensor> optional_alias,
+               torch::Tensor start, int64_t walk_length);
+
 CLUSTER_API torch::Tensor neighbor_sampler(torch::Tensor start, torch::Tensor rowptr,
                                int64_t count, double factor);
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+neighbor_sampler_prob(torch::Tensor start, torch::Tensor rowptr, int64_t count,
+                      double factor);
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+weighted_neighbor_sampler(torch::Tensor start, torch::Tensor rowptr,
+                          torch::Tensor weight, int64_t count, double factor);
+
+CLUSTER_API std::tuple<std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+                       std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+                       std::vector<torch::Tensor>>
+multi_hop_sampler(torch::Tensor rowptr, torch::Tensor col,
+                  torch::optional<torch::Tensor> optional_weight,
+                  torch::Tensor seed, std::vector<int64_t> sizes);
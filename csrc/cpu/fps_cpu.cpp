@@ -1,8 +1,24 @@
 #include "fps_cpu.h"
 
+#include <ATen/AccumulateType.h>
 #include <ATen/Parallel.h>
 
+#include <memory>
+
+#include "stats.h"
 #include "utils.h"
+#include "utils/PointCloudAdaptor.h"
+#include "utils/nanoflann.hpp"
+
+static stats::Counter num_calls("fps.num_calls");
+static stats::Counter num_examples("fps.num_examples");
+static stats::Counter num_samples("fps.num_samples");
+static stats::Counter examples_ns("fps.examples_ns");
+static stats::Counter group_num_calls("fps_group.num_calls");
+static stats::Counter group_num_samples("fps_group.num_samples");
+static stats::Counter group_sample_ns("fps_group.sample_ns");
+static stats::Counter group_build_ns("fps_group.build_index_ns");
+static stats::Counter group_query_ns("fps_group.query_ns");
 
 inline torch::Tensor get_dist(torch::Tensor x, int64_t idx) {
   return (x - x[idx]).pow_(2).sum(1);
@@ -17,6 +33,7 @@ torch::Tensor fps_cpu(torch::Tensor src, torch::Tensor ptr, torch::Tensor ratio,
   CHECK_INPUT(ptr.dim() == 1);
 
   src = src.view({src.size(0), -1}).contiguous();
+  check_ptr(ptr, src.size(0));
   ptr = ptr.contiguous();
   auto batch_size = ptr.numel() - 1;
 
@@ -30,8 +47,13 @@ torch::Tensor fps_cpu(torch::Tensor src, torch::Tensor ptr, torch::Tensor ratio,
   auto out_ptr_data = out_ptr.data_ptr<int64_t>();
   auto out_data = out.data_ptr<int64_t>();
 
+  num_calls.add(1);
+  num_examples.add(batch_size);
+  num_samples.add(out.numel());
+
   int64_t grain_size = 1; // Always parallelize over batch dimension.
   at::parallel_for(0, batch_size, grain_size, [&](int64_t begin, int64_t end) {
+    stats::Phase examples("torch_cluster::fps::examples", examples_ns);
     int64_t src_start, src_end, out_start, out_end;
     for (int64_t b = begin; b < end; b++) {
       src_start = ptr_data[b], src_end = ptr_data[b + 1];
@@ -56,3 +78,157 @@ torch::Tensor fps_cpu(torch::Tensor src, torch::Tensor ptr, torch::Tensor ratio,
 
   return out;
 }
+
+std::tuple<std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+           std::vector<torch::Tensor>>
+fps_group_cpu(torch::Tensor src, torch::Tensor ptr, std::vector<double> ratio,
+              std::vector<double> r, std::vector<int64_t> k,
+              bool random_start) {
+
+  CHECK_CPU(src);
+  CHECK_CPU(ptr);
+  CHECK_INPUT(ratio.size() > 0 && ratio.size() == k.size());
+  CHECK_INPUT(r.size() == 0 || r.size() == k.size());
+  for (size_t l = 0; l < k.size(); l++) {
+    AT_ASSERTM(ratio[l] > 0 && ratio[l] <= 1, "Invalid sampling ratio");
+    AT_ASSERTM(k[l] > 0, "Invalid number of neighbors");
+  }
+
+  auto pos = src.view({src.size(0), -1}).contiguous();
+  check_ptr(ptr, pos.size(0));
+  ptr = ptr.contiguous();
+  auto batch_size = ptr.numel() - 1;
+  auto D = pos.size(1);
+
+  group_num_calls.add(1);
+  std::vector<torch::Tensor> out_index, out_neighbor, out_ptr;
+  for (size_t l = 0; l < k.size(); l++) {
+    auto K = k[l];
+    auto radius = r.size() > 0 ? r[l] : 0.0;
+
+    auto ptr_data = ptr.data_ptr<int64_t>();
+    auto level_ptr = torch::empty({batch_size + 1}, ptr.options());
+    auto level_ptr_data = level_ptr.data_ptr<int64_t>();
+    level_ptr_data[0] = 0;
+    for (int64_t b = 0; b < batch_size; b++) {
+      auto deg = ptr_data[b + 1] - ptr_data[b];
+      level_ptr_data[b + 1] =
+          level_ptr_data[b] + (int64_t)std::ceil((float)deg * (float)ratio[l]);
+    }
+
+    auto S = level_ptr_data[batch_size];
+    auto index = torch::empty({S}, ptr.options());
+    auto neighbor = torch::full({S, K}, -1, ptr.options());
+    auto index_data = index.data_ptr<int64_t>();
+    auto neighbor_data = neighbor.data_ptr<int64_t>();
+    auto seed = draw_seed();
+    group_num_samples.add(S);
+
+    AT_DISPATCH_ALL_TYPES_AND2(
+        at::ScalarType::Half, at::ScalarType::BFloat16, pos.scalar_type(),
+        "fps_group_cpu", [&] {
+          using acc_t = at::acc_type<scalar_t, false>;
+          typedef PointCloud<scalar_t> cloud_t;
+          typedef nanoflann::KDTreeSingleIndexAdaptor<
+              nanoflann::L2_Simple_Adaptor<scalar_t, cloud_t, acc_t>, cloud_t>
+              kd_tree_t;
+
+          auto pos_data = pos.data_ptr<scalar_t>();
+
+          // Sample centroids and build a KD-tree for each example, which is
+          // shared by all of its centroids during grouping.
+          std::vector<cloud_t> clouds(batch_size);
+          std::vector<std::unique_ptr<kd_tree_t>> trees(batch_size);
+          at::parallel_for(0, batch_size, 1, [&](int64_t begin, int64_t end) {
+            for (int64_t b = begin; b < end; b++) {
+              auto start = ptr_data[b], n = ptr_data[b + 1] - start;
+              if (n == 0)
+                continue;
+
+              stats::Phase sample("torch_cluster::fps_group::sample",
+                                  group_sample_ns);
+              auto data = pos_data + start * D;
+              std::vector<acc_t> dist(n, std::numeric_limits<acc_t>::max());
+              int64_t cur = 0;
+              if (random_start)
+                cur = RandomEngine(seed, b).randint(n);
+
+              for (auto i = level_ptr_data[b]; i < level_ptr_data[b + 1];
+                   i++) {
+                index_data[i] = start + cur;
+                int64_t next = 0;
+                acc_t max_dist = -1;
+                for (int64_t j = 0; j < n; j++) {
+                  acc_t d = 0;
+                  for (int64_t c = 0; c < D; c++) {
+                    acc_t diff =
+                        (acc_t)data[j * D + c] - (acc_t)data[cur * D + c];
+                    d += diff * diff;
+                  }
+                  if (d < dist[j])
+                    dist[j] = d;
+                  if (dist[j] > max_dist) {
+                    max_dist = dist[j];
+                    next = j;
+                  }
+                }
+                cur = next;
+              }
+              sample.end();
+
+              stats::Phase build("torch_cluster::fps_group::build_index",
+                                 group_build_ns);
+              clouds[b] = {data, (size_t)n, (size_t)D};
+              trees[b].reset(new kd_tree_t(
+                  D, clouds[b], nanoflann::KDTreeSingleIndexAdaptorParams(10)));
+              trees[b]->buildIndex();
+            }
+          });
+
+          // Group the neighbors of all centroids.
+          at::parallel_for(0, S, 1, [&](int64_t begin, int64_t end) {
+            stats::Phase query("torch_cluster::fps_group::query",
+                               group_query_ns);
+            int64_t b = std::upper_bound(level_ptr_data,
+                                         level_ptr_data + batch_size, begin) -
+                        level_ptr_data - 1;
+
+            std::vector<std::pair<size_t, acc_t>> matches;
+            std::vector<size_t> indices(K);
+            std::vector<acc_t> dists(K);
+            for (int64_t i = begin; i < end; i++) {
+              while (i >= level_ptr_data[b + 1])
+                b++;
+
+              auto start = ptr_data[b];
+              auto query = pos_data + index_data[i] * D;
+              auto out = neighbor_data + i * K;
+
+              if (radius > 0) {
+                trees[b]->radiusSearch(query, (acc_t)(radius * radius),
+                                       matches, nanoflann::SearchParams());
+                auto count = std::min((int64_t)matches.size(), K);
+                for (int64_t j = 0; j < count; j++)
+                  out[j] = start + (int64_t)matches[j].first;
+              } else {
+                nanoflann::KNNResultSet<acc_t> result(K);
+                result.init(indices.data(), dists.data());
+                trees[b]->findNeighbors(result, query,
+                                        nanoflann::SearchParams());
+                for (size_t j = 0; j < result.size(); j++)
+                  out[j] = start + (int64_t)indices[j];
+              }
+            }
+          });
+        });
+
+    out_index.push_back(index);
+    out_neighbor.push_back(neighbor);
+    out_ptr.push_back(level_ptr);
+
+    pos = pos.index_select(0, index);
+    ptr = level_ptr;
+  }
+
+  return std::make_tuple(out_index, out_neighbor, out_ptr);
+}
@@ -4,3 +4,9 @@
 
 torch::Tensor fps_cpu(torch::Tensor src, torch::Tensor ptr, torch::Tensor ratio,
                       bool random_start);
+
+std::tuple<std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+           std::vector<torch::Tensor>>
+fps_group_cpu(torch::Tensor src, torch::Tensor ptr, std::vector<double> ratio,
+              std::vector<double> r, std::vector<int64_t> k,
+              bool random_start);
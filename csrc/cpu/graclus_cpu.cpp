@@ -1,7 +1,81 @@
 #include "graclus_cpu.h"
 
+#include <ATen/Parallel.h>
+
+#include "stats.h"
 #include "utils.h"
 
+static stats::Counter num_calls("graclus.num_calls");
+static stats::Counter num_rounds("graclus.num_handshake_rounds");
+static stats::Counter num_greedy("graclus.num_greedy_fallbacks");
+static stats::Counter matching_ns("graclus.matching_ns");
+static stats::Counter coarsen_ns("graclus.coarsen_ns");
+
+// Greedily matches all unmatched nodes in the order of `node_perm` with one
+// of their unmatched neighbors (that maximizes its edge weight). In the
+// unweighted case, neighbors are scanned starting from a random offset, so
+// that input edges do not need to be shuffled.
+template <typename scalar_t>
+void greedy_matching(const int64_t *rowptr, const int64_t *col,
+                     const scalar_t *weight, const int64_t *node_perm,
+                     int64_t *out, int64_t num_nodes) {
+  if (weight == nullptr) {
+    uint64_t seed = draw_seed();
+
+    for (int64_t n = 0; n < num_nodes; n++) {
+      auto u = node_perm[n];
+
+      if (out[u] >= 0)
+        continue;
+
+      out[u] = u;
+
+      int64_t row_start = rowptr[u], row_end = rowptr[u + 1];
+      if (row_end - row_start == 0)
+        continue;
+
+      RandomEngine rng(seed, u);
+      int64_t offset = rng.randint(row_end - row_start);
+
+      for (auto e = 0; e < row_end - row_start; e++) {
+        auto v = col[row_start + (offset + e) % (row_end - row_start)];
+
+        if (out[v] >= 0)
+          continue;
+
+        out[u] = std::min(u, v);
+        out[v] = std::min(u, v);
+        break;
+      }
+    }
+  } else {
+    for (auto n = 0; n < num_nodes; n++) {
+      auto u = node_perm[n];
+
+      if (out[u] >= 0)
+        continue;
+
+      auto v_max = u;
+      scalar_t w_max = (scalar_t)0.;
+
+      for (auto e = rowptr[u]; e < rowptr[u + 1]; e++) {
+        auto v = col[e];
+
+        if (v == u || out[v] >= 0)
+          continue;
+
+        if (weight[e] >= w_max) {
+          v_max = v;
+          w_max = weight[e];
+        }
+      }
+
+      out[u] = std::min(u, v_max);
+      out[v_max] = std::min(u, v_max);
+    }
+  }
+}
+
 torch::Tensor graclus_cpu(torch::Tensor rowptr, torch::Tensor col,
                           torch::optional<torch::Tensor> optional_weight) {
   CHECK_CPU(rowptr);
@@ -13,6 +87,8 @@ torch::Tensor graclus_cpu(torch::Tensor rowptr, torch::Tensor col,
     CHECK_INPUT(optional_weight.value().numel() == col.numel());
   }
 
+  rowptr = rowptr.contiguous(), col = col.contiguous();
+
   int64_t num_nodes = rowptr.numel() - 1;
   auto out = torch::full(num_nodes, -1, rowptr.options());
   auto node_perm = torch::randperm(num_nodes, rowptr.options());
@@ -22,60 +98,312 @@ torch::Tensor graclus_cpu(torch::Tensor rowptr, torch::Tensor col,
   auto node_perm_data = node_perm.data_ptr<int64_t>();
   auto out_data = out.data_ptr<int64_t>();
 
+  num_calls.add(1);
+  stats::Phase matching("torch_cluster::graclus::matching", matching_ns);
   if (!optional_weight.has_value()) {
-    for (int64_t n = 0; n < num_nodes; n++) {
-      auto u = node_perm_data[n];
+    greedy_matching<float>(rowptr_data, col_data, nullptr, node_perm_data,
+                           out_data, num_nodes);
+  } else {
+    auto weight = optional_weight.value().contiguous();
+    auto scalar_type = weight.scalar_type();
+    AT_DISPATCH_ALL_TYPES_AND2(at::ScalarType::Half, at::ScalarType::BFloat16, scalar_type, "graclus_cpu", [&] {
+      greedy_matching<scalar_t>(rowptr_data, col_data,
+                                weight.data_ptr<scalar_t>(), node_perm_data,
+                                out_data, num_nodes);
+    });
+  }
 
-      if (out_data[u] >= 0)
-        continue;
+  return out;
+}
 
-      out_data[u] = u;
+// A symmetric random priority of edge `(u, v)` to break ties between edges
+// of equal weight.
+inline uint64_t edge_priority(const uint64_t seed, const int64_t u,
+                              const int64_t v) {
+  RandomEngine rng(seed ^ (uint64_t)std::min(u, v),
+                   (uint64_t)std::max(u, v));
+  return rng.next();
+}
 
-      int64_t row_start = rowptr_data[u], row_end = rowptr_data[u + 1];
+// Computes a locally dominant matching via handshaking: In every round, each
+// unmatched node proposes to its unmatched neighbor of maximum weight (with
+// ties broken by random edge priorities), and mutual proposals get matched.
+// Nodes without unmatched neighbors form singleton clusters. Since edges are
+// totally ordered, the heaviest remaining edge is matched in every round of
+// an undirected graph. In case a round makes no progress (which can only
+// happen for directed graphs), the remaining nodes are matched greedily.
+template <typename scalar_t>
+void handshake_matching(const int64_t *rowptr, const int64_t *col,
+                        const scalar_t *weight, int64_t *out,
+                        int64_t num_nodes) {
+  uint64_t seed = draw_seed();
+  std::vector<int64_t> proposal(num_nodes);
 
-      for (auto e = 0; e < row_end - row_start; e++) {
-        auto v = col_data[row_start + e];
+  auto avg_deg = std::max<int64_t>(1, rowptr[num_nodes] / (num_nodes + 1));
+  auto grain_size = std::max<int64_t>(1, at::internal::GRAIN_SIZE / avg_deg);
 
-        if (out_data[v] >= 0)
+  int64_t num_unmatched = num_nodes;
+  while (num_unmatched > 0) {
+    num_rounds.add(1);
+    at::parallel_for(0, num_nodes, grain_size, [&](int64_t begin, int64_t end) {
+      for (int64_t u = begin; u < end; u++) {
+        if (out[u] >= 0)
           continue;
 
-        out_data[u] = std::min(u, v);
-        out_data[v] = std::min(u, v);
-        break;
+        int64_t v_max = -1;
+        scalar_t w_max = (scalar_t)0.;
+        uint64_t p_max = 0;
+        for (int64_t e = rowptr[u]; e < rowptr[u + 1]; e++) {
+          auto v = col[e];
+          if (v == u || out[v] >= 0)
+            continue;
+
+          scalar_t w = weight != nullptr ? weight[e] : (scalar_t)0.;
+          uint64_t p = edge_priority(seed, u, v);
+          if (v_max < 0 || w > w_max || (w == w_max && p > p_max)) {
+            v_max = v, w_max = w, p_max = p;
+          }
+        }
+        proposal[u] = v_max;
       }
-    }
+    });
+
+    std::atomic<int64_t> num_changed(0);
+    at::parallel_for(0, num_nodes, grain_size, [&](int64_t begin, int64_t end) {
+      int64_t changed = 0;
+      for (int64_t u = begin; u < end; u++) {
+        if (out[u] >= 0)
+          continue;
+
+        auto v = proposal[u];
+        if (v < 0) {
+          out[u] = u, changed++;
+        } else if (proposal[v] == u) {
+          out[u] = std::min(u, v), changed++;
+        }
+      }
+      num_changed += changed;
+    });
+    if (num_changed == 0)
+      break;
+    num_unmatched -= num_changed;
+  }
+
+  // Match the remaining nodes greedily:
+  if (num_unmatched > 0) {
+    num_greedy.add(1);
+    std::vector<int64_t> node_perm(num_nodes);
+    for (int64_t u = 0; u < num_nodes; u++)
+      node_perm[u] = u;
+    greedy_matching<scalar_t>(rowptr, col, weight, node_perm.data(), out,
+                              num_nodes);
+  }
+}
+
+torch::Tensor
+graclus_parallel_cpu(torch::Tensor rowptr, torch::Tensor col,
+                     torch::optional<torch::Tensor> optional_weight) {
+  CHECK_CPU(rowptr);
+  CHECK_CPU(col);
+  CHECK_INPUT(rowptr.dim() == 1 && col.dim() == 1);
+  if (optional_weight.has_value()) {
+    CHECK_CPU(optional_weight.value());
+    CHECK_INPUT(optional_weight.value().dim() == 1);
+    CHECK_INPUT(optional_weight.value().numel() == col.numel());
+  }
+
+  rowptr = rowptr.contiguous(), col = col.contiguous();
+
+  int64_t num_nodes = rowptr.numel() - 1;
+  auto out = torch::full(num_nodes, -1, rowptr.options());
+
+  auto rowptr_data = rowptr.data_ptr<int64_t>();
+  auto col_data = col.data_ptr<int64_t>();
+  auto out_data = out.data_ptr<int64_t>();
+
+  num_calls.add(1);
+  stats::Phase matching("torch_cluster::graclus::matching", matching_ns);
+  if (!optional_weight.has_value()) {
+    handshake_matching<float>(rowptr_data, col_data, nullptr, out_data,
+                              num_nodes);
   } else {
-    auto weight = optional_weight.value();
+    auto weight = optional_weight.value().contiguous();
     auto scalar_type = weight.scalar_type();
-    AT_DISPATCH_ALL_TYPES_AND2(at::ScalarType::Half, at::ScalarType::BFloat16, scalar_type, "graclus_cpu", [&] {
-      auto weight_data = weight.data_ptr<scalar_t>();
+    AT_DISPATCH_ALL_TYPES_AND2(
+        at::ScalarType::Half, at::ScalarType::BFloat16, scalar_type,
+        "graclus_parallel_cpu", [&] {
+          handshake_matching<scalar_t>(rowptr_data, col_data,
+                                       weight.data_ptr<scalar_t>(), out_data,
+                                       num_nodes);
+        });
+  }
 
-      for (auto n = 0; n < num_nodes; n++) {
-        auto u = node_perm_data[n];
+  return out;
+}
 
-        if (out_data[u] >= 0)
-          continue;
+// Relabels a graclus clustering (in which each cluster is identified by its
+// minimum node index) to consecutive cluster indices, and computes a node
+// permutation that sorts nodes by cluster, with `ptr` denoting the cluster
+// boundaries in the permutation.
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor>
+relabel_clusters(torch::Tensor cluster) {
+  auto num_nodes = cluster.numel();
+  auto arange = torch::arange(num_nodes, cluster.options());
+  auto is_root = cluster == arange;
+  auto new_id = is_root.cumsum(0) - 1;
+  int64_t num_clusters = num_nodes > 0 ? new_id[-1].item<int64_t>() + 1 : 0;
+  cluster = new_id.index_select(0, cluster);
 
-        auto v_max = u;
-        scalar_t w_max = (scalar_t)0.;
+  auto size = torch::zeros({num_clusters + 1}, cluster.options());
+  size.index_add_(0, cluster + 1, torch::ones_like(cluster));
+  auto ptr = size.cumsum(0);
 
-        for (auto e = rowptr_data[u]; e < rowptr_data[u + 1]; e++) {
-          auto v = col_data[e];
+  auto perm = torch::empty({num_nodes}, cluster.options());
+  auto cluster_data = cluster.data_ptr<int64_t>();
+  auto is_root_data = is_root.data_ptr<bool>();
+  auto ptr_data = ptr.data_ptr<int64_t>();
+  auto perm_data = perm.data_ptr<int64_t>();
+  at::parallel_for(0, num_nodes, at::internal::GRAIN_SIZE, [&](int64_t begin,
+                                                               int64_t end) {
+    for (int64_t u = begin; u < end; u++) {
+      auto c = cluster_data[u];
+      perm_data[ptr_data[c] + (is_root_data[u] ? 0 : 1)] = u;
+    }
+  });
 
-          if (out_data[v] >= 0)
-            continue;
+  return std::make_tuple(cluster, perm, ptr);
+}
+
+// Builds the coarsened graph in CSR format, in which edges between nodes of
+// the same cluster are dropped and weights of parallel edges are summed up.
+// Every coarsened row is aggregated independently (by sorting its at most two
+// merged adjacency lists), so that no global sorting of edges is required.
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor>
+coarsen_graph(torch::Tensor rowptr, torch::Tensor col, torch::Tensor weight,
+              torch::Tensor cluster, torch::Tensor perm, torch::Tensor ptr) {
+  int64_t num_clusters = ptr.numel() - 1;
+  auto rowptr_data = rowptr.data_ptr<int64_t>();
+  auto col_data = col.data_ptr<int64_t>();
+  auto weight_data = weight.data_ptr<double>();
+  auto cluster_data = cluster.data_ptr<int64_t>();
+  auto perm_data = perm.data_ptr<int64_t>();
+  auto ptr_data = ptr.data_ptr<int64_t>();
+
+  auto out_rowptr = torch::zeros({num_clusters + 1}, rowptr.options());
+  auto out_rowptr_data = out_rowptr.data_ptr<int64_t>();
+  torch::Tensor out_col, out_weight;
+  int64_t *out_col_data = nullptr;
+  double *out_weight_data = nullptr;
 
-          if (weight_data[e] >= w_max) {
-            v_max = v;
-            w_max = weight_data[e];
+  auto avg_deg = std::max<int64_t>(1, col.numel() / (rowptr.numel() + 1));
+  auto grain_size = std::max<int64_t>(1, at::internal::GRAIN_SIZE / avg_deg);
+
+  // Pass 0 counts the number of coarsened edges, pass 1 fills them in.
+  for (int pass = 0; pass < 2; pass++) {
+    at::parallel_for(0, num_clusters, grain_size, [&](int64_t begin,
+                                                      int64_t end) {
+      std::vector<std::pair<int64_t, double>> row;
+
+      for (int64_t c = begin; c < end; c++) {
+        row.clear();
+        for (int64_t i = ptr_data[c]; i < ptr_data[c + 1]; i++) {
+          auto u = perm_data[i];
+          for (int64_t e = rowptr_data[u]; e < rowptr_data[u + 1]; e++) {
+            auto d = cluster_data[col_data[e]];
+            if (d != c)
+              row.push_back({d, weight_data[e]});
+          }
+        }
+        std::sort(row.begin(), row.end());
+
+        int64_t offset = out_rowptr_data[c], count = 0;
+        for (size_t i = 0; i < row.size(); i++) {
+          if (i > 0 && row[i].first == row[i - 1].first) {
+            if (pass == 1)
+              out_weight_data[offset - 1] += row[i].second;
+            continue;
           }
+          if (pass == 1) {
+            out_col_data[offset] = row[i].first;
+            out_weight_data[offset] = row[i].second;
+          }
+          offset++, count++;
         }
 
-        out_data[u] = std::min(u, v_max);
-        out_data[v_max] = std::min(u, v_max);
+        if (pass == 0)
+          out_rowptr_data[c + 1] = count;
       }
     });
+
+    if (pass == 0) {
+      out_rowptr = out_rowptr.cumsum(0);
+      out_rowptr_data = out_rowptr.data_ptr<int64_t>();
+      auto num_edges = out_rowptr_data[num_clusters];
+      out_col = torch::empty({num_edges}, col.options());
+      out_weight = torch::empty({num_edges}, weight.options());
+      out_col_data = out_col.data_ptr<int64_t>();
+      out_weight_data = out_weight.data_ptr<double>();
+    }
   }
 
-  return out;
+  return std::make_tuple(out_rowptr, out_col, out_weight);
+}
+
+std::tuple<std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+           std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+           std::vector<torch::Tensor>>
+graclus_coarsen_cpu(torch::Tensor rowptr, torch::Tensor col,
+                    torch::optional<torch::Tensor> optional_weight,
+                    int64_t num_levels, bool parallel) {
+  CHECK_CPU(rowptr);
+  CHECK_CPU(col);
+  CHECK_INPUT(rowptr.dim() == 1 && col.dim() == 1);
+  CHECK_INPUT(num_levels >= 0);
+
+  rowptr = rowptr.contiguous(), col = col.contiguous();
+
+  auto dtype = torch::kFloat;
+  torch::Tensor weight;
+  if (optional_weight.has_value()) {
+    CHECK_CPU(optional_weight.value());
+    CHECK_INPUT(optional_weight.value().dim() == 1);
+    CHECK_INPUT(optional_weight.value().numel() == col.numel());
+    dtype = optional_weight.value().scalar_type();
+    weight = optional_weight.value().toType(torch::kDouble).contiguous();
+  } else {
+    weight = torch::ones({col.numel()}, col.options().dtype(torch::kDouble));
+  }
+
+  std::vector<torch::Tensor> out_cluster, out_perm, out_rowptr, out_col,
+      out_weight;
+
+  for (int64_t l = 0; l < num_levels; l++) {
+    // Edge multiplicities serve as weights of coarsened unweighted graphs.
+    torch::optional<torch::Tensor> level_weight = torch::nullopt;
+    if (l > 0 || optional_weight.has_value())
+      level_weight = weight.toType(dtype);
+
+    auto cluster = parallel ? graclus_parallel_cpu(rowptr, col, level_weight)
+                            : graclus_cpu(rowptr, col, level_weight);
+
+    stats::Phase coarsen("torch_cluster::graclus::coarsen", coarsen_ns);
+    auto relabeled = relabel_clusters(cluster);
+    cluster = std::get<0>(relabeled);
+    auto perm = std::get<1>(relabeled);
+
+    auto coarsened = coarsen_graph(rowptr, col, weight, cluster, perm,
+                                   std::get<2>(relabeled));
+    rowptr = std::get<0>(coarsened);
+    col = std::get<1>(coarsened);
+    weight = std::get<2>(coarsened);
+
+    out_cluster.push_back(cluster);
+    out_perm.push_back(perm);
+    out_rowptr.push_back(rowptr);
+    out_col.push_back(col);
+    out_weight.push_back(weight.toType(dtype));
+  }
+
+  return std::make_tuple(out_cluster, out_perm, out_rowptr, out_col,
+                         out_weight);
 }
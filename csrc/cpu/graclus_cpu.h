@@ -4,3 +4,14 @@
 
 torch::Tensor graclus_cpu(torch::Tensor rowptr, torch::Tensor col,
                           torch::optional<torch::Tensor> optional_weight);
+
+torch::Tensor
+graclus_parallel_cpu(torch::Tensor rowptr, torch::Tensor col,
+                     torch::optional<torch::Tensor> optional_weight);
+
+std::tuple<std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+           std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+           std::vector<torch::Tensor>>
+graclus_coarsen_cpu(torch::Tensor rowptr, torch::Tensor col,
+                    torch::optional<torch::Tensor> optional_weight,
+                    int64_t num_levels, bool parallel);
@@ -1,10 +1,84 @@
 #include "grid_cpu.h"
 
+#include <ATen/AccumulateType.h>
+#include <ATen/Parallel.h>
+
+#include <atomic>
+
+#include "stats.h"
 #include "utils.h"
 
+static stats::Counter num_calls("grid.num_calls");
+static stats::Counter num_points("grid.num_points");
+static stats::Counter num_voxels("grid.num_voxels");
+static stats::Counter voxelize_ns("grid.voxelize_ns");
+static stats::Counter hash_ns("grid.hash_ns");
+static stats::Counter sort_ns("grid.sort_ns");
+static stats::Counter reduce_ns("grid.reduce_ns");
+
+// Reduces `pos` over all points of the same example via `amin` or `amax`.
+static torch::Tensor batch_reduce(torch::Tensor pos, torch::Tensor batch,
+                                  int64_t batch_size, std::string reduce) {
+  auto index = batch.view({-1, 1}).expand_as(pos);
+  return torch::zeros({batch_size, pos.size(1)}, pos.options())
+      .scatter_reduce_(0, index, pos, reduce, /*include_self=*/false);
+}
+
+// Computes voxel indices of a batch of point clouds, in which each example
+// gets its own grid origin (and extent) and voxel indices of consecutive
+// examples are offset by the number of voxels of all previous examples.
+torch::Tensor grid_batch_cpu(torch::Tensor pos, torch::Tensor size,
+                             torch::Tensor start, torch::Tensor end,
+                             torch::Tensor batch) {
+  auto N = pos.size(0), D = pos.size(1);
+
+  auto num_voxels = (end - start).true_divide(size.view({1, -1}));
+  num_voxels = num_voxels.toType(torch::kLong) + 1;
+  auto stride = num_voxels.cumprod(1).narrow(1, 0, D - 1);
+  stride = torch::cat({torch::ones_like(num_voxels.narrow(1, 0, 1)), stride},
+                      1);
+  auto offset = num_voxels.prod(1).cumsum(0) - num_voxels.prod(1);
+
+  pos = pos.contiguous(), batch = batch.contiguous();
+  start = start.toType(pos.scalar_type()).contiguous();
+  size = size.toType(pos.scalar_type()).contiguous();
+
+  auto out = torch::empty({N}, batch.options());
+  auto batch_data = batch.data_ptr<int64_t>();
+  auto stride_data = stride.data_ptr<int64_t>();
+  auto offset_data = offset.data_ptr<int64_t>();
+  auto out_data = out.data_ptr<int64_t>();
+
+  stats::Phase voxelize("torch_cluster::grid::voxelize", voxelize_ns);
+  AT_DISPATCH_ALL_TYPES_AND2(
+      at::ScalarType::Half, at::ScalarType::BFloat16, pos.scalar_type(),
+      "grid_batch_cpu", [&] {
+        auto pos_data = pos.data_ptr<scalar_t>();
+        auto start_data = start.data_ptr<scalar_t>();
+        auto size_data = size.data_ptr<scalar_t>();
+
+        at::parallel_for(0, N, at::internal::GRAIN_SIZE / D, [&](int64_t begin,
+                                                                 int64_t end) {
+          for (int64_t i = begin; i < end; i++) {
+            auto b = batch_data[i];
+            auto c = offset_data[b];
+            for (int64_t d = 0; d < D; d++) {
+              scalar_t p = pos_data[i * D + d] - start_data[b * D + d];
+              c += (int64_t)(p / size_data[d]) * stride_data[b * D + d];
+            }
+            out_data[i] = c;
+          }
+        });
+      });
+
+  return out;
+}
+
 torch::Tensor grid_cpu(torch::Tensor pos, torch::Tensor size,
                        torch::optional<torch::Tensor> optional_start,
-                       torch::optional<torch::Tensor> optional_end) {
+                       torch::optional<torch::Tensor> optional_end,
+                       torch::optional<torch::Tensor> optional_batch,
+                       torch::optional<int64_t> optional_batch_size) {
 
   CHECK_CPU(pos);
   CHECK_CPU(size);
@@ -16,6 +90,28 @@ torch::Tensor grid_cpu(torch::Tensor pos, torch::Tensor size,
 
   pos = pos.view({pos.size(0), -1});
   CHECK_INPUT(size.numel() == pos.size(1));
+  num_calls.add(1);
+  num_points.add(pos.size(0));
+
+  if (optional_batch.has_value()) {
+    auto batch = optional_batch.value();
+    CHECK_CPU(batch);
+    CHECK_INPUT(batch.numel() == pos.size(0));
+    if (pos.size(0) == 0)
+      return torch::empty({0}, batch.options());
+
+    auto batch_size = optional_batch_size.has_value()
+                          ? optional_batch_size.value()
+                          : batch.max().item<int64_t>() + 1;
+    auto shape = std::vector<int64_t>{batch_size, pos.size(1)};
+    auto start = optional_start.has_value()
+                     ? optional_start.value().view({1, -1}).expand(shape)
+                     : batch_reduce(pos, batch, batch_size, "amin");
+    auto end = optional_end.has_value()
+                   ? optional_end.value().view({1, -1}).expand(shape)
+                   : batch_reduce(pos, batch, batch_size, "amax");
+    return grid_batch_cpu(pos, size, start, end, batch);
+  }
 
   if (!optional_start.has_value())
     optional_start = std::get<0>(pos.min(0));
@@ -44,3 +140,265 @@ torch::Tensor grid_cpu(torch::Tensor pos, torch::Tensor size,
 
   return out;
 }
+
+inline uint64_t hash_key(const int64_t *key, int64_t K) {
+  uint64_t z = 0;
+  for (int64_t k = 0; k < K; k++) {
+    z = (z ^ (uint64_t)key[k]) * 0x9E3779B97F4A7C15ULL;
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+    z = z ^ (z >> 31);
+  }
+  return z;
+}
+
+// Assigns consecutive cluster indices to all rows of `key` (of shape
+// `[N, K]`) that hold the same values, in order of their first occurrence.
+// Rows are inserted concurrently into an open-addressing hash table, whose
+// slots keep the smallest row index of each key, so that the result does not
+// depend on the number of threads. Returns the cluster of each row and the
+// index of the first row of each cluster.
+static std::tuple<torch::Tensor, torch::Tensor>
+consecutive_cluster(torch::Tensor key) {
+  stats::Phase hash("torch_cluster::grid::hash", hash_ns);
+  key = key.contiguous();
+  auto N = key.size(0), K = key.size(1);
+  auto key_data = key.data_ptr<int64_t>();
+
+  int64_t num_slots = 1;
+  while (num_slots < 2 * N)
+    num_slots <<= 1;
+  auto mask = num_slots - 1;
+
+  std::vector<std::atomic<int64_t>> table(num_slots);
+  at::parallel_for(0, num_slots, at::internal::GRAIN_SIZE, [&](int64_t begin,
+                                                               int64_t end) {
+    for (int64_t s = begin; s < end; s++)
+      table[s].store(-1, std::memory_order_relaxed);
+  });
+
+  auto equal = [&](int64_t i, int64_t j) {
+    for (int64_t k = 0; k < K; k++) {
+      if (key_data[i * K + k] != key_data[j * K + k])
+        return false;
+    }
+    return true;
+  };
+
+  auto slot = torch::empty({N}, key.options());
+  auto slot_data = slot.data_ptr<int64_t>();
+  at::parallel_for(0, N, at::internal::GRAIN_SIZE, [&](int64_t begin,
+                                                       int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      auto s = (int64_t)(hash_key(key_data + i * K, K) & mask);
+      while (true) {
+        int64_t cur = -1;
+        if (table[s].compare_exchange_strong(cur, i))
+          break;
+        if (equal(cur, i)) {
+          while (i < cur && !table[s].compare_exchange_weak(cur, i)) {
+          }
+          break;
+        }
+        s = (s + 1) & mask;
+      }
+      slot_data[i] = s;
+    }
+  });
+
+  auto is_first = torch::empty({N}, key.options());
+  auto is_first_data = is_first.data_ptr<int64_t>();
+  at::parallel_for(0, N, at::internal::GRAIN_SIZE, [&](int64_t begin,
+                                                       int64_t end) {
+    for (int64_t i = begin; i < end; i++)
+      is_first_data[i] = table[slot_data[i]].load() == i;
+  });
+
+  auto id = is_first.cumsum(0);
+  auto id_data = id.data_ptr<int64_t>();
+  int64_t num_clusters = N > 0 ? id_data[N - 1] : 0;
+
+  auto cluster = torch::empty({N}, key.options());
+  auto first = torch::empty({num_clusters}, key.options());
+  auto cluster_data = cluster.data_ptr<int64_t>();
+  auto first_data = first.data_ptr<int64_t>();
+  at::parallel_for(0, N, at::internal::GRAIN_SIZE, [&](int64_t begin,
+                                                       int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      cluster_data[i] = id_data[table[slot_data[i]].load()] - 1;
+      if (is_first_data[i])
+        first_data[cluster_data[i]] = i;
+    }
+  });
+
+  return std::make_tuple(cluster, first);
+}
+
+// Reduces all rows of `src` (of shape `[N, F]`) that belong to the same
+// cluster via `mean` or `max`, given the cluster boundaries `ptr` of the
+// permutation `perm` that sorts rows by cluster.
+torch::Tensor segment_reduce(torch::Tensor src, torch::Tensor ptr,
+                             torch::Tensor perm, bool max) {
+  src = src.contiguous();
+  auto C = ptr.numel() - 1, F = src.size(1);
+  auto out = torch::empty({C, F}, src.options());
+
+  auto ptr_data = ptr.data_ptr<int64_t>();
+  auto perm_data = perm.data_ptr<int64_t>();
+  auto grain_size = std::max<int64_t>(1, at::internal::GRAIN_SIZE / (F + 1));
+
+  AT_DISPATCH_FLOATING_TYPES_AND2(
+      at::ScalarType::Half, at::ScalarType::BFloat16, src.scalar_type(),
+      "segment_reduce", [&] {
+        using acc_t = at::acc_type<scalar_t, false>;
+        auto src_data = src.data_ptr<scalar_t>();
+        auto out_data = out.data_ptr<scalar_t>();
+
+        at::parallel_for(0, C, grain_size, [&](int64_t begin, int64_t end) {
+          std::vector<acc_t> acc(F);
+          for (int64_t c = begin; c < end; c++) {
+            auto row_start = ptr_data[c], row_end = ptr_data[c + 1];
+            for (int64_t f = 0; f < F; f++)
+              acc[f] = (acc_t)src_data[perm_data[row_start] * F + f];
+
+            for (auto e = row_start + 1; e < row_end; e++) {
+              auto row = src_data + perm_data[e] * F;
+              for (int64_t f = 0; f < F; f++) {
+                if (max)
+                  acc[f] = std::max(acc[f], (acc_t)row[f]);
+                else
+                  acc[f] += (acc_t)row[f];
+              }
+            }
+
+            for (int64_t f = 0; f < F; f++) {
+              out_data[c * F + f] =
+                  (scalar_t)(max ? acc[f] : acc[f] / (row_end - row_start));
+            }
+          }
+        });
+      });
+
+  return out;
+}
+
+// Returns the integer voxel coordinates of each point relative to `start`,
+// which defaults to the minimum position of each example in `batch`.
+static torch::Tensor
+voxel_coords(torch::Tensor pos, torch::Tensor size,
+             torch::optional<torch::Tensor> optional_start,
+             torch::optional<torch::Tensor> optional_batch) {
+  CHECK_CPU(size);
+  CHECK_INPUT(size.numel() == pos.size(1));
+  if (pos.size(0) == 0)
+    return torch::empty({0, pos.size(1)}, pos.options().dtype(torch::kLong));
+
+  torch::Tensor start;
+  if (optional_start.has_value()) {
+    start = optional_start.value();
+    CHECK_CPU(start);
+    CHECK_INPUT(start.numel() == pos.size(1));
+    start = start.view({1, -1});
+  } else if (optional_batch.has_value()) {
+    auto batch = optional_batch.value();
+    auto batch_size = batch.max().item<int64_t>() + 1;
+    start = batch_reduce(pos, batch, batch_size, "amin").index_select(0, batch);
+  } else {
+    start = std::get<0>(pos.min(0)).view({1, -1});
+  }
+
+  auto coords = (pos - start).div(size.view({1, -1}), "floor");
+  return coords.toType(torch::kLong);
+}
+
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor, torch::Tensor,
+           torch::Tensor>
+grid_pool_cpu(torch::Tensor pos, torch::Tensor size,
+              torch::optional<torch::Tensor> optional_start,
+              torch::optional<torch::Tensor> optional_batch,
+              torch::optional<torch::Tensor> optional_x, std::string reduce) {
+  CHECK_CPU(pos);
+  AT_ASSERTM(reduce == "mean" || reduce == "max",
+             "'reduce' needs to be 'mean' or 'max'");
+  pos = pos.dim() == 1 ? pos.view({-1, 1}) : pos.flatten(1);
+  if (optional_batch.has_value()) {
+    CHECK_CPU(optional_batch.value());
+    CHECK_INPUT(optional_batch.value().numel() == pos.size(0));
+  }
+  if (optional_x.has_value()) {
+    CHECK_CPU(optional_x.value());
+    CHECK_INPUT(optional_x.value().size(0) == pos.size(0));
+  }
+
+  auto N = pos.size(0);
+  num_calls.add(1);
+  num_points.add(N);
+  auto key = voxel_coords(pos, size, optional_start, optional_batch);
+  if (optional_batch.has_value())
+    key = torch::cat({key, optional_batch.value().view({-1, 1})}, 1);
+
+  auto cluster_first = consecutive_cluster(key);
+  auto cluster = std::get<0>(cluster_first);
+  auto first = std::get<1>(cluster_first);
+  auto C = first.numel();
+  num_voxels.add(C);
+
+  // Sort points by cluster via counting sort (stable).
+  stats::Phase sort("torch_cluster::grid::sort", sort_ns);
+  auto count = torch::zeros({C}, cluster.options());
+  auto cluster_data = cluster.data_ptr<int64_t>();
+  auto count_data = count.data_ptr<int64_t>();
+  for (int64_t i = 0; i < N; i++)
+    count_data[cluster_data[i]]++;
+
+  auto ptr = torch::cat(
+      {torch::zeros({1}, count.options()), count.cumsum(0)});
+  auto cursor = ptr.narrow(0, 0, C).clone();
+  auto cursor_data = cursor.data_ptr<int64_t>();
+  auto perm = torch::empty({N}, cluster.options());
+  auto perm_data = perm.data_ptr<int64_t>();
+  for (int64_t i = 0; i < N; i++)
+    perm_data[cursor_data[cluster_data[i]]++] = i;
+  sort.end();
+
+  stats::Phase reduce_phase("torch_cluster::grid::reduce", reduce_ns);
+  auto out_pos = segment_reduce(pos, ptr, perm, reduce == "max");
+
+  torch::Tensor out_x;
+  if (optional_x.has_value()) {
+    auto x = optional_x.value();
+    auto src = x.dim() == 1 ? x.view({-1, 1}) : x.flatten(1);
+    out_x = segment_reduce(src, ptr, perm, reduce == "max");
+    auto sizes = x.sizes().vec();
+    sizes[0] = C;
+    out_x = out_x.view(sizes);
+  } else {
+    out_x = torch::empty({0}, pos.options());
+  }
+  reduce_phase.end();
+
+  torch::Tensor out_batch;
+  if (optional_batch.has_value())
+    out_batch = optional_batch.value().index_select(0, first);
+  else
+    out_batch = torch::empty({0}, cluster.options());
+
+  return std::make_tuple(cluster, count, out_pos, out_x, out_batch);
+}
+
+std::tuple<torch::Tensor, torch::Tensor>
+sparse_grid_cpu(torch::Tensor pos, torch::Tensor size,
+                torch::optional<torch::Tensor> optional_start) {
+  CHECK_CPU(pos);
+  pos = pos.dim() == 1 ? pos.view({-1, 1}) : pos.flatten(1);
+  num_calls.add(1);
+  num_points.add(pos.size(0));
+
+  auto coords = voxel_coords(pos, size, optional_start, torch::nullopt);
+  auto cluster_first = consecutive_cluster(coords);
+  auto cluster = std::get<0>(cluster_first);
+  auto first = std::get<1>(cluster_first);
+  num_voxels.add(first.numel());
+
+  return std::make_tuple(cluster, coords.index_select(0, first));
+}
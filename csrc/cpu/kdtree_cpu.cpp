@@ -0,0 +1,313 @@
+#include "kdtree_cpu.h"
+
+#include <ATen/AccumulateType.h>
+
+#include "stats.h"
+#include "utils.h"
+#include "utils/PointCloudAdaptor.h"
+#include "utils/nanoflann.hpp"
+
+static stats::Counter num_builds("kdtree.num_builds");
+static stats::Counter num_queries("kdtree.num_queries");
+static stats::Counter num_neighbors("kdtree.num_neighbors");
+static stats::Counter build_ns("kdtree.build_index_ns");
+static stats::Counter flatten_ns("kdtree.flatten_ns");
+static stats::Counter query_ns("kdtree.query_ns");
+static stats::Counter output_ns("kdtree.output_ns");
+
+// A KD-tree is stored in flat tensors, so that it can be saved and
+// memory-mapped without any pointer fix-ups:
+// * `perm` of shape `[N]` holds the permuted point indices (`vind`),
+// * `node` of shape `[M, 3]` holds `(divfeat, child1, child2)` for inner
+//   nodes and `(-1, left, right)` for leaves (with the root at index 0),
+// * `split` of shape `[M, 2]` holds `(divlow, divhigh)` of inner nodes, and
+// * `bbox` of shape `[D, 2]` holds the bounding box of all points.
+// The search mirrors the exact search of nanoflann.
+template <typename scalar_t, typename acc_t> struct FlatKDTree {
+  const scalar_t *pos;
+  const int64_t *perm, *node;
+  const acc_t *split, *bbox;
+  int64_t dim;
+
+  template <class RESULTSET>
+  void search(RESULTSET &result, const scalar_t *query,
+              std::vector<acc_t> &dists) const {
+    acc_t distsq = 0;
+    for (int64_t d = 0; d < dim; d++) {
+      acc_t value = query[d], diff = 0;
+      if (value < bbox[2 * d])
+        diff = value - bbox[2 * d];
+      if (value > bbox[2 * d + 1])
+        diff = value - bbox[2 * d + 1];
+      dists[d] = diff * diff;
+      distsq += dists[d];
+    }
+    search_level(result, query, 0, distsq, dists);
+  }
+
+  template <class RESULTSET>
+  bool search_level(RESULTSET &result, const scalar_t *query, int64_t n,
+                    acc_t mindistsq, std::vector<acc_t> &dists) const {
+    auto feat = node[3 * n], child1 = node[3 * n + 1], child2 = node[3 * n + 2];
+
+    if (feat < 0) { // Leaf node.
+      auto worst_dist = result.worstDist();
+      for (auto i = child1; i < child2; i++) {
+        auto index = perm[i];
+        acc_t dist = 0;
+        for (int64_t d = 0; d < dim; d++) {
+          acc_t diff = (acc_t)query[d] - (acc_t)pos[index * dim + d];
+          dist += diff * diff;
+        }
+        if (dist < worst_dist && !result.addPoint(dist, (size_t)index))
+          return false;
+      }
+      return true;
+    }
+
+    acc_t value = query[feat];
+    acc_t diff1 = value - split[2 * n], diff2 = value - split[2 * n + 1];
+
+    int64_t best_child, other_child;
+    acc_t cut_dist;
+    if (diff1 + diff2 < 0) {
+      best_child = child1, other_child = child2;
+      cut_dist = diff2 * diff2;
+    } else {
+      best_child = child2, other_child = child1;
+      cut_dist = diff1 * diff1;
+    }
+
+    if (!search_level(result, query, best_child, mindistsq, dists))
+      return false;
+
+    auto dst = dists[feat];
+    mindistsq = mindistsq + cut_dist - dst;
+    dists[feat] = cut_dist;
+    if (mindistsq <= result.worstDist() &&
+        !search_level(result, query, other_child, mindistsq, dists))
+      return false;
+    dists[feat] = dst;
+    return true;
+  }
+};
+
+// Collects points within a radius until `max_num_neighbors` are found.
+template <typename acc_t> struct BoundedRadiusResultSet {
+  acc_t radius;
+  size_t max_num_neighbors;
+  std::vector<size_t> &out;
+
+  inline acc_t worstDist() const { return radius; }
+
+  inline bool addPoint(acc_t dist, size_t index) {
+    if (dist < radius)
+      out.push_back(index);
+    return out.size() < max_num_neighbors;
+  }
+};
+
+template <typename node_t, typename acc_t>
+int64_t flatten(const node_t *n, std::vector<int64_t> &node,
+                std::vector<acc_t> &split) {
+  auto idx = (int64_t)node.size() / 3;
+  node.insert(node.end(), {-1, 0, 0});
+  split.insert(split.end(), {0, 0});
+
+  if (n->child1 == NULL && n->child2 == NULL) {
+    node[3 * idx + 1] = n->node_type.lr.left;
+    node[3 * idx + 2] = n->node_type.lr.right;
+    return idx;
+  }
+
+  node[3 * idx] = n->node_type.sub.divfeat;
+  split[2 * idx] = n->node_type.sub.divlow;
+  split[2 * idx + 1] = n->node_type.sub.divhigh;
+  auto child1 = flatten(n->child1, node, split);
+  auto child2 = flatten(n->child2, node, split);
+  node[3 * idx + 1] = child1, node[3 * idx + 2] = child2;
+  return idx;
+}
+
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor, torch::Tensor>
+kd_tree_cpu(torch::Tensor pos, int64_t leaf_size) {
+  CHECK_CPU(pos);
+  CHECK_INPUT(pos.dim() == 2 && leaf_size > 0);
+  pos = pos.contiguous();
+
+  auto N = pos.size(0), D = pos.size(1);
+  auto acc_type = at::toAccumulateType(pos.scalar_type(), false);
+  auto perm = torch::empty({N}, pos.options().dtype(torch::kLong));
+  auto bbox = torch::zeros({D, 2}, pos.options().dtype(acc_type));
+  torch::Tensor node, split;
+  num_builds.add(1);
+
+  AT_DISPATCH_ALL_TYPES_AND2(
+      at::ScalarType::Half, at::ScalarType::BFloat16, pos.scalar_type(),
+      "kd_tree_cpu", [&] {
+        using acc_t = at::acc_type<scalar_t, false>;
+        typedef PointCloud<scalar_t> cloud_t;
+        typedef nanoflann::KDTreeSingleIndexAdaptor<
+            nanoflann::L2_Simple_Adaptor<scalar_t, cloud_t, acc_t>, cloud_t>
+            kd_tree_t;
+
+        cloud_t cloud{pos.data_ptr<scalar_t>(), (size_t)N, (size_t)D};
+        stats::Phase build("torch_cluster::kd_tree::build_index", build_ns);
+        kd_tree_t tree(D, cloud,
+                       nanoflann::KDTreeSingleIndexAdaptorParams(leaf_size));
+        tree.buildIndex();
+        build.end();
+
+        stats::Phase flatten_phase("torch_cluster::kd_tree::flatten",
+                                   flatten_ns);
+
+        std::vector<int64_t> node_vec;
+        std::vector<acc_t> split_vec;
+        if (N > 0) {
+          flatten(tree.root_node, node_vec, split_vec);
+          for (int64_t d = 0; d < D; d++) {
+            bbox[d][0] = (acc_t)tree.root_bbox[d].low;
+            bbox[d][1] = (acc_t)tree.root_bbox[d].high;
+          }
+        }
+
+        auto perm_data = perm.data_ptr<int64_t>();
+        for (int64_t i = 0; i < N; i++)
+          perm_data[i] = tree.vind[i];
+
+        auto M = (int64_t)node_vec.size() / 3;
+        node = torch::from_blob(node_vec.data(), {M, 3}, perm.options());
+        split = torch::from_blob(split_vec.data(), {M, 2}, bbox.options());
+        node = node.clone(), split = split.clone();
+      });
+
+  return std::make_tuple(perm, node, split, bbox);
+}
+
+void check_kd_tree(torch::Tensor pos, torch::Tensor perm, torch::Tensor node,
+                   torch::Tensor split, torch::Tensor bbox, torch::Tensor y) {
+  CHECK_CPU(pos);
+  CHECK_CPU(perm);
+  CHECK_CPU(node);
+  CHECK_CPU(split);
+  CHECK_CPU(bbox);
+  CHECK_CPU(y);
+  CHECK_CONTIGUOUS(pos);
+  CHECK_CONTIGUOUS(perm);
+  CHECK_CONTIGUOUS(node);
+  CHECK_CONTIGUOUS(split);
+  CHECK_CONTIGUOUS(bbox);
+  CHECK_INPUT(pos.dim() == 2 && y.dim() == 2 && y.size(1) == pos.size(1));
+  AT_ASSERTM(y.scalar_type() == pos.scalar_type(),
+             "'y' needs to be of the same type as the indexed points");
+  CHECK_INPUT(perm.dim() == 1 && perm.numel() == pos.size(0));
+  CHECK_INPUT(perm.scalar_type() == torch::kLong);
+  CHECK_INPUT(node.dim() == 2 && node.size(1) == 3);
+  CHECK_INPUT(node.scalar_type() == torch::kLong);
+  CHECK_INPUT(pos.size(0) == 0 || node.size(0) > 0);
+  CHECK_INPUT(split.dim() == 2 && split.size(0) == node.size(0));
+  CHECK_INPUT(split.size(1) == 2);
+  CHECK_INPUT(bbox.dim() == 2 && bbox.size(0) == pos.size(1));
+  CHECK_INPUT(bbox.size(1) == 2);
+  auto acc_type = at::toAccumulateType(pos.scalar_type(), false);
+  CHECK_INPUT(split.scalar_type() == acc_type);
+  CHECK_INPUT(bbox.scalar_type() == acc_type);
+}
+
+torch::Tensor kd_tree_knn_cpu(torch::Tensor pos, torch::Tensor perm,
+                              torch::Tensor node, torch::Tensor split,
+                              torch::Tensor bbox, torch::Tensor y, int64_t k) {
+  check_kd_tree(pos, perm, node, split, bbox, y);
+  CHECK_INPUT(k > 0);
+  y = y.contiguous();
+
+  num_queries.add(y.size(0));
+  std::vector<size_t> out_vec;
+  stats::Phase query("torch_cluster::kd_tree::query", query_ns);
+  if (pos.size(0) > 0) {
+    AT_DISPATCH_ALL_TYPES_AND2(
+        at::ScalarType::Half, at::ScalarType::BFloat16, pos.scalar_type(),
+        "kd_tree_knn_cpu", [&] {
+          using acc_t = at::acc_type<scalar_t, false>;
+          FlatKDTree<scalar_t, acc_t> tree{
+              pos.data_ptr<scalar_t>(), perm.data_ptr<int64_t>(),
+              node.data_ptr<int64_t>(), split.data_ptr<acc_t>(),
+              bbox.data_ptr<acc_t>(),   pos.size(1)};
+
+          auto y_data = y.data_ptr<scalar_t>();
+          auto D = y.size(1);
+          int64_t ptr_y[2] = {0, y.size(0)};
+          parallel_queries(
+              ptr_y, 1, y.size(0), out_vec,
+              [&](int64_t i, int64_t, std::vector<size_t> &vec) {
+                std::vector<size_t> index(k);
+                std::vector<acc_t> dist(k), dists(D);
+                nanoflann::KNNResultSet<acc_t> result(k);
+                result.init(index.data(), dist.data());
+                tree.search(result, y_data + i * D, dists);
+                for (size_t j = 0; j < result.size(); j++) {
+                  vec.push_back(index[j]);
+                  vec.push_back(i);
+                }
+              });
+        });
+  }
+
+  query.end();
+
+  stats::Phase output("torch_cluster::kd_tree::output", output_ns);
+  const int64_t size = out_vec.size() / 2;
+  num_neighbors.add(size);
+  auto out = torch::from_blob(out_vec.data(), {size, 2},
+                              perm.options().dtype(torch::kLong));
+  return out.t().index_select(0, torch::tensor({1, 0}));
+}
+
+torch::Tensor kd_tree_radius_cpu(torch::Tensor pos, torch::Tensor perm,
+                                 torch::Tensor node, torch::Tensor split,
+                                 torch::Tensor bbox, torch::Tensor y, double r,
+                                 int64_t max_num_neighbors) {
+  check_kd_tree(pos, perm, node, split, bbox, y);
+  y = y.contiguous();
+
+  num_queries.add(y.size(0));
+  std::vector<size_t> out_vec;
+  stats::Phase query("torch_cluster::kd_tree::query", query_ns);
+  if (pos.size(0) > 0 && max_num_neighbors > 0) {
+    AT_DISPATCH_ALL_TYPES_AND2(
+        at::ScalarType::Half, at::ScalarType::BFloat16, pos.scalar_type(),
+        "kd_tree_radius_cpu", [&] {
+          using acc_t = at::acc_type<scalar_t, false>;
+          FlatKDTree<scalar_t, acc_t> tree{
+              pos.data_ptr<scalar_t>(), perm.data_ptr<int64_t>(),
+              node.data_ptr<int64_t>(), split.data_ptr<acc_t>(),
+              bbox.data_ptr<acc_t>(),   pos.size(1)};
+
+          auto y_data = y.data_ptr<scalar_t>();
+          auto D = y.size(1);
+          int64_t ptr_y[2] = {0, y.size(0)};
+          parallel_queries(
+              ptr_y, 1, y.size(0), out_vec,
+              [&](int64_t i, int64_t, std::vector<size_t> &vec) {
+                std::vector<size_t> index;
+                std::vector<acc_t> dists(D);
+                BoundedRadiusResultSet<acc_t> result{
+                    (acc_t)(r * r), (size_t)max_num_neighbors, index};
+                tree.search(result, y_data + i * D, dists);
+                for (auto j : index) {
+                  vec.push_back(j);
+                  vec.push_back(i);
+                }
+              });
+        });
+  }
+
+  query.end();
+
+  stats::Phase output("torch_cluster::kd_tree::output", output_ns);
+  const int64_t size = out_vec.size() / 2;
+  num_neighbors.add(size);
+  auto out = torch::from_blob(out_vec.data(), {size, 2},
+                              perm.options().dtype(torch::kLong));
+  return out.t().index_select(0, torch::tensor({1, 0}));
+}
@@ -0,0 +1,15 @@
+#pragma once
+
+#include "../extensions.h"
+
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor, torch::Tensor>
+kd_tree_cpu(torch::Tensor pos, int64_t leaf_size);
+
+torch::Tensor kd_tree_knn_cpu(torch::Tensor pos, torch::Tensor perm,
+                              torch::Tensor node, torch::Tensor split,
+                              torch::Tensor bbox, torch::Tensor y, int64_t k);
+
+torch::Tensor kd_tree_radius_cpu(torch::Tensor pos, torch::Tensor perm,
+                                 torch::Tensor node, torch::Tensor split,
+                                 torch::Tensor bbox, torch::Tensor y, double r,
+                                 int64_t max_num_neighbors);
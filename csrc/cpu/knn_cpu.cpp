@@ -1,9 +1,29 @@
 #include "knn_cpu.h"
 
+#include <ATen/AccumulateType.h>
+#include <ATen/Parallel.h>
+
+#include "sorted_1d.h"
+#include "stats.h"
 #include "utils.h"
 #include "utils/KDTreeVectorOfVectorsAdaptor.h"
 #include "utils/nanoflann.hpp"
 
+// Examples with at most this many points in `x` are searched via an
+// all-pairs scan, since building a KD-tree does not pay off for them.
+#define BRUTE_FORCE_MAX_POINTS 64
+
+static stats::Counter num_calls("knn.num_calls");
+static stats::Counter num_examples("knn.num_examples");
+static stats::Counter num_brute_force("knn.num_brute_force_examples");
+static stats::Counter num_queries("knn.num_queries");
+static stats::Counter num_neighbors("knn.num_neighbors");
+static stats::Counter copy_ns("knn.copy_ns");
+static stats::Counter build_ns("knn.build_index_ns");
+static stats::Counter query_ns("knn.query_ns");
+static stats::Counter examples_ns("knn.examples_ns");
+static stats::Counter output_ns("knn.output_ns");
+
 torch::Tensor knn_cpu(torch::Tensor x, torch::Tensor y,
                       torch::optional<torch::Tensor> ptr_x,
                       torch::optional<torch::Tensor> ptr_y, int64_t k,
@@ -22,7 +42,17 @@ torch::Tensor knn_cpu(torch::Tensor x, torch::Tensor y,
     CHECK_CPU(ptr_y.value());
     CHECK_INPUT(ptr_y.value().dim() == 1);
   }
+  if (ptr_x.has_value() || ptr_y.has_value()) {
+    CHECK_INPUT(ptr_x.has_value() && ptr_y.has_value());
+    CHECK_INPUT(ptr_x.value().numel() == ptr_y.value().numel());
+    check_ptr(ptr_x.value(), x.size(0));
+    check_ptr(ptr_y.value(), y.size(0));
+    ptr_x = ptr_x.value().contiguous();
+    ptr_y = ptr_y.value().contiguous();
+  }
 
+  num_calls.add(1);
+  num_queries.add(y.size(0));
   std::vector<size_t> out_vec = std::vector<size_t>();
 
   AT_DISPATCH_ALL_TYPES_AND2(at::ScalarType::Half, at::ScalarType::BFloat16, x.scalar_type(), "knn_cpu", [&] {
@@ -32,8 +62,40 @@ torch::Tensor knn_cpu(torch::Tensor x, torch::Tensor y,
     auto y_data = y.data_ptr<scalar_t>();
     typedef std::vector<std::vector<scalar_t>> vec_t;
 
+    if (x.size(1) == 1) { // 1-D points are searched via binary search.
+      using acc_t = at::acc_type<scalar_t, false>;
+      int64_t single_ptr_x[2] = {0, x.size(0)};
+      int64_t single_ptr_y[2] = {0, y.size(0)};
+      auto ptr_x_data = ptr_x.has_value() ? ptr_x.value().data_ptr<int64_t>()
+                                          : single_ptr_x;
+      auto ptr_y_data = ptr_y.has_value() ? ptr_y.value().data_ptr<int64_t>()
+                                          : single_ptr_y;
+      auto batch_size = ptr_x.has_value() ? ptr_x.value().numel() - 1 : 1;
+
+      num_examples.add(batch_size);
+      stats::Phase build("torch_cluster::knn::build_index", build_ns);
+      Sorted1D<scalar_t> index(x_data, ptr_x_data, batch_size);
+      build.end();
+
+      stats::Phase query("torch_cluster::knn::query", query_ns);
+      parallel_queries(
+          ptr_y_data, batch_size, y.size(0), out_vec,
+          [&](int64_t i, int64_t b, std::vector<size_t> &vec) {
+            int64_t count = 0;
+            index.visit(ptr_x_data[b], ptr_x_data[b + 1], (acc_t)y_data[i],
+                        [&](int64_t j, acc_t) {
+                          vec.push_back(j);
+                          vec.push_back(i);
+                          return ++count < k;
+                        });
+          });
+      return;
+    }
+
     if (!ptr_x.has_value()) { // Single example.
 
+      num_examples.add(1);
+      stats::Phase copy("torch_cluster::knn::copy", copy_ns);
       vec_t pts(x.size(0));
       for (int64_t i = 0; i < x.size(0); i++) {
         pts[i].resize(x.size(1));
@@ -41,12 +103,16 @@ torch::Tensor knn_cpu(torch::Tensor x, torch::Tensor y,
           pts[i][j] = x_data[i * x.size(1) + j];
         }
       }
+      copy.end();
 
       typedef KDTreeVectorOfVectorsAdaptor<vec_t, scalar_t> my_kd_tree_t;
 
+      stats::Phase build("torch_cluster::knn::build_index", build_ns);
       my_kd_tree_t mat_index(x.size(1), pts, 10);
       mat_index.index->buildIndex();
+      build.end();
 
+      stats::Phase query("torch_cluster::knn::query", query_ns);
       std::vector<size_t> ret_index(k);
       std::vector<scalar_t> out_dist_sqr(k);
       for (int64_t i = 0; i < y.size(0); i++) {
@@ -60,45 +126,112 @@ torch::Tensor knn_cpu(torch::Tensor x, torch::Tensor y,
       }
     } else { // Batch-wise.
 
+      using acc_t = at::acc_type<scalar_t, false>;
       auto ptr_x_data = ptr_x.value().data_ptr<int64_t>();
       auto ptr_y_data = ptr_y.value().data_ptr<int64_t>();
-
-      for (int64_t b = 0; b < ptr_x.value().size(0) - 1; b++) {
-        auto x_start = ptr_x_data[b], x_end = ptr_x_data[b + 1];
-        auto y_start = ptr_y_data[b], y_end = ptr_y_data[b + 1];
-
-        if (x_start == x_end || y_start == y_end)
-          continue;
-
-        vec_t pts(x_end - x_start);
-        for (int64_t i = 0; i < x_end - x_start; i++) {
-          pts[i].resize(x.size(1));
-          for (int64_t j = 0; j < x.size(1); j++) {
-            pts[i][j] = x_data[(i + x_start) * x.size(1) + j];
-          }
-        }
-
-        typedef KDTreeVectorOfVectorsAdaptor<vec_t, scalar_t> my_kd_tree_t;
-
-        my_kd_tree_t mat_index(x.size(1), pts, 10);
-        mat_index.index->buildIndex();
-
+      auto batch_size = ptr_x.value().numel() - 1;
+      auto D = x.size(1);
+
+      // Examples are processed in parallel. Each chunk of consecutive
+      // examples collects its results separately to preserve their order.
+      auto num_chunks =
+          std::min(batch_size, (int64_t)at::get_num_threads() * 4);
+      std::vector<std::vector<size_t>> chunk_vec(num_chunks);
+
+      num_examples.add(batch_size);
+      at::parallel_for(0, num_chunks, 1, [&](int64_t begin, int64_t end) {
+        stats::Phase examples("torch_cluster::knn::examples", examples_ns);
         std::vector<size_t> ret_index(k);
-        std::vector<scalar_t> out_dist_sqr(k);
-        for (int64_t i = y_start; i < y_end; i++) {
-          size_t num_matches = mat_index.index->knnSearch(
-              y_data + i * y.size(1), k, &ret_index[0], &out_dist_sqr[0]);
-
-          for (size_t j = 0; j < num_matches; j++) {
-            out_vec.push_back(x_start + ret_index[j]);
-            out_vec.push_back(i);
+        std::vector<acc_t> ret_dist(k);
+
+        for (int64_t c = begin; c < end; c++) {
+          auto &vec = chunk_vec[c];
+          auto b_start = c * batch_size / num_chunks;
+          auto b_end = (c + 1) * batch_size / num_chunks;
+
+          for (int64_t b = b_start; b < b_end; b++) {
+            auto x_start = ptr_x_data[b], x_end = ptr_x_data[b + 1];
+            auto y_start = ptr_y_data[b], y_end = ptr_y_data[b + 1];
+
+            if (x_start == x_end || y_start == y_end)
+              continue;
+
+            if (x_end - x_start <= BRUTE_FORCE_MAX_POINTS) {
+              num_brute_force.add(1);
+              for (int64_t i = y_start; i < y_end; i++) {
+                auto query = y_data + i * D;
+
+                // Maintain the `k` nearest points sorted by distance.
+                int64_t count = 0;
+                for (int64_t j = x_start; j < x_end; j++) {
+                  acc_t dist = 0;
+                  for (int64_t d = 0; d < D; d++) {
+                    acc_t diff = (acc_t)query[d] - (acc_t)x_data[j * D + d];
+                    dist += diff * diff;
+                  }
+
+                  if (count < k)
+                    count++;
+                  else if (dist >= ret_dist[count - 1])
+                    continue;
+
+                  auto p = count - 1;
+                  for (; p > 0 && ret_dist[p - 1] > dist; p--) {
+                    ret_dist[p] = ret_dist[p - 1];
+                    ret_index[p] = ret_index[p - 1];
+                  }
+                  ret_dist[p] = dist;
+                  ret_index[p] = j;
+                }
+
+                for (int64_t j = 0; j < count; j++) {
+                  vec.push_back(ret_index[j]);
+                  vec.push_back(i);
+                }
+              }
+              continue;
+            }
+
+            stats::Phase copy("torch_cluster::knn::copy", copy_ns);
+            vec_t pts(x_end - x_start);
+            for (int64_t i = 0; i < x_end - x_start; i++) {
+              pts[i].resize(D);
+              for (int64_t j = 0; j < D; j++) {
+                pts[i][j] = x_data[(i + x_start) * D + j];
+              }
+            }
+            copy.end();
+
+            typedef KDTreeVectorOfVectorsAdaptor<vec_t, scalar_t> my_kd_tree_t;
+
+            stats::Phase build("torch_cluster::knn::build_index", build_ns);
+            my_kd_tree_t mat_index(D, pts, 10);
+            mat_index.index->buildIndex();
+            build.end();
+
+            stats::Phase query("torch_cluster::knn::query", query_ns);
+            std::vector<scalar_t> out_dist_sqr(k);
+            for (int64_t i = y_start; i < y_end; i++) {
+              size_t num_matches = mat_index.index->knnSearch(
+                  y_data + i * D, k, &ret_index[0], &out_dist_sqr[0]);
+
+              for (size_t j = 0; j < num_matches; j++) {
+                vec.push_back(x_start + ret_index[j]);
+                vec.push_back(i);
+              }
+            }
           }
         }
-      }
+      });
+
+      for (auto &vec : chunk_vec)
+        out_vec.insert(out_vec.end(), vec.begin(), vec.end());
     }
   });
 
+  stats::Phase output("torch_cluster::knn::output", output_ns);
   const int64_t size = out_vec.size() / 2;
+  num_neighbors.add(size);
   auto out = torch::from_blob(out_vec.data(), {size, 2},
                               x.options().dtype(torch::kLong));
   return out.t().index_select(0, torch::tensor({1, 0}));
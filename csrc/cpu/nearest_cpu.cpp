@@ -0,0 +1,140 @@
+#include "nearest_cpu.h"
+
+#include <ATen/AccumulateType.h>
+#include <ATen/Parallel.h>
+
+#include <memory>
+
+#include "stats.h"
+#include "utils.h"
+#include "utils/PointCloudAdaptor.h"
+#include "utils/nanoflann.hpp"
+
+// Examples with at most this many points in `y` (or with more than
+// `KD_TREE_MAX_DIM` dimensions) are searched via brute-force, since building
+// a KD-tree does not pay off for them.
+#define BRUTE_FORCE_MAX_POINTS 64
+#define KD_TREE_MAX_DIM 16
+
+static stats::Counter num_calls("nearest.num_calls");
+static stats::Counter num_examples("nearest.num_examples");
+static stats::Counter num_brute_force("nearest.num_brute_force_examples");
+static stats::Counter num_queries("nearest.num_queries");
+static stats::Counter build_ns("nearest.build_index_ns");
+static stats::Counter query_ns("nearest.query_ns");
+
+torch::Tensor nearest_cpu(torch::Tensor x, torch::Tensor y,
+                          torch::Tensor ptr_x, torch::Tensor ptr_y) {
+  CHECK_CPU(x);
+  CHECK_CPU(y);
+  CHECK_CPU(ptr_x);
+  CHECK_CPU(ptr_y);
+  CHECK_INPUT(x.dim() == 2 && y.dim() == 2 && x.size(1) == y.size(1));
+  CHECK_INPUT(ptr_x.numel() == ptr_y.numel());
+  check_ptr(ptr_x, x.size(0));
+  check_ptr(ptr_y, y.size(0));
+
+  x = x.contiguous(), y = y.contiguous();
+  ptr_x = ptr_x.contiguous(), ptr_y = ptr_y.contiguous();
+
+  auto out = torch::empty({x.size(0)}, ptr_x.options());
+  auto batch_size = ptr_x.numel() - 1;
+  auto D = x.size(1);
+
+  auto ptr_x_data = ptr_x.data_ptr<int64_t>();
+  auto ptr_y_data = ptr_y.data_ptr<int64_t>();
+  auto out_data = out.data_ptr<int64_t>();
+
+  num_calls.add(1);
+  num_examples.add(batch_size);
+  num_queries.add(x.size(0));
+
+  for (int64_t b = 0; b < batch_size; b++) {
+    AT_ASSERTM(ptr_x_data[b] == ptr_x_data[b + 1] ||
+                   ptr_y_data[b] < ptr_y_data[b + 1],
+               "Found an example in 'x' without any points in 'y'");
+  }
+
+  AT_DISPATCH_ALL_TYPES_AND2(
+      at::ScalarType::Half, at::ScalarType::BFloat16, x.scalar_type(),
+      "nearest_cpu", [&] {
+        using acc_t = at::acc_type<scalar_t, false>;
+        typedef PointCloud<scalar_t> cloud_t;
+        typedef nanoflann::KDTreeSingleIndexAdaptor<
+            nanoflann::L2_Simple_Adaptor<scalar_t, cloud_t, acc_t>, cloud_t>
+            kd_tree_t;
+
+        auto x_data = x.data_ptr<scalar_t>();
+        auto y_data = y.data_ptr<scalar_t>();
+
+        // Build KD-trees for all large enough examples in parallel.
+        std::vector<cloud_t> clouds(batch_size);
+        std::vector<std::unique_ptr<kd_tree_t>> trees(batch_size);
+        stats::Phase build("torch_cluster::nearest::build_index", build_ns);
+        at::parallel_for(0, batch_size, 1, [&](int64_t begin, int64_t end) {
+          for (int64_t b = begin; b < end; b++) {
+            auto y_start = ptr_y_data[b], y_end = ptr_y_data[b + 1];
+            if (ptr_x_data[b] == ptr_x_data[b + 1])
+              continue;
+            if (y_end - y_start <= BRUTE_FORCE_MAX_POINTS ||
+                D > KD_TREE_MAX_DIM) {
+              num_brute_force.add(1);
+              continue;
+            }
+
+            clouds[b] = {y_data + y_start * D, (size_t)(y_end - y_start),
+                         (size_t)D};
+            trees[b] = std::make_unique<kd_tree_t>(
+                D, clouds[b], nanoflann::KDTreeSingleIndexAdaptorParams(10));
+            trees[b]->buildIndex();
+          }
+        });
+
+        build.end();
+
+        stats::Phase query("torch_cluster::nearest::query", query_ns);
+        auto grain_size = std::max<int64_t>(1, at::internal::GRAIN_SIZE / D);
+        at::parallel_for(0, x.size(0), grain_size, [&](int64_t begin,
+                                                       int64_t end) {
+          int64_t b = std::upper_bound(ptr_x_data, ptr_x_data + batch_size,
+                                       begin) -
+                      ptr_x_data - 1;
+
+          for (int64_t i = begin; i < end; i++) {
+            while (i >= ptr_x_data[b + 1])
+              b++;
+
+            auto y_start = ptr_y_data[b], y_end = ptr_y_data[b + 1];
+            auto query = x_data + i * D;
+
+            if (trees[b]) {
+              size_t index;
+              acc_t dist;
+              nanoflann::KNNResultSet<acc_t> result(1);
+              result.init(&index, &dist);
+              trees[b]->findNeighbors(result, query,
+                                      nanoflann::SearchParams());
+              out_data[i] = y_start + (int64_t)index;
+              continue;
+            }
+
+            auto best_idx = y_start;
+            auto best_dist = std::numeric_limits<acc_t>::max();
+            for (auto j = y_start; j < y_end; j++) {
+              acc_t dist = 0;
+              for (int64_t d = 0; d < D; d++) {
+                acc_t diff = (acc_t)query[d] - (acc_t)y_data[j * D + d];
+                dist += diff * diff;
+              }
+              if (dist < best_dist) {
+                best_dist = dist;
+                best_idx = j;
+              }
+            }
+            out_data[i] = best_idx;
+          }
+        });
+      });
+
+  return out;
+}
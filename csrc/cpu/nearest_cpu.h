@@ -0,0 +1,6 @@
+#pragma once
+
+#include "../extensions.h"
+
+torch::Tensor nearest_cpu(torch::Tensor x, torch::Tensor y,
+                          torch::Tensor ptr_x, torch::Tensor ptr_y);
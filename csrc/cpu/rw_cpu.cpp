@@ -2,8 +2,15 @@
 
 #include <ATen/Parallel.h>
 
+#include "stats.h"
 #include "utils.h"
 
+static stats::Counter rw_num_walks("rw.num_walks");
+static stats::Counter rw_num_steps("rw.num_steps");
+static stats::Counter rw_num_rejections("rw.num_rejections");
+static stats::Counter rw_walk_ns("rw.walk_ns");
+static stats::Counter rw_induce_ns("rw.induce_ns");
+
 void uniform_sampling(const int64_t *rowptr, const int64_t *col,
                       const int64_t *start, int64_t *n_out, int64_t *e_out,
                       const int64_t numel, const int64_t walk_length) {
@@ -57,6 +64,7 @@ void rejection_sampling(const int64_t *rowptr, const int64_t *col,
 
   int64_t grain_size = at::internal::GRAIN_SIZE / walk_length;
   at::parallel_for(0, numel, grain_size, [&](int64_t begin, int64_t end) {
+    int64_t rejections = 0;
     for (auto n = begin; n < end; n++) {
       int64_t t = start[n], v, x, e_cur, row_start, row_end;
 
@@ -95,6 +103,7 @@ void rejection_sampling(const int64_t *rowptr, const int64_t *col,
               break;
             else if (r < prob_2)
               break;
+            rejections++;
           }
         }
 
@@ -104,6 +113,7 @@ void rejection_sampling(const int64_t *rowptr, const int64_t *col,
         v = x;
       }
     }
+    rw_num_rejections.add(rejections);
   });
 }
 
@@ -127,6 +137,9 @@ random_walk_cpu(torch::Tensor rowptr, torch::Tensor col, torch::Tensor start,
   auto n_out_data = n_out.data_ptr<int64_t>();
   auto e_out_data = e_out.data_ptr<int64_t>();
 
+  rw_num_walks.add(start.numel());
+  rw_num_steps.add(start.numel() * walk_length);
+  stats::Phase walk("torch_cluster::random_walk::walk", rw_walk_ns);
   if (p == 1. && q == 1.) {
     uniform_sampling(rowptr_data, col_data, start_data, n_out_data, e_out_data,
                      start.numel(), walk_length);
@@ -137,3 +150,595 @@ random_walk_cpu(torch::Tensor rowptr, torch::Tensor col, torch::Tensor start,
 
   return std::make_tuple(n_out, e_out);
 }
+
+// Builds per-node alias tables via Vose's method, so that weighted neighbor
+// sampling can be done in O(1). For an edge `e` of node `u`, `prob[e]` holds
+// the probability to keep `e` and `alias[e]` holds the edge to pick otherwise.
+std::tuple<torch::Tensor, torch::Tensor> alias_table_cpu(torch::Tensor rowptr,
+                                                         torch::Tensor weight) {
+  CHECK_CPU(rowptr);
+  CHECK_CPU(weight);
+  CHECK_INPUT(rowptr.dim() == 1);
+  CHECK_INPUT(weight.dim() == 1);
+
+  rowptr = rowptr.contiguous();
+  weight = weight.toType(torch::kDouble).contiguous();
+  CHECK_INPUT(weight.numel() == rowptr[-1].data_ptr<int64_t>()[0]);
+  AT_ASSERTM((weight >= 0).all().data_ptr<bool>()[0],
+             "Edge weights need to be non-negative");
+
+  auto prob =
+      torch::empty(weight.numel(), weight.options().dtype(torch::kFloat));
+  auto alias = torch::empty(weight.numel(), rowptr.options());
+
+  auto rowptr_data = rowptr.data_ptr<int64_t>();
+  auto weight_data = weight.data_ptr<double>();
+  auto prob_data = prob.data_ptr<float>();
+  auto alias_data = alias.data_ptr<int64_t>();
+
+  int64_t num_nodes = rowptr.numel() - 1;
+  int64_t avg_deg = std::max<int64_t>(1, weight.numel() / (num_nodes + 1));
+  int64_t grain_size = at::internal::GRAIN_SIZE / avg_deg;
+  at::parallel_for(0, num_nodes, grain_size, [&](int64_t begin, int64_t end) {
+    std::vector<double> scaled;
+    std::vector<int64_t> stack; // `small` grows upwards, `large` downwards.
+
+    for (int64_t u = begin; u < end; u++) {
+      int64_t row_start = rowptr_data[u], row_end = rowptr_data[u + 1];
+      int64_t deg = row_end - row_start;
+      if (deg == 0)
+        continue;
+
+      double sum = 0;
+      for (int64_t e = row_start; e < row_end; e++)
+        sum += weight_data[e];
+
+      scaled.resize(deg);
+      stack.resize(deg);
+      int64_t num_small = 0, num_large = deg;
+      for (int64_t i = 0; i < deg; i++) {
+        // Fall back to uniform sampling in case all weights are zero.
+        scaled[i] = sum > 0 ? weight_data[row_start + i] * deg / sum : 1.;
+        if (scaled[i] < 1.)
+          stack[num_small++] = i;
+        else
+          stack[--num_large] = i;
+      }
+
+      while (num_small > 0 && num_large < deg) {
+        int64_t s = stack[--num_small], l = stack[num_large++];
+        prob_data[row_start + s] = (float)scaled[s];
+        alias_data[row_start + s] = row_start + l;
+        scaled[l] = (scaled[l] + scaled[s]) - 1.;
+        if (scaled[l] < 1.)
+          stack[num_small++] = l;
+        else
+          stack[--num_large] = l;
+      }
+
+      // Remaining entries are (numerically) equal to one.
+      for (int64_t i = 0; i < deg; i++) {
+        if (i < num_small || i >= num_large) {
+          int64_t e = row_start + stack[i];
+          prob_data[e] = 1.f;
+          alias_data[e] = e;
+        }
+      }
+    }
+  });
+
+  return std::make_tuple(prob, alias);
+}
+
+// Samples the edges of a (weighted) node2vec walk: Proposals are drawn either
+// uniformly or from the alias tables (if given), and are accepted according to
+// the return/in-out bias of the walk.
+struct Walker {
+  const int64_t *rowptr, *col;
+  const float *prob;
+  const int64_t *alias;
+  double prob_0, prob_1, prob_2;
+  bool biased;
+
+  Walker(const int64_t *rowptr, const int64_t *col, const float *prob,
+         const int64_t *alias, const double p, const double q)
+      : rowptr(rowptr), col(col), prob(prob), alias(alias) {
+    double max_prob = fmax(fmax(1. / p, 1.), 1. / q);
+    prob_0 = 1. / p / max_prob;
+    prob_1 = 1. / max_prob;
+    prob_2 = 1. / q / max_prob;
+    biased = p != 1. || q != 1.;
+  }
+
+  inline int64_t propose(const int64_t v, RandomEngine &rng) const {
+    int64_t row_start = rowptr[v], row_end = rowptr[v + 1];
+    if (row_end - row_start == 0)
+      return -1;
+    int64_t e = row_start + rng.randint(row_end - row_start);
+    if (prob != nullptr && rng.uniform() >= prob[e])
+      e = alias[e];
+    return e;
+  }
+
+  // Returns the next edge of a walk that moved from `t` to `v` (with `t = -1`
+  // for the first step), or `-1` in case `v` has no outgoing edges. Rejected
+  // proposals are counted in `rejections`.
+  inline int64_t step(const int64_t t, const int64_t v, RandomEngine &rng,
+                      int64_t &rejections) const {
+    while (true) {
+      int64_t e = propose(v, rng);
+      if (!biased || t < 0 || e < 0 || rowptr[v + 1] - rowptr[v] == 1)
+        return e;
+
+      int64_t x = col[e];
+      auto r = rng.uniform();
+      if (x == t) {
+        if (r < prob_0)
+          return e;
+      } else if (is_neighbor(rowptr, col, x, t)) {
+        if (r < prob_1)
+          return e;
+      } else if (r < prob_2) {
+        return e;
+      }
+      rejections++;
+    }
+  }
+};
+
+void weighted_sampling(const int64_t *rowptr, const int64_t *col,
+                       const float *prob, const int64_t *alias,
+                       const int64_t *start, int64_t *n_out, int64_t *e_out,
+                       const int64_t numel, const int64_t walk_length,
+                       const double p, const double q) {
+
+  Walker walker(rowptr, col, prob, alias, p, q);
+  uint64_t seed = draw_seed();
+
+  int64_t grain_size = at::internal::GRAIN_SIZE / walk_length;
+  at::parallel_for(0, numel, grain_size, [&](int64_t begin, int64_t end) {
+    int64_t rejections = 0;
+    for (auto n = begin; n < end; n++) {
+      RandomEngine rng(seed, n);
+      int64_t t = -1, v = start[n], x, e_cur;
+
+      n_out[n * (walk_length + 1)] = v;
+
+      for (auto l = 0; l < walk_length; l++) {
+        e_cur = walker.step(t, v, rng, rejections);
+        x = e_cur < 0 ? v : col[e_cur];
+
+        n_out[n * (walk_length + 1) + (l + 1)] = x;
+        e_out[n * walk_length + l] = e_cur;
+        t = v;
+        v = x;
+      }
+    }
+    rw_num_rejections.add(rejections);
+  });
+}
+
+std::tuple<torch::Tensor, torch::Tensor>
+weighted_random_walk_cpu(torch::Tensor rowptr, torch::Tensor col,
+                         torch::Tensor prob, torch::Tensor alias,
+                         torch::Tensor start, int64_t walk_length, double p,
+                         double q) {
+  CHECK_CPU(rowptr);
+  CHECK_CPU(col);
+  CHECK_CPU(prob);
+  CHECK_CPU(alias);
+  CHECK_CPU(start);
+
+  CHECK_INPUT(rowptr.dim() == 1);
+  CHECK_INPUT(col.dim() == 1);
+  CHECK_INPUT(prob.dim() == 1 && prob.numel() == col.numel());
+  CHECK_INPUT(alias.dim() == 1 && alias.numel() == col.numel());
+  CHECK_INPUT(start.dim() == 1);
+
+  rowptr = rowptr.contiguous(), col = col.contiguous();
+  prob = prob.toType(torch::kFloat).contiguous();
+  alias = alias.contiguous(), start = start.contiguous();
+
+  auto n_out = torch::empty({start.size(0), walk_length + 1}, start.options());
+  auto e_out = torch::empty({start.size(0), walk_length}, start.options());
+
+  rw_num_walks.add(start.numel());
+  rw_num_steps.add(start.numel() * walk_length);
+  stats::Phase walk("torch_cluster::random_walk::walk", rw_walk_ns);
+  weighted_sampling(rowptr.data_ptr<int64_t>(), col.data_ptr<int64_t>(),
+                    prob.data_ptr<float>(), alias.data_ptr<int64_t>(),
+                    start.data_ptr<int64_t>(), n_out.data_ptr<int64_t>(),
+                    e_out.data_ptr<int64_t>(), start.numel(), walk_length, p,
+                    q);
+
+  return std::make_tuple(n_out, e_out);
+}
+
+// Number of (center, context) pairs within a window of size `window_size`
+// in a walk of length `walk_length`.
+inline int64_t num_skipgram_pairs(const int64_t walk_length,
+                                  const int64_t window_size) {
+  int64_t out = 0;
+  for (int64_t l = 1; l <= walk_length; l++)
+    out += 2 * std::min(l, window_size);
+  return out;
+}
+
+// Directly emits skip-gram (center, context) pairs (and negative samples)
+// while walking. Only the last `window_size` nodes of a walk are kept in a
+// ring buffer, so that walks never need to be materialized.
+std::tuple<torch::Tensor, torch::Tensor>
+skipgram_cpu(torch::Tensor rowptr, torch::Tensor col,
+             torch::optional<torch::Tensor> optional_prob,
+             torch::optional<torch::Tensor> optional_alias,
+             torch::Tensor start, int64_t walk_length, double p, double q,
+             int64_t window_size, int64_t num_negatives,
+             torch::optional<torch::Tensor> optional_neg_prob,
+             torch::optional<torch::Tensor> optional_neg_alias) {
+  CHECK_CPU(rowptr);
+  CHECK_CPU(col);
+  CHECK_CPU(start);
+  CHECK_INPUT(rowptr.dim() == 1);
+  CHECK_INPUT(col.dim() == 1);
+  CHECK_INPUT(start.dim() == 1);
+  CHECK_INPUT(walk_length >= 1 && window_size >= 1 && num_negatives >= 0);
+  CHECK_INPUT(optional_prob.has_value() == optional_alias.has_value());
+  if (optional_prob.has_value()) {
+    CHECK_CPU(optional_prob.value());
+    CHECK_CPU(optional_alias.value());
+    CHECK_INPUT(optional_prob.value().numel() == col.numel());
+    CHECK_INPUT(optional_alias.value().numel() == col.numel());
+  }
+  if (num_negatives > 0) {
+    CHECK_INPUT(optional_neg_prob.has_value());
+    CHECK_INPUT(optional_neg_alias.has_value());
+    CHECK_CPU(optional_neg_prob.value());
+    CHECK_CPU(optional_neg_alias.value());
+    CHECK_INPUT(optional_neg_prob.value().numel() == rowptr.numel() - 1);
+    CHECK_INPUT(optional_neg_alias.value().numel() == rowptr.numel() - 1);
+  }
+
+  rowptr = rowptr.contiguous(), col = col.contiguous();
+  start = start.contiguous();
+
+  torch::Tensor prob, alias, neg_prob, neg_alias;
+  const float *prob_data = nullptr, *neg_prob_data = nullptr;
+  const int64_t *alias_data = nullptr, *neg_alias_data = nullptr;
+  if (optional_prob.has_value()) {
+    prob = optional_prob.value().toType(torch::kFloat).contiguous();
+    alias = optional_alias.value().contiguous();
+    prob_data = prob.data_ptr<float>();
+    alias_data = alias.data_ptr<int64_t>();
+  }
+  if (num_negatives > 0) {
+    neg_prob = optional_neg_prob.value().toType(torch::kFloat).contiguous();
+    neg_alias = optional_neg_alias.value().contiguous();
+    neg_prob_data = neg_prob.data_ptr<float>();
+    neg_alias_data = neg_alias.data_ptr<int64_t>();
+  }
+
+  int64_t num_nodes = rowptr.numel() - 1;
+  int64_t num_pairs = num_skipgram_pairs(walk_length, window_size);
+  auto pos = torch::empty({2, start.numel() * num_pairs}, start.options());
+  auto neg = torch::empty({2, start.numel() * num_pairs * num_negatives},
+                          start.options());
+
+  auto col_data = col.data_ptr<int64_t>();
+  auto start_data = start.data_ptr<int64_t>();
+  auto pos_data = pos.data_ptr<int64_t>();
+  auto neg_data = neg.data_ptr<int64_t>();
+  int64_t pos_stride = pos.size(1), neg_stride = neg.size(1);
+
+  Walker walker(rowptr.data_ptr<int64_t>(), col_data, prob_data, alias_data,
+                p, q);
+  uint64_t seed = draw_seed();
+
+  rw_num_walks.add(start.numel());
+  rw_num_steps.add(start.numel() * walk_length);
+  stats::Phase walk("torch_cluster::skipgram::walk", rw_walk_ns);
+
+  int64_t grain_size =
+      std::max<int64_t>(1, at::internal::GRAIN_SIZE / num_pairs);
+  at::parallel_for(0, start.numel(), grain_size, [&](int64_t begin,
+                                                     int64_t end) {
+    std::vector<int64_t> window(window_size);
+    int64_t rejections = 0;
+
+    for (int64_t n = begin; n < end; n++) {
+      RandomEngine rng(seed, n);
+      int64_t t = -1, v = start_data[n], x, e, idx = n * num_pairs;
+      window[0] = v;
+
+      for (int64_t l = 1; l <= walk_length; l++) {
+        e = walker.step(t, v, rng, rejections);
+        x = e < 0 ? v : col_data[e];
+
+        for (int64_t j = 1; j <= std::min(l, window_size); j++) {
+          int64_t u = window[(l - j) % window_size];
+          pos_data[idx] = x, pos_data[pos_stride + idx] = u;
+          pos_data[idx + 1] = u, pos_data[pos_stride + idx + 1] = x;
+
+          for (int64_t k = 0; k < 2 * num_negatives; k++) {
+            int64_t c = k < num_negatives ? x : u;
+            int64_t i = rng.randint(num_nodes);
+            if (rng.uniform() >= neg_prob_data[i])
+              i = neg_alias_data[i];
+            neg_data[idx * num_negatives + k] = c;
+            neg_data[neg_stride + idx * num_negatives + k] = i;
+          }
+          idx += 2;
+        }
+
+        window[l % window_size] = x;
+        t = v;
+        v = x;
+      }
+    }
+    rw_num_rejections.add(rejections);
+  });
+
+  return std::make_tuple(pos, neg);
+}
+
+// An open-addressing hash map from node indices to visit counts. It is owned
+// by a single thread and re-used across all of its start nodes, so that only
+// touched slots need to be reset.
+struct VisitCounter {
+  std::vector<int64_t> keys, counts, touched;
+
+  VisitCounter(int64_t capacity) {
+    int64_t size = 16;
+    while (size < 2 * capacity)
+      size *= 2;
+    keys.assign(size, -1);
+    counts.assign(size, 0);
+  }
+
+  inline int64_t find(const int64_t v) const {
+    int64_t mask = keys.size() - 1;
+    int64_t h = (int64_t)(((uint64_t)v * 0x9E3779B97F4A7C15ULL) >> 16) & mask;
+    while (keys[h] != -1 && keys[h] != v)
+      h = (h + 1) & mask;
+    return h;
+  }
+
+  inline void add(const int64_t v, const int64_t count = 1) {
+    if (2 * ((int64_t)touched.size() + 1) > (int64_t)keys.size())
+      grow();
+    int64_t h = find(v);
+    if (keys[h] == -1) {
+      keys[h] = v;
+      touched.push_back(h);
+    }
+    counts[h] += count;
+  }
+
+  void grow() {
+    std::vector<int64_t> old_keys, old_counts, old_touched;
+    old_keys.swap(keys), old_counts.swap(counts), old_touched.swap(touched);
+    keys.assign(2 * old_keys.size(), -1);
+    counts.assign(2 * old_keys.size(), 0);
+    for (const auto h : old_touched)
+      add(old_keys[h], old_counts[h]);
+  }
+
+  void clear() {
+    for (const auto h : touched)
+      keys[h] = -1, counts[h] = 0;
+    touched.clear();
+  }
+};
+
+// Estimates personalized PageRank scores via random walks with restart: Each
+// walk terminates with probability `alpha` after every visit (i.e., walk
+// lengths follow a geometric distribution), and all visits are counted in a
+// per-thread hash map. Walks that reach a dead end continue at their start
+// node, so that scores of every start node sum up to one. Only the `topk`
+// most visited nodes of every start node are written out, so that walks never
+// need to be materialized.
+std::tuple<torch::Tensor, torch::Tensor>
+ppr_cpu(torch::Tensor rowptr, torch::Tensor col,
+        torch::optional<torch::Tensor> optional_prob,
+        torch::optional<torch::Tensor> optional_alias, torch::Tensor start,
+        double alpha, int64_t num_walks, int64_t topk) {
+  CHECK_CPU(rowptr);
+  CHECK_CPU(col);
+  CHECK_CPU(start);
+  CHECK_INPUT(rowptr.dim() == 1);
+  CHECK_INPUT(col.dim() == 1);
+  CHECK_INPUT(start.dim() == 1);
+  AT_ASSERTM(alpha > 0. && alpha <= 1., "`alpha` needs to be in (0, 1]");
+  CHECK_INPUT(num_walks >= 1 && topk >= 1);
+  CHECK_INPUT(optional_prob.has_value() == optional_alias.has_value());
+
+  rowptr = rowptr.contiguous(), col = col.contiguous();
+  start = start.contiguous();
+
+  torch::Tensor prob, alias;
+  const float *prob_data = nullptr;
+  const int64_t *alias_data = nullptr;
+  if (optional_prob.has_value()) {
+    CHECK_CPU(optional_prob.value());
+    CHECK_CPU(optional_alias.value());
+    CHECK_INPUT(optional_prob.value().numel() == col.numel());
+    CHECK_INPUT(optional_alias.value().numel() == col.numel());
+    prob = optional_prob.value().toType(torch::kFloat).contiguous();
+    alias = optional_alias.value().contiguous();
+    prob_data = prob.data_ptr<float>();
+    alias_data = alias.data_ptr<int64_t>();
+  }
+
+  auto index = torch::full({start.numel(), topk}, -1, start.options());
+  auto score = torch::zeros({start.numel(), topk},
+                            start.options().dtype(torch::kFloat));
+
+  auto col_data = col.data_ptr<int64_t>();
+  auto start_data = start.data_ptr<int64_t>();
+  auto index_data = index.data_ptr<int64_t>();
+  auto score_data = score.data_ptr<float>();
+
+  Walker walker(rowptr.data_ptr<int64_t>(), col_data, prob_data, alias_data,
+                1., 1.);
+  uint64_t seed = draw_seed();
+  int64_t num_nodes = rowptr.numel() - 1;
+  double scale = alpha / num_walks;
+
+  rw_num_walks.add(start.numel() * num_walks);
+  stats::Phase walk("torch_cluster::ppr::walk", rw_walk_ns);
+
+  int64_t walk_cost = std::max<int64_t>(1, (int64_t)(num_walks / alpha));
+  int64_t grain_size =
+      std::max<int64_t>(1, at::internal::GRAIN_SIZE / walk_cost);
+  at::parallel_for(0, start.numel(), grain_size, [&](int64_t begin,
+                                                     int64_t end) {
+    VisitCounter counter(std::min(walk_cost, num_nodes));
+    std::vector<std::pair<int64_t, int64_t>> top;
+
+    for (int64_t n = begin; n < end; n++) {
+      RandomEngine rng(seed, n);
+
+      for (int64_t w = 0; w < num_walks; w++) {
+        int64_t v = start_data[n];
+        while (true) {
+          counter.add(v);
+          if (rng.uniform() < alpha)
+            break;
+          int64_t e = walker.propose(v, rng);
+          // Dead ends restart the walk at its start node.
+          v = e < 0 ? start_data[n] : col_data[e];
+        }
+      }
+
+      // Sort by decreasing count, and break ties by node index.
+      top.clear();
+      for (const auto h : counter.touched)
+        top.push_back({-counter.counts[h], counter.keys[h]});
+      int64_t k = std::min<int64_t>(topk, top.size());
+      std::partial_sort(top.begin(), top.begin() + k, top.end());
+      for (int64_t i = 0; i < k; i++) {
+        index_data[n * topk + i] = top[i].second;
+        score_data[n * topk + i] = (float)(-top[i].first * scale);
+      }
+      counter.clear();
+    }
+  });
+
+  return std::make_tuple(index, score);
+}
+
+// Samples a subgraph induced by the nodes of random walks starting from
+// `start`, as used in GraphSAINT. Returns the sorted node indices of the
+// subgraph, its (relabeled) edge indices and the original edge indices.
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor>
+saint_subgraph_cpu(torch::Tensor rowptr, torch::Tensor col,
+                   torch::optional<torch::Tensor> optional_prob,
+                   torch::optional<torch::Tensor> optional_alias,
+                   torch::Tensor start, int64_t walk_length) {
+  CHECK_CPU(rowptr);
+  CHECK_CPU(col);
+  CHECK_CPU(start);
+  CHECK_INPUT(rowptr.dim() == 1);
+  CHECK_INPUT(col.dim() == 1);
+  CHECK_INPUT(start.dim() == 1);
+  CHECK_INPUT(walk_length >= 0);
+  CHECK_INPUT(optional_prob.has_value() == optional_alias.has_value());
+
+  rowptr = rowptr.contiguous(), col = col.contiguous();
+  start = start.contiguous();
+
+  torch::Tensor prob, alias;
+  const float *prob_data = nullptr;
+  const int64_t *alias_data = nullptr;
+  if (optional_prob.has_value()) {
+    CHECK_CPU(optional_prob.value());
+    CHECK_CPU(optional_alias.value());
+    CHECK_INPUT(optional_prob.value().numel() == col.numel());
+    CHECK_INPUT(optional_alias.value().numel() == col.numel());
+    prob = optional_prob.value().toType(torch::kFloat).contiguous();
+    alias = optional_alias.value().contiguous();
+    prob_data = prob.data_ptr<float>();
+    alias_data = alias.data_ptr<int64_t>();
+  }
+
+  auto rowptr_data = rowptr.data_ptr<int64_t>();
+  auto col_data = col.data_ptr<int64_t>();
+  auto start_data = start.data_ptr<int64_t>();
+
+  // Sample uniform (or weighted) random walks:
+  rw_num_walks.add(start.numel());
+  rw_num_steps.add(start.numel() * walk_length);
+  stats::Phase walk("torch_cluster::saint_subgraph::walk", rw_walk_ns);
+  auto walks = torch::empty({start.numel() * (walk_length + 1)},
+                            start.options());
+  auto walks_data = walks.data_ptr<int64_t>();
+
+  Walker walker(rowptr_data, col_data, prob_data, alias_data, 1., 1.);
+  uint64_t seed = draw_seed();
+
+  int64_t grain_size =
+      std::max<int64_t>(1, at::internal::GRAIN_SIZE / (walk_length + 1));
+  at::parallel_for(0, start.numel(), grain_size, [&](int64_t begin,
+                                                     int64_t end) {
+    for (int64_t n = begin; n < end; n++) {
+      RandomEngine rng(seed, n);
+      int64_t v = start_data[n], e;
+      walks_data[n * (walk_length + 1)] = v;
+      for (int64_t l = 1; l <= walk_length; l++) {
+        e = walker.propose(v, rng);
+        v = e < 0 ? v : col_data[e];
+        walks_data[n * (walk_length + 1) + l] = v;
+      }
+    }
+  });
+
+  auto node = std::get<0>(walks.sort());
+  node = std::get<0>(torch::unique_consecutive(node));
+  auto node_data = node.data_ptr<int64_t>();
+  int64_t num_nodes = node.numel();
+
+  walk.end();
+
+  // Induce the subgraph in two passes: First, count the number of edges of
+  // each node which point to a node in the subgraph, and then fill them in.
+  stats::Phase induce("torch_cluster::saint_subgraph::induce", rw_induce_ns);
+  auto out_rowptr = torch::zeros({num_nodes + 1}, rowptr.options());
+  auto out_rowptr_data = out_rowptr.data_ptr<int64_t>();
+
+  auto avg_deg = std::max<int64_t>(1, col.numel() / (rowptr.numel() + 1));
+  grain_size = std::max<int64_t>(1, at::internal::GRAIN_SIZE / avg_deg);
+  at::parallel_for(0, num_nodes, grain_size, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      int64_t u = node_data[i], count = 0;
+      for (int64_t e = rowptr_data[u]; e < rowptr_data[u + 1]; e++)
+        count += std::binary_search(node_data, node_data + num_nodes,
+                                    col_data[e]);
+      out_rowptr_data[i + 1] = count;
+    }
+  });
+  out_rowptr = out_rowptr.cumsum(0);
+  out_rowptr_data = out_rowptr.data_ptr<int64_t>();
+
+  int64_t num_edges = out_rowptr_data[num_nodes];
+  auto edge_index = torch::empty({2, num_edges}, col.options());
+  auto edge_id = torch::empty({num_edges}, col.options());
+  auto edge_index_data = edge_index.data_ptr<int64_t>();
+  auto edge_id_data = edge_id.data_ptr<int64_t>();
+
+  at::parallel_for(0, num_nodes, grain_size, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      int64_t u = node_data[i], offset = out_rowptr_data[i];
+      for (int64_t e = rowptr_data[u]; e < rowptr_data[u + 1]; e++) {
+        auto it = std::lower_bound(node_data, node_data + num_nodes,
+                                   col_data[e]);
+        if (it != node_data + num_nodes && *it == col_data[e]) {
+          edge_index_data[offset] = i;
+          edge_index_data[num_edges + offset] = it - node_data;
+          edge_id_data[offset] = e;
+          offset++;
+        }
+      }
+    }
+  });
+
+  return std::make_tuple(node, edge_index, edge_id);
+}
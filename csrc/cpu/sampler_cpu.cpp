@@ -1,46 +1,382 @@
 #include "sampler_cpu.h"
 
+#include <ATen/Parallel.h>
+
+#include <limits>
+
+#include "stats.h"
 #include "utils.h"
 
+// Up to this sample size, Robert Floyd's algorithm with a linear scan over
+// already drawn samples is cheaper than a partial Fisher-Yates shuffle.
+#define FLOYD_THRESHOLD 64
+
+static stats::Counter num_calls("sampler.num_calls");
+static stats::Counter num_nodes("sampler.num_nodes");
+static stats::Counter num_samples("sampler.num_samples");
+static stats::Counter count_ns("sampler.count_ns");
+static stats::Counter sample_ns("sampler.sample_ns");
+static stats::Counter relabel_ns("sampler.relabel_ns");
+
+inline int64_t sample_size(const int64_t num_neighbors, const int64_t count,
+                           const double factor) {
+  int64_t size = count;
+  if (count < 1)
+    size = int64_t(ceil(factor * float(num_neighbors)));
+  if (size > num_neighbors)
+    size = num_neighbors;
+  return size;
+}
+
+// Samples `size` distinct edges out of `[row_start, row_start + num_neighbors)`
+// without replacement into `out`.
+inline void sample_neighbors(int64_t *out, const int64_t row_start,
+                             const int64_t num_neighbors, const int64_t size,
+                             RandomEngine &rng,
+                             std::vector<int64_t> &scratch) {
+  if (size == num_neighbors) {
+    for (int64_t j = 0; j < size; j++)
+      out[j] = row_start + j;
+  } else if (size <= FLOYD_THRESHOLD) {
+    // Robert Floyd's algorithm:
+    for (int64_t j = num_neighbors - size, k = 0; j < num_neighbors;
+         j++, k++) {
+      int64_t sample = row_start + rng.randint(j + 1);
+      if (std::find(out, out + k, sample) != out + k)
+        sample = row_start + j;
+      out[k] = sample;
+    }
+  } else {
+    // Partial Fisher-Yates shuffle:
+    scratch.resize(num_neighbors);
+    for (int64_t j = 0; j < num_neighbors; j++)
+      scratch[j] = j;
+    for (int64_t j = 0; j < size; j++) {
+      std::swap(scratch[j], scratch[j + rng.randint(num_neighbors - j)]);
+      out[j] = row_start + scratch[j];
+    }
+  }
+}
+
+// Samples `size` distinct edges out of `[row_start, row_start + num_neighbors)`
+// without replacement and proportional to `weight` into `out`, based on
+// exponential keys `log(u) / weight` (Efraimidis and Spirakis), of which the
+// `size` largest ones are selected. Edges with zero weight are never sampled.
+// `out_prob` holds the inclusion probability of each sampled edge conditioned
+// on the `(size + 1)`-th largest key `t`, i.e., `1 - exp(weight * t)`, which
+// yields unbiased Horvitz-Thompson estimators (rank conditioning).
+inline void weighted_sample_neighbors(
+    int64_t *out, float *out_prob, const double *weight,
+    const int64_t row_start, const int64_t num_neighbors, const int64_t size,
+    RandomEngine &rng, std::vector<std::pair<double, int64_t>> &scratch) {
+  scratch.clear();
+  for (int64_t j = row_start; j < row_start + num_neighbors; j++) {
+    if (weight[j] > 0)
+      scratch.push_back({std::log(1. - rng.uniform()) / weight[j], j});
+  }
+
+  // All edges with positive weight are sampled with probability one.
+  double threshold = -std::numeric_limits<double>::infinity();
+  if (size < (int64_t)scratch.size()) {
+    std::nth_element(scratch.begin(), scratch.begin() + size, scratch.end(),
+                     std::greater<std::pair<double, int64_t>>());
+    threshold = scratch[size].first;
+  }
+  for (int64_t k = 0; k < size; k++) {
+    out[k] = scratch[k].second;
+    out_prob[k] = (float)-std::expm1(weight[out[k]] * threshold);
+  }
+}
+
+inline int64_t num_positive(const double *weight, const int64_t row_start,
+                            const int64_t row_end) {
+  int64_t out = 0;
+  for (int64_t j = row_start; j < row_end; j++)
+    out += weight[j] > 0;
+  return out;
+}
+
+// Samples neighbors uniformly at random. If `return_prob` is set, the
+// inclusion probability `size / num_neighbors` of each sampled edge is
+// returned as well (and an empty tensor otherwise).
+static std::tuple<torch::Tensor, torch::Tensor>
+uniform_neighbor_sampler(torch::Tensor start, torch::Tensor rowptr,
+                         int64_t count, double factor, bool return_prob) {
+  CHECK_CPU(start);
+  CHECK_CPU(rowptr);
+  CHECK_INPUT(start.dim() == 1);
+  CHECK_INPUT(rowptr.dim() == 1);
+
+  start = start.contiguous(), rowptr = rowptr.contiguous();
+
+  auto start_data = start.data_ptr<int64_t>();
+  auto rowptr_data = rowptr.data_ptr<int64_t>();
+  int64_t numel = start.numel();
+
+  // Compute the number of samples per node first, so that all nodes can be
+  // sampled in parallel directly into the output.
+  num_calls.add(1);
+  num_nodes.add(numel);
+  stats::Phase count_phase("torch_cluster::sampler::count", count_ns);
+  auto out_ptr = torch::zeros({numel + 1}, start.options());
+  auto out_ptr_data = out_ptr.data_ptr<int64_t>();
+  at::parallel_for(0, numel, at::internal::GRAIN_SIZE, [&](int64_t begin,
+                                                           int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      auto num_neighbors =
+          rowptr_data[start_data[i] + 1] - rowptr_data[start_data[i]];
+      out_ptr_data[i + 1] = sample_size(num_neighbors, count, factor);
+    }
+  });
+  out_ptr = out_ptr.cumsum(0);
+  out_ptr_data = out_ptr.data_ptr<int64_t>();
+  count_phase.end();
+
+  stats::Phase sample("torch_cluster::sampler::sample", sample_ns);
+  num_samples.add(out_ptr_data[numel]);
+
+  auto e_id = torch::empty({out_ptr_data[numel]}, start.options());
+  auto e_id_data = e_id.data_ptr<int64_t>();
+  auto prob = torch::empty({return_prob ? out_ptr_data[numel] : 0},
+                           start.options().dtype(torch::kFloat));
+  auto prob_data = prob.data_ptr<float>();
+
+  uint64_t seed = draw_seed();
+
+  int64_t grain_size = std::max<int64_t>(
+      1, at::internal::GRAIN_SIZE * numel / (out_ptr_data[numel] + 1));
+  at::parallel_for(0, numel, grain_size, [&](int64_t begin, int64_t end) {
+    std::vector<int64_t> scratch;
+
+    for (int64_t i = begin; i < end; i++) {
+      RandomEngine rng(seed, i);
+      auto row_start = rowptr_data[start_data[i]];
+      auto num_neighbors = rowptr_data[start_data[i] + 1] - row_start;
+      auto size = out_ptr_data[i + 1] - out_ptr_data[i];
+      sample_neighbors(e_id_data + out_ptr_data[i], row_start, num_neighbors,
+                       size, rng, scratch);
+      if (return_prob) {
+        for (int64_t j = out_ptr_data[i]; j < out_ptr_data[i + 1]; j++)
+          prob_data[j] = (float)size / num_neighbors;
+      }
+    }
+  });
+
+  return std::make_tuple(e_id, prob);
+}
+
 torch::Tensor neighbor_sampler_cpu(torch::Tensor start, torch::Tensor rowptr,
                                    int64_t count, double factor) {
+  return std::get<0>(
+      uniform_neighbor_sampler(start, rowptr, count, factor, false));
+}
+
+std::tuple<torch::Tensor, torch::Tensor>
+neighbor_sampler_prob_cpu(torch::Tensor start, torch::Tensor rowptr,
+                          int64_t count, double factor) {
+  return uniform_neighbor_sampler(start, rowptr, count, factor, true);
+}
+
+inline torch::Tensor check_weight(torch::Tensor rowptr, torch::Tensor weight) {
+  CHECK_CPU(weight);
+  CHECK_INPUT(weight.dim() == 1);
+  CHECK_INPUT(weight.numel() == rowptr[-1].data_ptr<int64_t>()[0]);
+  weight = weight.toType(torch::kDouble).contiguous();
+  AT_ASSERTM((weight >= 0).all().data_ptr<bool>()[0],
+             "Edge weights need to be non-negative");
+  return weight;
+}
+
+std::tuple<torch::Tensor, torch::Tensor>
+weighted_neighbor_sampler_cpu(torch::Tensor start, torch::Tensor rowptr,
+                              torch::Tensor weight, int64_t count,
+                              double factor) {
+  CHECK_CPU(start);
+  CHECK_CPU(rowptr);
+  CHECK_INPUT(start.dim() == 1);
+  CHECK_INPUT(rowptr.dim() == 1);
+
+  start = start.contiguous(), rowptr = rowptr.contiguous();
+  weight = check_weight(rowptr, weight);
 
   auto start_data = start.data_ptr<int64_t>();
   auto rowptr_data = rowptr.data_ptr<int64_t>();
+  auto weight_data = weight.data_ptr<double>();
+  int64_t numel = start.numel();
+
+  num_calls.add(1);
+  num_nodes.add(numel);
+  stats::Phase count_phase("torch_cluster::sampler::count", count_ns);
+  auto out_ptr = torch::zeros({numel + 1}, start.options());
+  auto out_ptr_data = out_ptr.data_ptr<int64_t>();
+  at::parallel_for(0, numel, at::internal::GRAIN_SIZE, [&](int64_t begin,
+                                                           int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      auto num_neighbors =
+          num_positive(weight_data, rowptr_data[start_data[i]],
+                       rowptr_data[start_data[i] + 1]);
+      out_ptr_data[i + 1] = sample_size(num_neighbors, count, factor);
+    }
+  });
+  out_ptr = out_ptr.cumsum(0);
+  out_ptr_data = out_ptr.data_ptr<int64_t>();
+  count_phase.end();
+
+  stats::Phase sample("torch_cluster::sampler::sample", sample_ns);
+  num_samples.add(out_ptr_data[numel]);
+
+  auto e_id = torch::empty({out_ptr_data[numel]}, start.options());
+  auto prob = torch::empty({out_ptr_data[numel]},
+                           start.options().dtype(torch::kFloat));
+  auto e_id_data = e_id.data_ptr<int64_t>();
+  auto prob_data = prob.data_ptr<float>();
+
+  uint64_t seed = draw_seed();
+
+  int64_t avg_deg = std::max<int64_t>(1, weight.numel() / rowptr.numel());
+  int64_t grain_size =
+      std::max<int64_t>(1, at::internal::GRAIN_SIZE / avg_deg);
+  at::parallel_for(0, numel, grain_size, [&](int64_t begin, int64_t end) {
+    std::vector<std::pair<double, int64_t>> scratch;
+
+    for (int64_t i = begin; i < end; i++) {
+      RandomEngine rng(seed, i);
+      auto row_start = rowptr_data[start_data[i]];
+      auto num_neighbors = rowptr_data[start_data[i] + 1] - row_start;
+      weighted_sample_neighbors(
+          e_id_data + out_ptr_data[i], prob_data + out_ptr_data[i],
+          weight_data, row_start, num_neighbors,
+          out_ptr_data[i + 1] - out_ptr_data[i], rng, scratch);
+    }
+  });
 
-  std::vector<int64_t> e_ids;
-  for (auto i = 0; i < start.size(0); i++) {
-    auto row_start = rowptr_data[start_data[i]];
-    auto row_end = rowptr_data[start_data[i] + 1];
-    auto num_neighbors = row_end - row_start;
-
-    int64_t size = count;
-    if (count < 1)
-      size = int64_t(ceil(factor * float(num_neighbors)));
-    if (size > num_neighbors)
-      size = num_neighbors;
-
-    // If the number of neighbors is approximately equal to the number of
-    // neighbors which are requested, we use `randperm` to sample without
-    // replacement, otherwise we sample random numbers into a set as long
-    // as necessary.
-    std::unordered_set<int64_t> set;
-    if (size < 0.7 * float(num_neighbors)) {
-      while (int64_t(set.size()) < size) {
-        int64_t sample = rand() % num_neighbors;
-        set.insert(sample + row_start);
+  return std::make_tuple(e_id, prob);
+}
+
+// Samples a multi-hop neighborhood of `seed`, where `sizes[l]` denotes the
+// maximum number of neighbors to sample for each node in hop `l` (`-1` for
+// all neighbors). Each hop samples neighbors of all nodes discovered so far,
+// and the sampled edges of every hop are returned as a relabeled block in CSR
+// format, whose node indices refer to the hop-specific `node` output.
+// If `optional_weight` is given, neighbors are sampled proportional to it.
+// The inclusion probability of each sampled edge is returned as well.
+// Sampling is done in parallel, while relabeling is done sequentially in
+// order to produce a deterministic node order.
+std::tuple<std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+           std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+           std::vector<torch::Tensor>>
+multi_hop_sampler_cpu(torch::Tensor rowptr, torch::Tensor col,
+                      torch::optional<torch::Tensor> optional_weight,
+                      torch::Tensor seed, std::vector<int64_t> sizes) {
+  CHECK_CPU(rowptr);
+  CHECK_CPU(col);
+  CHECK_CPU(seed);
+  CHECK_INPUT(rowptr.dim() == 1);
+  CHECK_INPUT(col.dim() == 1);
+  CHECK_INPUT(seed.dim() == 1);
+
+  rowptr = rowptr.contiguous(), col = col.contiguous();
+  seed = seed.contiguous();
+
+  auto rowptr_data = rowptr.data_ptr<int64_t>();
+  auto col_data = col.data_ptr<int64_t>();
+  auto seed_data = seed.data_ptr<int64_t>();
+
+  torch::Tensor weight;
+  const double *weight_data = nullptr;
+  if (optional_weight.has_value()) {
+    weight = check_weight(rowptr, optional_weight.value());
+    weight_data = weight.data_ptr<double>();
+  }
+
+  std::vector<int64_t> node(seed_data, seed_data + seed.numel());
+  std::unordered_map<int64_t, int64_t> to_local;
+  for (int64_t i = 0; i < (int64_t)node.size(); i++)
+    to_local.insert({node[i], i});
+
+  std::vector<torch::Tensor> out_node, out_rowptr, out_col, out_e_id,
+      out_prob;
+  uint64_t rng_seed = draw_seed();
+  int64_t stream_offset = 0;
+  num_calls.add(1);
+
+  for (const auto size : sizes) {
+    CHECK_INPUT(size >= -1);
+    int64_t num_dst = node.size();
+    num_nodes.add(num_dst);
+
+    stats::Phase count_phase("torch_cluster::sampler::count", count_ns);
+    auto ptr = torch::zeros({num_dst + 1}, rowptr.options());
+    auto ptr_data = ptr.data_ptr<int64_t>();
+    at::parallel_for(0, num_dst, at::internal::GRAIN_SIZE, [&](int64_t begin,
+                                                               int64_t end) {
+      for (int64_t i = begin; i < end; i++) {
+        auto num_neighbors = rowptr_data[node[i] + 1] - rowptr_data[node[i]];
+        if (weight_data != nullptr)
+          num_neighbors = num_positive(weight_data, rowptr_data[node[i]],
+                                       rowptr_data[node[i] + 1]);
+        ptr_data[i + 1] =
+            size < 0 ? num_neighbors : std::min(size, num_neighbors);
       }
-      std::vector<int64_t> v(set.begin(), set.end());
-      e_ids.insert(e_ids.end(), v.begin(), v.end());
-    } else {
-      auto sample = torch::randperm(num_neighbors, start.options());
-      auto sample_data = sample.data_ptr<int64_t>();
-      for (auto j = 0; j < size; j++) {
-        e_ids.push_back(sample_data[j] + row_start);
+    });
+    ptr = ptr.cumsum(0);
+    ptr_data = ptr.data_ptr<int64_t>();
+    count_phase.end();
+
+    stats::Phase sample("torch_cluster::sampler::sample", sample_ns);
+    int64_t num_edges = ptr_data[num_dst];
+    num_samples.add(num_edges);
+    auto e_id = torch::empty({num_edges}, col.options());
+    auto prob = torch::empty({num_edges}, col.options().dtype(torch::kFloat));
+    auto e_id_data = e_id.data_ptr<int64_t>();
+    auto prob_data = prob.data_ptr<float>();
+
+    int64_t grain_size = std::max<int64_t>(
+        1, at::internal::GRAIN_SIZE * num_dst / (num_edges + 1));
+    at::parallel_for(0, num_dst, grain_size, [&](int64_t begin, int64_t end) {
+      std::vector<int64_t> scratch;
+      std::vector<std::pair<double, int64_t>> weighted_scratch;
+
+      for (int64_t i = begin; i < end; i++) {
+        RandomEngine rng(rng_seed, stream_offset + i);
+        auto row_start = rowptr_data[node[i]];
+        auto num_neighbors = rowptr_data[node[i] + 1] - row_start;
+        auto size = ptr_data[i + 1] - ptr_data[i];
+        if (weight_data != nullptr) {
+          weighted_sample_neighbors(e_id_data + ptr_data[i],
+                                    prob_data + ptr_data[i], weight_data,
+                                    row_start, num_neighbors, size, rng,
+                                    weighted_scratch);
+        } else {
+          sample_neighbors(e_id_data + ptr_data[i], row_start, num_neighbors,
+                           size, rng, scratch);
+          for (int64_t j = ptr_data[i]; j < ptr_data[i + 1]; j++)
+            prob_data[j] = (float)size / num_neighbors;
+        }
       }
+    });
+    stream_offset += num_dst;
+    sample.end();
+
+    stats::Phase relabel("torch_cluster::sampler::relabel", relabel_ns);
+    auto local_col = torch::empty({num_edges}, col.options());
+    auto local_col_data = local_col.data_ptr<int64_t>();
+    for (int64_t j = 0; j < num_edges; j++) {
+      auto c = col_data[e_id_data[j]];
+      auto res = to_local.insert({c, (int64_t)node.size()});
+      if (res.second)
+        node.push_back(c);
+      local_col_data[j] = res.first->second;
     }
+
+    int64_t num_nodes = node.size();
+    out_node.push_back(
+        torch::from_blob(node.data(), {num_nodes}, seed.options()).clone());
+    out_rowptr.push_back(ptr);
+    out_col.push_back(local_col);
+    out_e_id.push_back(e_id);
+    out_prob.push_back(prob);
   }
 
-  int64_t length = e_ids.size();
-  return torch::from_blob(e_ids.data(), {length}, start.options()).clone();
+  return std::make_tuple(out_node, out_rowptr, out_col, out_e_id, out_prob);
 }
@@ -4,3 +4,19 @@
 
 torch::Tensor neighbor_sampler_cpu(torch::Tensor start, torch::Tensor rowptr,
                                    int64_t count, double factor);
+
+std::tuple<torch::Tensor, torch::Tensor>
+neighbor_sampler_prob_cpu(torch::Tensor start, torch::Tensor rowptr,
+                          int64_t count, double factor);
+
+std::tuple<torch::Tensor, torch::Tensor>
+weighted_neighbor_sampler_cpu(torch::Tensor start, torch::Tensor rowptr,
+                              torch::Tensor weight, int64_t count,
+                              double factor);
+
+std::tuple<std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+           std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+           std::vector<torch::Tensor>>
+multi_hop_sampler_cpu(torch::Tensor rowptr, torch::Tensor col,
+                      torch::optional<torch::Tensor> optional_weight,
+                      torch::Tensor seed, std::vector<int64_t> sizes);
@@ -0,0 +1,70 @@
+#pragma once
+
+#include <ATen/Parallel.h>
+
+#include <algorithm>
+#include <limits>
+#include <numeric>
+
+#include "utils.h"
+
+// A search index for 1-D points (e.g., timestamps), which replaces KD-trees
+// by binary searches on points sorted within each example. Inputs that are
+// already sorted (the common case for time series) are used without a copy.
+template <typename scalar_t> struct Sorted1D {
+  const scalar_t *data;
+  const int64_t *perm; // Maps sorted positions to point indices (or nullptr).
+  std::vector<scalar_t> sorted_data;
+  std::vector<int64_t> sorted_perm;
+
+  Sorted1D(const scalar_t *x_data, const int64_t *ptr_data,
+           int64_t batch_size)
+      : data(x_data), perm(nullptr) {
+    bool is_sorted = true;
+    for (int64_t b = 0; b < batch_size && is_sorted; b++)
+      is_sorted =
+          std::is_sorted(x_data + ptr_data[b], x_data + ptr_data[b + 1]);
+    if (is_sorted)
+      return;
+
+    auto num_points = ptr_data[batch_size];
+    sorted_perm.resize(num_points);
+    sorted_data.resize(num_points);
+    std::iota(sorted_perm.begin(), sorted_perm.end(), 0);
+    at::parallel_for(0, batch_size, 1, [&](int64_t begin, int64_t end) {
+      for (int64_t b = begin; b < end; b++) {
+        auto first = sorted_perm.begin() + ptr_data[b];
+        auto last = sorted_perm.begin() + ptr_data[b + 1];
+        std::sort(first, last, [&](int64_t i, int64_t j) {
+          return x_data[i] < x_data[j];
+        });
+        for (auto i = ptr_data[b]; i < ptr_data[b + 1]; i++)
+          sorted_data[i] = x_data[sorted_perm[i]];
+      }
+    });
+    data = sorted_data.data(), perm = sorted_perm.data();
+  }
+
+  // Visits the points of example `[start, end)` in order of their distance to
+  // `query` (by merging the windows to its left and right), until
+  // `fn(index, dist)` returns `false`.
+  template <typename acc_t, typename F>
+  inline void visit(int64_t start, int64_t end, acc_t query, F fn) const {
+    auto right = std::lower_bound(data + start, data + end, query,
+                                  [](const scalar_t &value, acc_t q) {
+                                    return (acc_t)value < q;
+                                  }) -
+                 data;
+    auto left = right - 1;
+
+    const auto inf = std::numeric_limits<acc_t>::max();
+    while (left >= start || right < end) {
+      acc_t left_dist = left >= start ? query - (acc_t)data[left] : inf;
+      acc_t right_dist = right < end ? (acc_t)data[right] - query : inf;
+      auto pos = left_dist <= right_dist ? left-- : right++;
+      auto dist = std::min(left_dist, right_dist);
+      if (!fn(perm ? perm[pos] : pos, dist))
+        return;
+    }
+  }
+};
@@ -0,0 +1,95 @@
+#pragma once
+
+#include <ATen/record_function.h>
+#include <torch/script.h>
+
+#include <atomic>
+#include <chrono>
+#include <vector>
+
+// Light-weight instrumentation of native kernels, consisting of
+// (1) named sub-ranges of operators, which show up in `torch.profiler`, and
+// (2) opt-in counters, which are exposed via `torch_cluster.stats()`.
+// While disabled, counters only cost a relaxed atomic load.
+namespace stats {
+
+inline std::atomic<bool> &enabled_flag() {
+  static std::atomic<bool> flag(false);
+  return flag;
+}
+
+inline bool enabled() {
+  return enabled_flag().load(std::memory_order_relaxed);
+}
+
+struct Counter;
+
+// All counters of an extension library, registered on library load.
+inline std::vector<Counter *> &counters() {
+  static std::vector<Counter *> counters;
+  return counters;
+}
+
+struct Counter {
+  const char *name;
+  std::atomic<int64_t> value;
+
+  explicit Counter(const char *name) : name(name), value(0) {
+    counters().push_back(this);
+  }
+
+  inline void add(int64_t count) {
+    if (enabled())
+      value.fetch_add(count, std::memory_order_relaxed);
+  }
+};
+
+// Marks a phase of a kernel as a profiler range named `name`, and adds its
+// wall time in nanoseconds to `time_ns`. For phases that run in parallel,
+// times are summed over threads.
+class Phase {
+public:
+  Phase(const char *name, Counter &time_ns)
+      : guard(at::RecordScope::USER_SCOPE), time_ns(time_ns),
+        active(enabled()) {
+    if (guard.isActive())
+      guard.before(name, c10::ArrayRef<const c10::IValue>());
+    if (active)
+      start = std::chrono::steady_clock::now();
+  }
+
+  ~Phase() { end(); }
+
+  // Ends the phase before the end of its scope.
+  void end() {
+    guard.end();
+    if (!active)
+      return;
+    active = false;
+    auto duration = std::chrono::steady_clock::now() - start;
+    time_ns.value.fetch_add(
+        std::chrono::duration_cast<std::chrono::nanoseconds>(duration)
+            .count(),
+        std::memory_order_relaxed);
+  }
+
+private:
+  at::RecordFunction guard;
+  Counter &time_ns;
+  bool active;
+  std::chrono::steady_clock::time_point start;
+};
+
+// Returns the current values of all counters, and optionally resets them.
+inline c10::Dict<std::string, int64_t> collect(bool reset) {
+  c10::Dict<std::string, int64_t> out;
+  for (auto counter : counters())
+    out.insert(counter->name,
+               reset ? counter->value.exchange(0) : counter->value.load());
+  return out;
+}
+
+// Enables or disables counting, and returns the previous state.
+inline bool enable(bool enabled) { return enabled_flag().exchange(enabled); }
+
+} // namespace stats
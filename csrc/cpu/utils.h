@@ -1,8 +1,92 @@
 #pragma once
 
+#include <ATen/Parallel.h>
+
 #include "../extensions.h"
 
 #define CHECK_CPU(x) AT_ASSERTM(x.device().is_cpu(), #x " must be CPU tensor")
 #define CHECK_INPUT(x) AT_ASSERTM(x, "Input mismatch")
 #define CHECK_CONTIGUOUS(x)                                                    \
   AT_ASSERTM(x.is_contiguous(), #x " must be contiguous")
+
+// Draws a seed from the default PyTorch generator, so that results are
+// reproducible via `torch.manual_seed`.
+inline uint64_t draw_seed() {
+  auto seed = torch::randint(std::numeric_limits<int64_t>::max(), {1},
+                             torch::TensorOptions().dtype(torch::kLong));
+  return (uint64_t)seed.data_ptr<int64_t>()[0];
+}
+
+// A light-weight SplitMix64 engine. Each work item (e.g., a random walker)
+// owns its own stream derived from a global seed and its index, which makes
+// sampling thread-safe and independent of the number of threads in use.
+struct RandomEngine {
+  uint64_t state;
+
+  RandomEngine(uint64_t seed, uint64_t idx)
+      : state(seed ^ (idx * 0x9E3779B97F4A7C15ULL)) {
+    next();
+  }
+
+  inline uint64_t next() {
+    uint64_t z = (state += 0x9E3779B97F4A7C15ULL);
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+    return z ^ (z >> 31);
+  }
+
+  // Returns a random number in [0, 1).
+  inline double uniform() {
+    return (next() >> 11) * (1.0 / 9007199254740992.0);
+  }
+
+  // Returns a random integer in [0, n).
+  inline int64_t randint(int64_t n) {
+    return (int64_t)(next() % (uint64_t)n);
+  }
+};
+
+// Checks that `ptr` describes valid example boundaries of `num_items` items,
+// e.g., `ptr = [0, 2, 5, 6]` for `num_items = 6`.
+inline void check_ptr(torch::Tensor ptr, int64_t num_items) {
+  CHECK_INPUT(ptr.dim() == 1 && ptr.numel() > 0);
+  CHECK_INPUT(ptr.scalar_type() == torch::kLong);
+  ptr = ptr.contiguous();
+  auto ptr_data = ptr.data_ptr<int64_t>();
+  auto size = ptr.numel();
+  AT_ASSERTM(ptr_data[0] == 0 && ptr_data[size - 1] == num_items,
+             "'ptr' does not describe all ", num_items, " items");
+  for (int64_t i = 0; i < size - 1; i++)
+    AT_ASSERTM(ptr_data[i] <= ptr_data[i + 1], "'ptr' is not sorted");
+}
+
+// Runs `fn(i, b, out)` for all queries `i` in parallel, where `b` denotes the
+// example of query `i` according to `ptr_y_data`. Pairs collected in `out`
+// are appended to `out_vec` in order of queries, independent of the number of
+// threads.
+template <typename F>
+void parallel_queries(const int64_t *ptr_y_data, int64_t batch_size,
+                      int64_t num_queries, std::vector<size_t> &out_vec,
+                      F fn) {
+  auto num_chunks =
+      std::min(num_queries, (int64_t)at::get_num_threads() * 4);
+  std::vector<std::vector<size_t>> chunk_vec(num_chunks);
+
+  at::parallel_for(0, num_chunks, 1, [&](int64_t begin, int64_t end) {
+    for (int64_t c = begin; c < end; c++) {
+      auto i_start = c * num_queries / num_chunks;
+      auto i_end = (c + 1) * num_queries / num_chunks;
+      int64_t b = std::upper_bound(ptr_y_data, ptr_y_data + batch_size,
+                                   i_start) -
+                  ptr_y_data - 1;
+      for (auto i = i_start; i < i_end; i++) {
+        while (i >= ptr_y_data[b + 1])
+          b++;
+        fn(i, b, chunk_vec[c]);
+      }
+    }
+  });
+
+  for (auto &vec : chunk_vec)
+    out_vec.insert(out_vec.end(), vec.begin(), vec.end());
+}
@@ -0,0 +1,18 @@
+#pragma once
+
+#include <cstddef>
+
+// A nanoflann dataset adaptor that operates directly on a slice of a
+// contiguous `[N, D]` tensor, so that points do not need to be copied.
+template <typename scalar_t> struct PointCloud {
+  const scalar_t *data;
+  size_t num_points, dim;
+
+  inline size_t kdtree_get_point_count() const { return num_points; }
+
+  inline scalar_t kdtree_get_pt(const size_t idx, const size_t d) const {
+    return data[idx * dim + d];
+  }
+
+  template <class BBOX> bool kdtree_get_bbox(BBOX &) const { return false; }
+};
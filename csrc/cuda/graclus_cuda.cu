@@ -40,7 +40,7 @@ bool colorize(torch::Tensor out) {
 
 __global__ void propose_kernel(int64_t *out, int64_t *proposal,
                                const int64_t *rowptr, const int64_t *col,
-                               int64_t numel) {
+                               const float *rand, int64_t numel) {
 
   const int64_t thread_idx = blockIdx.x * blockDim.x + threadIdx.x;
   if (thread_idx < numel) {
@@ -49,8 +49,16 @@ __global__ void propose_kernel(int64_t *out, int64_t *proposal,
 
     bool has_unmatched_neighbor = false;
 
-    for (int64_t i = rowptr[thread_idx]; i < rowptr[thread_idx + 1]; i++) {
-      auto v = col[i];
+    // Scan neighbors starting from a random offset.
+    int64_t row_start = rowptr[thread_idx];
+    int64_t deg = rowptr[thread_idx + 1] - row_start;
+    int64_t offset = min((int64_t)(rand[thread_idx] * deg), deg - 1);
+
+    for (int64_t j = 0; j < deg; j++) {
+      auto v = col[row_start + (offset + j) % deg];
+
+      if (v == thread_idx)
+        continue; // Skip self-loops.
 
       if (out[v] < 0)
         has_unmatched_neighbor = true; // Unmatched neighbor found.
@@ -84,6 +92,9 @@ __global__ void weighted_propose_kernel(int64_t *out, int64_t *proposal,
     for (int64_t i = rowptr[thread_idx]; i < rowptr[thread_idx + 1]; i++) {
       auto v = col[i];
 
+      if (v == thread_idx)
+        continue; // Skip self-loops.
+
       if (out[v] < 0)
         has_unmatched_neighbor = true; // Unmatched neighbor found.
 
@@ -108,9 +119,11 @@ void propose(torch::Tensor out, torch::Tensor proposal, torch::Tensor rowptr,
   auto stream = at::cuda::getCurrentCUDAStream();
 
   if (!optional_weight.has_value()) {
+    auto rand = torch::rand(out.numel(), out.options().dtype(torch::kFloat));
     propose_kernel<<<BLOCKS(out.numel()), THREADS, 0, stream>>>(
         out.data_ptr<int64_t>(), proposal.data_ptr<int64_t>(),
-        rowptr.data_ptr<int64_t>(), col.data_ptr<int64_t>(), out.numel());
+        rowptr.data_ptr<int64_t>(), col.data_ptr<int64_t>(),
+        rand.data_ptr<float>(), out.numel());
   } else {
     auto weight = optional_weight.value();
     auto scalar_type = weight.scalar_type();
@@ -137,6 +150,9 @@ __global__ void respond_kernel(int64_t *out, const int64_t *proposal,
     for (int64_t i = rowptr[thread_idx]; i < rowptr[thread_idx + 1]; i++) {
       auto v = col[i];
 
+      if (v == thread_idx)
+        continue; // Skip self-loops.
+
       if (out[v] < 0)
         has_unmatched_neighbor = true; // Unmatched neighbor found.
 
@@ -170,6 +186,9 @@ __global__ void weighted_respond_kernel(int64_t *out, const int64_t *proposal,
     for (int64_t i = rowptr[thread_idx]; i < rowptr[thread_idx + 1]; i++) {
       auto v = col[i];
 
+      if (v == thread_idx)
+        continue; // Skip self-loops.
+
       if (out[v] < 0)
         has_unmatched_neighbor = true; // Unmatched neighbor found.
 
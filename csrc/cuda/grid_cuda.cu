@@ -24,9 +24,70 @@ __global__ void grid_kernel(const scalar_t *pos, const scalar_t *size,
   }
 }
 
+// Reduces `pos` over all points of the same example via `amin` or `amax`.
+static torch::Tensor batch_reduce(torch::Tensor pos, torch::Tensor batch,
+                                  int64_t batch_size, std::string reduce) {
+  auto index = batch.view({-1, 1}).expand_as(pos);
+  return torch::zeros({batch_size, pos.size(1)}, pos.options())
+      .scatter_reduce_(0, index, pos, reduce, /*include_self=*/false);
+}
+
+template <typename scalar_t>
+__global__ void grid_batch_kernel(const scalar_t *pos, const scalar_t *size,
+                                  const scalar_t *start, const int64_t *batch,
+                                  const int64_t *stride, const int64_t *offset,
+                                  int64_t *out, int64_t D, int64_t numel) {
+  const int64_t thread_idx = blockIdx.x * blockDim.x + threadIdx.x;
+
+  if (thread_idx < numel) {
+    auto b = batch[thread_idx];
+    auto c = offset[b];
+    for (int64_t d = 0; d < D; d++) {
+      scalar_t p = pos[thread_idx * D + d] - start[b * D + d];
+      c += (int64_t)(p / size[d]) * stride[b * D + d];
+    }
+    out[thread_idx] = c;
+  }
+}
+
+// Computes voxel indices of a batch of point clouds (see `grid_batch_cpu` in
+// `grid_cpu.cpp`).
+torch::Tensor grid_batch_cuda(torch::Tensor pos, torch::Tensor size,
+                              torch::Tensor start, torch::Tensor end,
+                              torch::Tensor batch) {
+  auto N = pos.size(0), D = pos.size(1);
+
+  auto num_voxels = (end - start).true_divide(size.view({1, -1}));
+  num_voxels = num_voxels.toType(torch::kLong) + 1;
+  auto stride = num_voxels.cumprod(1).narrow(1, 0, D - 1);
+  stride = torch::cat({torch::ones_like(num_voxels.narrow(1, 0, 1)), stride},
+                      1);
+  auto offset = num_voxels.prod(1).cumsum(0) - num_voxels.prod(1);
+
+  pos = pos.contiguous(), batch = batch.contiguous();
+  start = start.toType(pos.scalar_type()).contiguous();
+  size = size.toType(pos.scalar_type()).contiguous();
+  stride = stride.contiguous();
+
+  auto out = torch::empty({N}, batch.options());
+
+  auto stream = at::cuda::getCurrentCUDAStream();
+  AT_DISPATCH_ALL_TYPES_AND(at::ScalarType::Half, pos.scalar_type(), "_", [&] {
+    grid_batch_kernel<scalar_t><<<BLOCKS(N), THREADS, 0, stream>>>(
+        pos.data_ptr<scalar_t>(), size.data_ptr<scalar_t>(),
+        start.data_ptr<scalar_t>(), batch.data_ptr<int64_t>(),
+        stride.data_ptr<int64_t>(), offset.data_ptr<int64_t>(),
+        out.data_ptr<int64_t>(), D, N);
+  });
+
+  return out;
+}
+
 torch::Tensor grid_cuda(torch::Tensor pos, torch::Tensor size,
                         torch::optional<torch::Tensor> optional_start,
-                        torch::optional<torch::Tensor> optional_end) {
+                        torch::optional<torch::Tensor> optional_end,
+                        torch::optional<torch::Tensor> optional_batch,
+                        torch::optional<int64_t> optional_batch_size) {
   CHECK_CUDA(pos);
   CHECK_CUDA(size);
   cudaSetDevice(pos.get_device());
@@ -41,6 +102,26 @@ torch::Tensor grid_cuda(torch::Tensor pos, torch::Tensor size,
 
   CHECK_INPUT(size.numel() == pos.size(1));
 
+  if (optional_batch.has_value()) {
+    auto batch = optional_batch.value();
+    CHECK_CUDA(batch);
+    CHECK_INPUT(batch.numel() == pos.size(0));
+    if (pos.size(0) == 0)
+      return torch::empty({0}, batch.options());
+
+    auto batch_size = optional_batch_size.has_value()
+                          ? optional_batch_size.value()
+                          : batch.max().item<int64_t>() + 1;
+    auto shape = std::vector<int64_t>{batch_size, pos.size(1)};
+    auto start = optional_start.has_value()
+                     ? optional_start.value().view({1, -1}).expand(shape)
+                     : batch_reduce(pos, batch, batch_size, "amin");
+    auto end = optional_end.has_value()
+                   ? optional_end.value().view({1, -1}).expand(shape)
+                   : batch_reduce(pos, batch, batch_size, "amax");
+    return grid_batch_cuda(pos, size, start, end, batch);
+  }
+
   if (!optional_start.has_value())
     optional_start = std::get<0>(pos.min(0));
   else {
@@ -70,3 +151,215 @@ torch::Tensor grid_cuda(torch::Tensor pos, torch::Tensor size,
 
   return out;
 }
+
+__device__ __forceinline__ uint64_t hash_key(const int64_t *key, int64_t K) {
+  uint64_t z = 0;
+  for (int64_t k = 0; k < K; k++) {
+    z = (z ^ (uint64_t)key[k]) * 0x9E3779B97F4A7C15ULL;
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+    z = z ^ (z >> 31);
+  }
+  return z;
+}
+
+__device__ __forceinline__ bool equal_key(const int64_t *key, int64_t i,
+                                          int64_t j, int64_t K) {
+  for (int64_t k = 0; k < K; k++) {
+    if (key[i * K + k] != key[j * K + k])
+      return false;
+  }
+  return true;
+}
+
+__global__ void insert_kernel(const int64_t *key, int64_t *table,
+                              int64_t *slot, int64_t K, int64_t mask,
+                              int64_t numel) {
+  const int64_t thread_idx = blockIdx.x * blockDim.x + threadIdx.x;
+
+  if (thread_idx < numel) {
+    auto table_ptr = (unsigned long long int *)table;
+    int64_t s = (int64_t)(hash_key(key + thread_idx * K, K) & mask);
+    while (true) {
+      auto cur = (int64_t)atomicCAS(table_ptr + s, (unsigned long long int)-1,
+                                    (unsigned long long int)thread_idx);
+      if (cur == -1)
+        break;
+      if (equal_key(key, cur, thread_idx, K)) {
+        atomicMin(table_ptr + s, (unsigned long long int)thread_idx);
+        break;
+      }
+      s = (s + 1) & mask;
+    }
+    slot[thread_idx] = s;
+  }
+}
+
+__global__ void is_first_kernel(const int64_t *table, const int64_t *slot,
+                                int64_t *is_first, int64_t numel) {
+  const int64_t thread_idx = blockIdx.x * blockDim.x + threadIdx.x;
+
+  if (thread_idx < numel)
+    is_first[thread_idx] = table[slot[thread_idx]] == thread_idx;
+}
+
+__global__ void assign_kernel(const int64_t *table, const int64_t *slot,
+                              const int64_t *is_first, const int64_t *id,
+                              int64_t *cluster, int64_t *first,
+                              int64_t numel) {
+  const int64_t thread_idx = blockIdx.x * blockDim.x + threadIdx.x;
+
+  if (thread_idx < numel) {
+    auto c = id[table[slot[thread_idx]]] - 1;
+    cluster[thread_idx] = c;
+    if (is_first[thread_idx])
+      first[c] = thread_idx;
+  }
+}
+
+// Assigns consecutive cluster indices to all rows of `key` that hold the same
+// values, in order of their first occurrence (see `consecutive_cluster` in
+// `grid_cpu.cpp`).
+static std::tuple<torch::Tensor, torch::Tensor>
+consecutive_cluster(torch::Tensor key) {
+  key = key.contiguous();
+  auto N = key.size(0), K = key.size(1);
+
+  int64_t num_slots = 1;
+  while (num_slots < 2 * N)
+    num_slots <<= 1;
+
+  auto table = torch::full({num_slots}, -1, key.options());
+  auto slot = torch::empty({N}, key.options());
+  auto is_first = torch::empty({N}, key.options());
+
+  auto stream = at::cuda::getCurrentCUDAStream();
+  if (N > 0) {
+    insert_kernel<<<BLOCKS(N), THREADS, 0, stream>>>(
+        key.data_ptr<int64_t>(), table.data_ptr<int64_t>(),
+        slot.data_ptr<int64_t>(), K, num_slots - 1, N);
+    is_first_kernel<<<BLOCKS(N), THREADS, 0, stream>>>(
+        table.data_ptr<int64_t>(), slot.data_ptr<int64_t>(),
+        is_first.data_ptr<int64_t>(), N);
+  }
+
+  auto id = is_first.cumsum(0);
+  int64_t num_clusters = N > 0 ? id[-1].item<int64_t>() : 0;
+
+  auto cluster = torch::empty({N}, key.options());
+  auto first = torch::empty({num_clusters}, key.options());
+  if (N > 0) {
+    assign_kernel<<<BLOCKS(N), THREADS, 0, stream>>>(
+        table.data_ptr<int64_t>(), slot.data_ptr<int64_t>(),
+        is_first.data_ptr<int64_t>(), id.data_ptr<int64_t>(),
+        cluster.data_ptr<int64_t>(), first.data_ptr<int64_t>(), N);
+  }
+
+  return std::make_tuple(cluster, first);
+}
+
+// Returns the integer voxel coordinates of each point relative to `start`,
+// which defaults to the minimum position of each example in `batch`.
+static torch::Tensor
+voxel_coords(torch::Tensor pos, torch::Tensor size,
+             torch::optional<torch::Tensor> optional_start,
+             torch::optional<torch::Tensor> optional_batch) {
+  CHECK_CUDA(size);
+  CHECK_INPUT(size.numel() == pos.size(1));
+  if (pos.size(0) == 0)
+    return torch::empty({0, pos.size(1)}, pos.options().dtype(torch::kLong));
+
+  torch::Tensor start;
+  if (optional_start.has_value()) {
+    start = optional_start.value();
+    CHECK_CUDA(start);
+    CHECK_INPUT(start.numel() == pos.size(1));
+    start = start.view({1, -1});
+  } else if (optional_batch.has_value()) {
+    auto batch = optional_batch.value();
+    auto batch_size = batch.max().item<int64_t>() + 1;
+    start = batch_reduce(pos, batch, batch_size, "amin").index_select(0, batch);
+  } else {
+    start = std::get<0>(pos.min(0)).view({1, -1});
+  }
+
+  auto coords = (pos - start).div(size.view({1, -1}), "floor");
+  return coords.toType(torch::kLong);
+}
+
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor, torch::Tensor,
+           torch::Tensor>
+grid_pool_cuda(torch::Tensor pos, torch::Tensor size,
+               torch::optional<torch::Tensor> optional_start,
+               torch::optional<torch::Tensor> optional_batch,
+               torch::optional<torch::Tensor> optional_x, std::string reduce) {
+  CHECK_CUDA(pos);
+  AT_ASSERTM(reduce == "mean" || reduce == "max",
+             "'reduce' needs to be 'mean' or 'max'");
+  cudaSetDevice(pos.get_device());
+  pos = pos.dim() == 1 ? pos.view({-1, 1}) : pos.flatten(1);
+  if (optional_batch.has_value()) {
+    CHECK_CUDA(optional_batch.value());
+    CHECK_INPUT(optional_batch.value().numel() == pos.size(0));
+  }
+  if (optional_x.has_value()) {
+    CHECK_CUDA(optional_x.value());
+    CHECK_INPUT(optional_x.value().size(0) == pos.size(0));
+  }
+
+  auto N = pos.size(0);
+  auto key = voxel_coords(pos, size, optional_start, optional_batch);
+  if (optional_batch.has_value())
+    key = torch::cat({key, optional_batch.value().view({-1, 1})}, 1);
+
+  auto cluster_first = consecutive_cluster(key);
+  auto cluster = std::get<0>(cluster_first);
+  auto first = std::get<1>(cluster_first);
+  auto C = first.numel();
+
+  auto count = torch::zeros({C}, cluster.options());
+  count.index_add_(0, cluster, torch::ones_like(cluster));
+
+  auto op = reduce == "max" ? "amax" : "mean";
+  auto index = cluster.view({-1, 1});
+  auto out_pos = torch::zeros({C, pos.size(1)}, pos.options())
+                     .scatter_reduce_(0, index.expand_as(pos), pos, op,
+                                      /*include_self=*/false);
+
+  torch::Tensor out_x;
+  if (optional_x.has_value()) {
+    auto x = optional_x.value();
+    auto src = x.dim() == 1 ? x.view({-1, 1}) : x.flatten(1);
+    out_x = torch::zeros({C, src.size(1)}, src.options())
+                .scatter_reduce_(0, index.expand_as(src), src, op,
+                                 /*include_self=*/false);
+    auto sizes = x.sizes().vec();
+    sizes[0] = C;
+    out_x = out_x.view(sizes);
+  } else {
+    out_x = torch::empty({0}, pos.options());
+  }
+
+  torch::Tensor out_batch;
+  if (optional_batch.has_value())
+    out_batch = optional_batch.value().index_select(0, first);
+  else
+    out_batch = torch::empty({0}, cluster.options());
+
+  return std::make_tuple(cluster, count, out_pos, out_x, out_batch);
+}
+
+std::tuple<torch::Tensor, torch::Tensor>
+sparse_grid_cuda(torch::Tensor pos, torch::Tensor size,
+                 torch::optional<torch::Tensor> optional_start) {
+  CHECK_CUDA(pos);
+  cudaSetDevice(pos.get_device());
+  pos = pos.dim() == 1 ? pos.view({-1, 1}) : pos.flatten(1);
+
+  auto coords = voxel_coords(pos, size, optional_start, torch::nullopt);
+  auto cluster_first = consecutive_cluster(coords);
+  auto cluster = std::get<0>(cluster_first);
+  auto first = std::get<1>(cluster_first);
+
+  return std::make_tuple(cluster, coords.index_select(0, first));
+}
@@ -4,4 +4,17 @@
 
 torch::Tensor grid_cuda(torch::Tensor pos, torch::Tensor size,
                         torch::optional<torch::Tensor> optional_start,
-                        torch::optional<torch::Tensor> optional_end);
+                        torch::optional<torch::Tensor> optional_end,
+                        torch::optional<torch::Tensor> optional_batch,
+                        torch::optional<int64_t> optional_batch_size);
+
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor, torch::Tensor,
+           torch::Tensor>
+grid_pool_cuda(torch::Tensor pos, torch::Tensor size,
+               torch::optional<torch::Tensor> optional_start,
+               torch::optional<torch::Tensor> optional_batch,
+               torch::optional<torch::Tensor> optional_x, std::string reduce);
+
+std::tuple<torch::Tensor, torch::Tensor>
+sparse_grid_cuda(torch::Tensor pos, torch::Tensor size,
+                 torch::optional<torch::Tensor> optional_start);
@@ -71,6 +71,7 @@ torch::Tensor nearest_cuda(torch::Tensor x, torch::Tensor y,
   CHECK_CUDA(y);
   CHECK_CUDA(ptr_x);
   CHECK_CUDA(ptr_y);
+  CHECK_INPUT(ptr_x.dim() == 1 && ptr_x.numel() == ptr_y.numel());
   cudaSetDevice(x.get_device());
 
   x = x.view({x.size(0), -1}).contiguous();
@@ -150,3 +150,738 @@ random_walk_cuda(torch::Tensor rowptr, torch::Tensor col, torch::Tensor start,
 
   return std::make_tuple(n_out.t().contiguous(), e_out.t().contiguous());
 }
+
+__global__ void alias_table_kernel(const int64_t *rowptr, const double *weight,
+                                   double *scaled, int64_t *stack, float *prob,
+                                   int64_t *alias, const int64_t num_nodes) {
+
+  const int64_t u = blockIdx.x * blockDim.x + threadIdx.x;
+
+  if (u < num_nodes) {
+    int64_t row_start = rowptr[u], row_end = rowptr[u + 1];
+    int64_t deg = row_end - row_start;
+
+    double sum = 0;
+    for (int64_t e = row_start; e < row_end; e++)
+      sum += weight[e];
+
+    // `small` grows upwards, `large` downwards within the row of `u`.
+    int64_t num_small = 0, num_large = deg;
+    for (int64_t i = 0; i < deg; i++) {
+      scaled[row_start + i] = sum > 0 ? weight[row_start + i] * deg / sum : 1.;
+      if (scaled[row_start + i] < 1.)
+        stack[row_start + num_small++] = i;
+      else
+        stack[row_start + --num_large] = i;
+    }
+
+    while (num_small > 0 && num_large < deg) {
+      int64_t s = stack[row_start + --num_small];
+      int64_t l = stack[row_start + num_large++];
+      prob[row_start + s] = (float)scaled[row_start + s];
+      alias[row_start + s] = row_start + l;
+      scaled[row_start + l] += scaled[row_start + s] - 1.;
+      if (scaled[row_start + l] < 1.)
+        stack[row_start + num_small++] = l;
+      else
+        stack[row_start + --num_large] = l;
+    }
+
+    // Remaining entries are (numerically) equal to one.
+    for (int64_t i = 0; i < deg; i++) {
+      if (i < num_small || i >= num_large) {
+        int64_t e = row_start + stack[row_start + i];
+        prob[e] = 1.f;
+        alias[e] = e;
+      }
+    }
+  }
+}
+
+std::tuple<torch::Tensor, torch::Tensor>
+alias_table_cuda(torch::Tensor rowptr, torch::Tensor weight) {
+  CHECK_CUDA(rowptr);
+  CHECK_CUDA(weight);
+  cudaSetDevice(rowptr.get_device());
+
+  CHECK_INPUT(rowptr.dim() == 1);
+  CHECK_INPUT(weight.dim() == 1);
+
+  rowptr = rowptr.contiguous();
+  weight = weight.toType(torch::kDouble).contiguous();
+  AT_ASSERTM((weight >= 0).all().item<bool>(),
+             "Edge weights need to be non-negative");
+
+  auto scaled = torch::empty_like(weight);
+  auto stack = torch::empty(weight.numel(), rowptr.options());
+  auto prob =
+      torch::empty(weight.numel(), weight.options().dtype(torch::kFloat));
+  auto alias = torch::empty(weight.numel(), rowptr.options());
+
+  auto num_nodes = rowptr.numel() - 1;
+  auto stream = at::cuda::getCurrentCUDAStream();
+  alias_table_kernel<<<BLOCKS(num_nodes), THREADS, 0, stream>>>(
+      rowptr.data_ptr<int64_t>(), weight.data_ptr<double>(),
+      scaled.data_ptr<double>(), stack.data_ptr<int64_t>(),
+      prob.data_ptr<float>(), alias.data_ptr<int64_t>(), num_nodes);
+
+  return std::make_tuple(prob, alias);
+}
+
+// Samples the next edge of a (weighted) node2vec walk that moved from `t` to
+// `v` (with `t = -1` for the first step). Proposals are drawn either uniformly
+// or from the alias tables (if given), and are accepted according to the
+// return/in-out bias of the walk. Returns `-1` if `v` has no outgoing edges.
+__device__ __forceinline__ int64_t
+walk_step(const int64_t *rowptr, const int64_t *col, const float *prob,
+          const int64_t *alias, const int64_t t, const int64_t v,
+          const double prob_0, const double prob_1, const double prob_2,
+          const bool biased, curandState_t *state) {
+
+  int64_t row_start = rowptr[v], row_end = rowptr[v + 1];
+  if (row_end - row_start == 0)
+    return -1;
+
+  while (true) {
+    int64_t e = row_start + (curand(state) % (row_end - row_start));
+    if (prob != NULL && curand_uniform(state) > prob[e]) // (0, 1]
+      e = alias[e];
+
+    if (!biased || t < 0 || row_end - row_start == 1)
+      return e;
+
+    int64_t x = col[e];
+    double r = curand_uniform(state); // (0, 1]
+
+    if (x == t) {
+      if (r < prob_0)
+        return e;
+      continue;
+    }
+
+    bool is_neighbor = false;
+    for (int64_t i = rowptr[x]; i < rowptr[x + 1]; i++) {
+      if (col[i] == t) {
+        is_neighbor = true;
+        break;
+      }
+    }
+
+    if (is_neighbor && r < prob_1)
+      return e;
+    else if (!is_neighbor && r < prob_2)
+      return e;
+  }
+}
+
+__global__ void
+weighted_sampling_kernel(unsigned long long seed, const int64_t *rowptr,
+                         const int64_t *col, const float *prob,
+                         const int64_t *alias, const int64_t *start,
+                         int64_t *n_out, int64_t *e_out,
+                         const int64_t walk_length, const int64_t numel,
+                         const double p, const double q) {
+
+  const int64_t thread_idx = blockIdx.x * blockDim.x + threadIdx.x;
+
+  if (thread_idx < numel) {
+    curandState_t state;
+    curand_init(seed, thread_idx, 0, &state);
+
+    double max_prob = fmax(fmax(1. / p, 1.), 1. / q);
+    double prob_0 = 1. / p / max_prob;
+    double prob_1 = 1. / max_prob;
+    double prob_2 = 1. / q / max_prob;
+    bool biased = p != 1. || q != 1.;
+
+    int64_t t = -1, v = start[thread_idx], x, e_cur;
+
+    n_out[thread_idx] = v;
+
+    for (int64_t l = 0; l < walk_length; l++) {
+      e_cur = walk_step(rowptr, col, prob, alias, t, v, prob_0, prob_1,
+                        prob_2, biased, &state);
+      x = e_cur < 0 ? v : col[e_cur];
+
+      n_out[(l + 1) * numel + thread_idx] = x;
+      e_out[l * numel + thread_idx] = e_cur;
+      t = v;
+      v = x;
+    }
+  }
+}
+
+std::tuple<torch::Tensor, torch::Tensor>
+weighted_random_walk_cuda(torch::Tensor rowptr, torch::Tensor col,
+                          torch::Tensor prob, torch::Tensor alias,
+                          torch::Tensor start, int64_t walk_length, double p,
+                          double q) {
+  CHECK_CUDA(rowptr);
+  CHECK_CUDA(col);
+  CHECK_CUDA(prob);
+  CHECK_CUDA(alias);
+  CHECK_CUDA(start);
+  cudaSetDevice(rowptr.get_device());
+
+  CHECK_INPUT(rowptr.dim() == 1);
+  CHECK_INPUT(col.dim() == 1);
+  CHECK_INPUT(prob.dim() == 1 && prob.numel() == col.numel());
+  CHECK_INPUT(alias.dim() == 1 && alias.numel() == col.numel());
+  CHECK_INPUT(start.dim() == 1);
+
+  rowptr = rowptr.contiguous(), col = col.contiguous();
+  prob = prob.toType(torch::kFloat).contiguous();
+  alias = alias.contiguous(), start = start.contiguous();
+
+  auto n_out = torch::empty({walk_length + 1, start.size(0)}, start.options());
+  auto e_out = torch::empty({walk_length, start.size(0)}, start.options());
+
+  auto seed = torch::randint(std::numeric_limits<int64_t>::max(), {1},
+                             torch::TensorOptions().dtype(torch::kLong));
+
+  auto stream = at::cuda::getCurrentCUDAStream();
+  weighted_sampling_kernel<<<BLOCKS(start.numel()), THREADS, 0, stream>>>(
+      (unsigned long long)seed.data_ptr<int64_t>()[0],
+      rowptr.data_ptr<int64_t>(), col.data_ptr<int64_t>(),
+      prob.data_ptr<float>(), alias.data_ptr<int64_t>(),
+      start.data_ptr<int64_t>(), n_out.data_ptr<int64_t>(),
+      e_out.data_ptr<int64_t>(), walk_length, start.numel(), p, q);
+
+  return std::make_tuple(n_out.t().contiguous(), e_out.t().contiguous());
+}
+
+#define MAX_WINDOW_SIZE 64
+
+__global__ void
+skipgram_kernel(unsigned long long seed, const int64_t *rowptr,
+                const int64_t *col, const float *prob, const int64_t *alias,
+                const int64_t *start, const float *neg_prob,
+                const int64_t *neg_alias, int64_t *pos, int64_t *neg,
+                const int64_t walk_length, const int64_t window_size,
+                const int64_t num_negatives, const int64_t num_pairs,
+                const int64_t num_nodes, const int64_t numel, const double p,
+                const double q) {
+
+  const int64_t thread_idx = blockIdx.x * blockDim.x + threadIdx.x;
+
+  if (thread_idx < numel) {
+    curandState_t state;
+    curand_init(seed, thread_idx, 0, &state);
+
+    double max_prob = fmax(fmax(1. / p, 1.), 1. / q);
+    double prob_0 = 1. / p / max_prob;
+    double prob_1 = 1. / max_prob;
+    double prob_2 = 1. / q / max_prob;
+    bool biased = p != 1. || q != 1.;
+
+    const int64_t pos_stride = numel * num_pairs;
+    const int64_t neg_stride = pos_stride * num_negatives;
+
+    int64_t window[MAX_WINDOW_SIZE];
+    int64_t t = -1, v = start[thread_idx], x, e;
+    int64_t idx = thread_idx * num_pairs;
+    window[0] = v;
+
+    for (int64_t l = 1; l <= walk_length; l++) {
+      e = walk_step(rowptr, col, prob, alias, t, v, prob_0, prob_1, prob_2,
+                    biased, &state);
+      x = e < 0 ? v : col[e];
+
+      for (int64_t j = 1; j <= min(l, window_size); j++) {
+        int64_t u = window[(l - j) % window_size];
+        pos[idx] = x, pos[pos_stride + idx] = u;
+        pos[idx + 1] = u, pos[pos_stride + idx + 1] = x;
+
+        for (int64_t k = 0; k < 2 * num_negatives; k++) {
+          int64_t i = curand(&state) % num_nodes;
+          if (curand_uniform(&state) > neg_prob[i])
+            i = neg_alias[i];
+          neg[idx * num_negatives + k] = k < num_negatives ? x : u;
+          neg[neg_stride + idx * num_negatives + k] = i;
+        }
+        idx += 2;
+      }
+
+      window[l % window_size] = x;
+      t = v;
+      v = x;
+    }
+  }
+}
+
+std::tuple<torch::Tensor, torch::Tensor>
+skipgram_cuda(torch::Tensor rowptr, torch::Tensor col,
+              torch::optional<torch::Tensor> optional_prob,
+              torch::optional<torch::Tensor> optional_alias,
+              torch::Tensor start, int64_t walk_length, double p, double q,
+              int64_t window_size, int64_t num_negatives,
+              torch::optional<torch::Tensor> optional_neg_prob,
+              torch::optional<torch::Tensor> optional_neg_alias) {
+  CHECK_CUDA(rowptr);
+  CHECK_CUDA(col);
+  CHECK_CUDA(start);
+  cudaSetDevice(rowptr.get_device());
+  CHECK_INPUT(rowptr.dim() == 1);
+  CHECK_INPUT(col.dim() == 1);
+  CHECK_INPUT(start.dim() == 1);
+  CHECK_INPUT(walk_length >= 1 && window_size >= 1 && num_negatives >= 0);
+  AT_ASSERTM(window_size <= MAX_WINDOW_SIZE,
+             "`window_size` needs to be smaller than or equal to 64");
+  CHECK_INPUT(optional_prob.has_value() == optional_alias.has_value());
+  if (optional_prob.has_value()) {
+    CHECK_CUDA(optional_prob.value());
+    CHECK_CUDA(optional_alias.value());
+    CHECK_INPUT(optional_prob.value().numel() == col.numel());
+    CHECK_INPUT(optional_alias.value().numel() == col.numel());
+  }
+  if (num_negatives > 0) {
+    CHECK_INPUT(optional_neg_prob.has_value());
+    CHECK_INPUT(optional_neg_alias.has_value());
+    CHECK_CUDA(optional_neg_prob.value());
+    CHECK_CUDA(optional_neg_alias.value());
+    CHECK_INPUT(optional_neg_prob.value().numel() == rowptr.numel() - 1);
+    CHECK_INPUT(optional_neg_alias.value().numel() == rowptr.numel() - 1);
+  }
+
+  rowptr = rowptr.contiguous(), col = col.contiguous();
+  start = start.contiguous();
+
+  torch::Tensor prob, alias, neg_prob, neg_alias;
+  const float *prob_data = NULL, *neg_prob_data = NULL;
+  const int64_t *alias_data = NULL, *neg_alias_data = NULL;
+  if (optional_prob.has_value()) {
+    prob = optional_prob.value().toType(torch::kFloat).contiguous();
+    alias = optional_alias.value().contiguous();
+    prob_data = prob.data_ptr<float>();
+    alias_data = alias.data_ptr<int64_t>();
+  }
+  if (num_negatives > 0) {
+    neg_prob = optional_neg_prob.value().toType(torch::kFloat).contiguous();
+    neg_alias = optional_neg_alias.value().contiguous();
+    neg_prob_data = neg_prob.data_ptr<float>();
+    neg_alias_data = neg_alias.data_ptr<int64_t>();
+  }
+
+  int64_t num_pairs = 0;
+  for (int64_t l = 1; l <= walk_length; l++)
+    num_pairs += 2 * std::min(l, window_size);
+
+  auto pos = torch::empty({2, start.numel() * num_pairs}, start.options());
+  auto neg = torch::empty({2, start.numel() * num_pairs * num_negatives},
+                          start.options());
+
+  auto seed = torch::randint(std::numeric_limits<int64_t>::max(), {1},
+                             torch::TensorOptions().dtype(torch::kLong));
+
+  if (start.numel() == 0)
+    return std::make_tuple(pos, neg);
+
+  auto stream = at::cuda::getCurrentCUDAStream();
+  skipgram_kernel<<<BLOCKS(start.numel()), THREADS, 0, stream>>>(
+      (unsigned long long)seed.data_ptr<int64_t>()[0],
+      rowptr.data_ptr<int64_t>(), col.data_ptr<int64_t>(), prob_data,
+      alias_data, start.data_ptr<int64_t>(), neg_prob_data, neg_alias_data,
+      pos.data_ptr<int64_t>(), neg.data_ptr<int64_t>(), walk_length,
+      window_size, num_negatives, num_pairs, rowptr.numel() - 1,
+      start.numel(), p, q);
+
+  return std::make_tuple(pos, neg);
+}
+
+#define PPR_THREADS 256
+#define PPR_HASH_SIZE 2048
+// Upper bound on the memory of hash maps in global memory (in bytes).
+#define PPR_GLOBAL_MEMORY (int64_t(1) << 28)
+
+// Runs the random walks with restart of start node `n`, whose threads share a
+// hash map of visit counts with `capacity` slots (a power of two). Sets
+// `overflow` in case a visited node does not fit into the hash map anymore.
+__device__ void ppr_walks(unsigned long long seed, const int64_t *rowptr,
+                          const int64_t *col, const float *prob,
+                          const int64_t *alias, const int64_t *start,
+                          unsigned long long *keys, int *counts,
+                          const int64_t capacity, volatile int *overflow,
+                          const int64_t n, const double alpha,
+                          const int64_t num_walks) {
+
+  for (int64_t i = threadIdx.x; i < capacity; i += blockDim.x)
+    keys[i] = (unsigned long long)-1, counts[i] = 0;
+  __syncthreads();
+
+  curandState_t state;
+  curand_init(seed, n * blockDim.x + threadIdx.x, 0, &state);
+
+  for (int64_t w = threadIdx.x; w < num_walks && !*overflow;
+       w += blockDim.x) {
+    int64_t v = start[n];
+    while (true) {
+      unsigned long long key = (unsigned long long)v;
+      int64_t h = ((key * 0x9E3779B97F4A7C15ULL) >> 16) & (capacity - 1);
+      int64_t i = 0;
+      for (; i < capacity; i++) {
+        auto prev = atomicCAS(&keys[h], (unsigned long long)-1, key);
+        if (prev == (unsigned long long)-1 || prev == key) {
+          atomicAdd(&counts[h], 1);
+          break;
+        }
+        h = (h + 1) & (capacity - 1);
+      }
+      if (i == capacity) {
+        *overflow = 1;
+        break;
+      }
+
+      if (curand_uniform(&state) <= alpha) // (0, 1]
+        break;
+      int64_t e = walk_step(rowptr, col, prob, alias, -1, v, 1., 1., 1.,
+                            false, &state);
+      // Dead ends restart the walk at its start node.
+      v = e < 0 ? start[n] : col[e];
+    }
+  }
+  __syncthreads();
+}
+
+// Extracts the `topk` most visited nodes of start node `n` out of its hash map
+// via repeated block-wide arg-max.
+__device__ void ppr_topk(const unsigned long long *keys, int *counts,
+                         const int64_t capacity, int *best_count,
+                         int *best_slot, const int64_t n, int64_t *index,
+                         float *score, const double alpha,
+                         const int64_t num_walks, const int64_t topk) {
+
+  for (int64_t k = 0; k < topk; k++) {
+    int count = 0, slot = -1;
+    for (int64_t i = threadIdx.x; i < capacity; i += blockDim.x) {
+      if (counts[i] > count ||
+          (counts[i] == count && count > 0 && keys[i] < keys[slot]))
+        count = counts[i], slot = i;
+    }
+    best_count[threadIdx.x] = count, best_slot[threadIdx.x] = slot;
+    __syncthreads();
+
+    for (int64_t s = blockDim.x / 2; s > 0; s >>= 1) {
+      if (threadIdx.x < s) {
+        int other_count = best_count[threadIdx.x + s];
+        int other_slot = best_slot[threadIdx.x + s];
+        if (other_count > best_count[threadIdx.x] ||
+            (other_count == best_count[threadIdx.x] && other_count > 0 &&
+             keys[other_slot] < keys[best_slot[threadIdx.x]])) {
+          best_count[threadIdx.x] = other_count;
+          best_slot[threadIdx.x] = other_slot;
+        }
+      }
+      __syncthreads();
+    }
+
+    if (threadIdx.x == 0) {
+      if (best_count[0] > 0) {
+        index[n * topk + k] = (int64_t)keys[best_slot[0]];
+        score[n * topk + k] = (float)(alpha * best_count[0] / num_walks);
+        counts[best_slot[0]] = 0;
+      }
+    }
+    int found = best_count[0];
+    __syncthreads();
+    if (found == 0)
+      break;
+  }
+}
+
+// Estimates personalized PageRank scores via random walks with restart. Each
+// block handles a single start node, whose threads share a hash map of visit
+// counts in shared memory. Start nodes whose walks visit more distinct nodes
+// than fit into the hash map are flagged in `overflow` and left untouched.
+__global__ void ppr_kernel(unsigned long long seed, const int64_t *rowptr,
+                           const int64_t *col, const float *prob,
+                           const int64_t *alias, const int64_t *start,
+                           int64_t *index, float *score, int *overflow,
+                           const double alpha, const int64_t num_walks,
+                           const int64_t topk) {
+
+  __shared__ unsigned long long keys[PPR_HASH_SIZE];
+  __shared__ int counts[PPR_HASH_SIZE];
+  __shared__ int best_count[PPR_THREADS];
+  __shared__ int best_slot[PPR_THREADS];
+  __shared__ int overflowed;
+
+  const int64_t n = blockIdx.x;
+
+  if (threadIdx.x == 0)
+    overflowed = 0;
+  ppr_walks(seed, rowptr, col, prob, alias, start, keys, counts,
+            PPR_HASH_SIZE, &overflowed, n, alpha, num_walks);
+
+  if (overflowed) {
+    if (threadIdx.x == 0)
+      overflow[n] = 1;
+    return;
+  }
+
+  ppr_topk(keys, counts, PPR_HASH_SIZE, best_count, best_slot, n, index,
+           score, alpha, num_walks, topk);
+}
+
+// Re-runs the walks of the start nodes in `ids` with hash maps in global
+// memory, whose `capacity` exceeds the number of nodes, so that they can
+// never overflow. Walks draw the same random numbers as in `ppr_kernel`.
+__global__ void ppr_global_kernel(unsigned long long seed,
+                                  const int64_t *rowptr, const int64_t *col,
+                                  const float *prob, const int64_t *alias,
+                                  const int64_t *start, const int64_t *ids,
+                                  unsigned long long *keys, int *counts,
+                                  const int64_t capacity, int64_t *index,
+                                  float *score, const double alpha,
+                                  const int64_t num_walks,
+                                  const int64_t topk) {
+
+  __shared__ int best_count[PPR_THREADS];
+  __shared__ int best_slot[PPR_THREADS];
+  __shared__ int overflowed;
+
+  const int64_t n = ids[blockIdx.x];
+  keys += blockIdx.x * capacity, counts += blockIdx.x * capacity;
+
+  if (threadIdx.x == 0)
+    overflowed = 0;
+  ppr_walks(seed, rowptr, col, prob, alias, start, keys, counts, capacity,
+            &overflowed, n, alpha, num_walks);
+  ppr_topk(keys, counts, capacity, best_count, best_slot, n, index, score,
+           alpha, num_walks, topk);
+}
+
+std::tuple<torch::Tensor, torch::Tensor>
+ppr_cuda(torch::Tensor rowptr, torch::Tensor col,
+         torch::optional<torch::Tensor> optional_prob,
+         torch::optional<torch::Tensor> optional_alias, torch::Tensor start,
+         double alpha, int64_t num_walks, int64_t topk) {
+  CHECK_CUDA(rowptr);
+  CHECK_CUDA(col);
+  CHECK_CUDA(start);
+  cudaSetDevice(rowptr.get_device());
+  CHECK_INPUT(rowptr.dim() == 1);
+  CHECK_INPUT(col.dim() == 1);
+  CHECK_INPUT(start.dim() == 1);
+  AT_ASSERTM(alpha > 0. && alpha <= 1., "`alpha` needs to be in (0, 1]");
+  CHECK_INPUT(num_walks >= 1 && topk >= 1);
+  CHECK_INPUT(optional_prob.has_value() == optional_alias.has_value());
+
+  rowptr = rowptr.contiguous(), col = col.contiguous();
+  start = start.contiguous();
+
+  torch::Tensor prob, alias;
+  const float *prob_data = NULL;
+  const int64_t *alias_data = NULL;
+  if (optional_prob.has_value()) {
+    CHECK_CUDA(optional_prob.value());
+    CHECK_CUDA(optional_alias.value());
+    CHECK_INPUT(optional_prob.value().numel() == col.numel());
+    CHECK_INPUT(optional_alias.value().numel() == col.numel());
+    prob = optional_prob.value().toType(torch::kFloat).contiguous();
+    alias = optional_alias.value().contiguous();
+    prob_data = prob.data_ptr<float>();
+    alias_data = alias.data_ptr<int64_t>();
+  }
+
+  auto index = torch::full({start.numel(), topk}, -1, start.options());
+  auto score = torch::zeros({start.numel(), topk},
+                            start.options().dtype(torch::kFloat));
+
+  auto seed = torch::randint(std::numeric_limits<int64_t>::max(), {1},
+                             torch::TensorOptions().dtype(torch::kLong));
+
+  if (start.numel() == 0)
+    return std::make_tuple(index, score);
+
+  auto stream = at::cuda::getCurrentCUDAStream();
+  auto overflow =
+      torch::zeros({start.numel()}, start.options().dtype(torch::kInt));
+  ppr_kernel<<<start.numel(), PPR_THREADS, 0, stream>>>(
+      (unsigned long long)seed.data_ptr<int64_t>()[0],
+      rowptr.data_ptr<int64_t>(), col.data_ptr<int64_t>(), prob_data,
+      alias_data, start.data_ptr<int64_t>(), index.data_ptr<int64_t>(),
+      score.data_ptr<float>(), overflow.data_ptr<int>(), alpha, num_walks,
+      topk);
+
+  // Start nodes whose hash maps in shared memory overflowed are re-run with
+  // hash maps in global memory (in chunks of bounded memory), which have
+  // room for all nodes, so that no visits get dropped.
+  auto ids = overflow.nonzero().view(-1);
+  if (ids.numel() > 0) {
+    int64_t num_nodes = rowptr.numel() - 1;
+    int64_t capacity = PPR_HASH_SIZE;
+    while (capacity < 2 * num_nodes)
+      capacity *= 2;
+    int64_t chunk_size = std::min<int64_t>(
+        ids.numel(), std::max<int64_t>(1, PPR_GLOBAL_MEMORY /
+                                              (capacity * (8 + 4))));
+    auto keys = torch::empty({chunk_size * capacity}, start.options());
+    auto counts = torch::empty({chunk_size * capacity},
+                               start.options().dtype(torch::kInt));
+
+    for (int64_t i = 0; i < ids.numel(); i += chunk_size) {
+      ppr_global_kernel<<<std::min(chunk_size, ids.numel() - i), PPR_THREADS,
+                          0, stream>>>(
+          (unsigned long long)seed.data_ptr<int64_t>()[0],
+          rowptr.data_ptr<int64_t>(), col.data_ptr<int64_t>(), prob_data,
+          alias_data, start.data_ptr<int64_t>(), ids.data_ptr<int64_t>() + i,
+          (unsigned long long *)keys.data_ptr<int64_t>(),
+          counts.data_ptr<int>(), capacity, index.data_ptr<int64_t>(),
+          score.data_ptr<float>(), alpha, num_walks, topk);
+    }
+  }
+
+  return std::make_tuple(index, score);
+}
+
+__global__ void saint_walk_kernel(unsigned long long seed,
+                                  const int64_t *rowptr, const int64_t *col,
+                                  const float *prob, const int64_t *alias,
+                                  const int64_t *start, int64_t *walks,
+                                  const int64_t walk_length,
+                                  const int64_t numel) {
+
+  const int64_t thread_idx = blockIdx.x * blockDim.x + threadIdx.x;
+
+  if (thread_idx < numel) {
+    curandState_t state;
+    curand_init(seed, thread_idx, 0, &state);
+
+    int64_t v = start[thread_idx], e;
+    walks[thread_idx * (walk_length + 1)] = v;
+    for (int64_t l = 1; l <= walk_length; l++) {
+      e = walk_step(rowptr, col, prob, alias, -1, v, 1., 1., 1., false,
+                    &state);
+      v = e < 0 ? v : col[e];
+      walks[thread_idx * (walk_length + 1) + l] = v;
+    }
+  }
+}
+
+// Returns the position of `v` in the sorted array `node`, or `-1` if `v` is
+// not contained in `node`.
+__device__ __forceinline__ int64_t find_node(const int64_t *node,
+                                             const int64_t num_nodes,
+                                             const int64_t v) {
+  int64_t lo = 0, hi = num_nodes;
+  while (lo < hi) {
+    int64_t mid = (lo + hi) / 2;
+    if (node[mid] < v)
+      lo = mid + 1;
+    else
+      hi = mid;
+  }
+  return (lo < num_nodes && node[lo] == v) ? lo : -1;
+}
+
+__global__ void saint_count_kernel(const int64_t *rowptr, const int64_t *col,
+                                   const int64_t *node, int64_t *count,
+                                   const int64_t num_nodes) {
+
+  const int64_t i = blockIdx.x * blockDim.x + threadIdx.x;
+
+  if (i < num_nodes) {
+    int64_t u = node[i], out = 0;
+    for (int64_t e = rowptr[u]; e < rowptr[u + 1]; e++)
+      out += find_node(node, num_nodes, col[e]) >= 0;
+    count[i] = out;
+  }
+}
+
+__global__ void saint_fill_kernel(const int64_t *rowptr, const int64_t *col,
+                                  const int64_t *node,
+                                  const int64_t *out_rowptr,
+                                  int64_t *edge_index, int64_t *edge_id,
+                                  const int64_t num_nodes,
+                                  const int64_t num_edges) {
+
+  const int64_t i = blockIdx.x * blockDim.x + threadIdx.x;
+
+  if (i < num_nodes) {
+    int64_t u = node[i], offset = out_rowptr[i];
+    for (int64_t e = rowptr[u]; e < rowptr[u + 1]; e++) {
+      int64_t j = find_node(node, num_nodes, col[e]);
+      if (j >= 0) {
+        edge_index[offset] = i;
+        edge_index[num_edges + offset] = j;
+        edge_id[offset] = e;
+        offset++;
+      }
+    }
+  }
+}
+
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor>
+saint_subgraph_cuda(torch::Tensor rowptr, torch::Tensor col,
+                    torch::optional<torch::Tensor> optional_prob,
+                    torch::optional<torch::Tensor> optional_alias,
+                    torch::Tensor start, int64_t walk_length) {
+  CHECK_CUDA(rowptr);
+  CHECK_CUDA(col);
+  CHECK_CUDA(start);
+  cudaSetDevice(rowptr.get_device());
+  CHECK_INPUT(rowptr.dim() == 1);
+  CHECK_INPUT(col.dim() == 1);
+  CHECK_INPUT(start.dim() == 1);
+  CHECK_INPUT(walk_length >= 0);
+  CHECK_INPUT(optional_prob.has_value() == optional_alias.has_value());
+
+  rowptr = rowptr.contiguous(), col = col.contiguous();
+  start = start.contiguous();
+
+  torch::Tensor prob, alias;
+  const float *prob_data = NULL;
+  const int64_t *alias_data = NULL;
+  if (optional_prob.has_value()) {
+    CHECK_CUDA(optional_prob.value());
+    CHECK_CUDA(optional_alias.value());
+    CHECK_INPUT(optional_prob.value().numel() == col.numel());
+    CHECK_INPUT(optional_alias.value().numel() == col.numel());
+    prob = optional_prob.value().toType(torch::kFloat).contiguous();
+    alias = optional_alias.value().contiguous();
+    prob_data = prob.data_ptr<float>();
+    alias_data = alias.data_ptr<int64_t>();
+  }
+
+  auto walks = torch::empty({start.numel() * (walk_length + 1)},
+                            start.options());
+
+  auto seed = torch::randint(std::numeric_limits<int64_t>::max(), {1},
+                             torch::TensorOptions().dtype(torch::kLong));
+
+  auto stream = at::cuda::getCurrentCUDAStream();
+  if (start.numel() > 0) {
+    saint_walk_kernel<<<BLOCKS(start.numel()), THREADS, 0, stream>>>(
+        (unsigned long long)seed.data_ptr<int64_t>()[0],
+        rowptr.data_ptr<int64_t>(), col.data_ptr<int64_t>(), prob_data,
+        alias_data, start.data_ptr<int64_t>(), walks.data_ptr<int64_t>(),
+        walk_length, start.numel());
+  }
+
+  auto node = std::get<0>(walks.sort());
+  node = std::get<0>(torch::unique_consecutive(node));
+  int64_t num_nodes = node.numel();
+
+  auto out_rowptr = torch::zeros({num_nodes + 1}, rowptr.options());
+  if (num_nodes > 0) {
+    saint_count_kernel<<<BLOCKS(num_nodes), THREADS, 0, stream>>>(
+        rowptr.data_ptr<int64_t>(), col.data_ptr<int64_t>(),
+        node.data_ptr<int64_t>(), out_rowptr.data_ptr<int64_t>() + 1,
+        num_nodes);
+  }
+  out_rowptr = out_rowptr.cumsum(0);
+
+  int64_t num_edges = out_rowptr[-1].item<int64_t>();
+  auto edge_index = torch::empty({2, num_edges}, col.options());
+  auto edge_id = torch::empty({num_edges}, col.options());
+
+  if (num_nodes > 0) {
+    saint_fill_kernel<<<BLOCKS(num_nodes), THREADS, 0, stream>>>(
+        rowptr.data_ptr<int64_t>(), col.data_ptr<int64_t>(),
+        node.data_ptr<int64_t>(), out_rowptr.data_ptr<int64_t>(),
+        edge_index.data_ptr<int64_t>(), edge_id.data_ptr<int64_t>(),
+        num_nodes, num_edges);
+  }
+
+  return std::make_tuple(node, edge_index, edge_id);
+}
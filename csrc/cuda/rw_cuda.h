@@ -5,3 +5,33 @@
 std::tuple<torch::Tensor, torch::Tensor>
 random_walk_cuda(torch::Tensor rowptr, torch::Tensor col, torch::Tensor start,
                  int64_t walk_length, double p, double q);
+
+std::tuple<torch::Tensor, torch::Tensor>
+alias_table_cuda(torch::Tensor rowptr, torch::Tensor weight);
+
+std::tuple<torch::Tensor, torch::Tensor>
+weighted_random_walk_cuda(torch::Tensor rowptr, torch::Tensor col,
+                          torch::Tensor prob, torch::Tensor alias,
+                          torch::Tensor start, int64_t walk_length, double p,
+                          double q);
+
+std::tuple<torch::Tensor, torch::Tensor>
+skipgram_cuda(torch::Tensor rowptr, torch::Tensor col,
+              torch::optional<torch::Tensor> optional_prob,
+              torch::optional<torch::Tensor> optional_alias,
+              torch::Tensor start, int64_t walk_length, double p, double q,
+              int64_t window_size, int64_t num_negatives,
+              torch::optional<torch::Tensor> optional_neg_prob,
+              torch::optional<torch::Tensor> optional_neg_alias);
+
+std::tuple<torch::Tensor, torch::Tensor>
+ppr_cuda(torch::Tensor rowptr, torch::Tensor col,
+         torch::optional<torch::Tensor> optional_prob,
+         torch::optional<torch::Tensor> optional_alias, torch::Tensor start,
+         double alpha, int64_t num_walks, int64_t topk);
+
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor>
+saint_subgraph_cuda(torch::Tensor rowptr, torch::Tensor col,
+                    torch::optional<torch::Tensor> optional_prob,
+                    torch::optional<torch::Tensor> optional_alias,
+                    torch::Tensor start, int64_t walk_length);
@@ -4,6 +4,7 @@
 #include <torch/script.h>
 
 #include "cpu/fps_cpu.h"
+#include "cpu/stats.h"
 
 #ifdef WITH_CUDA
 #include "cuda/fps_cuda.h"
@@ -32,5 +33,24 @@ CLUSTER_API torch::Tensor fps(torch::Tensor src, torch::Tensor ptr, torch::Tenso
   }
 }
 
+CLUSTER_API std::tuple<std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+                       std::vector<torch::Tensor>>
+fps_group(torch::Tensor src, torch::Tensor ptr, std::vector<double> ratio,
+          std::vector<double> r, std::vector<int64_t> k, bool random_start) {
+  if (src.device().is_cuda()) {
+#ifdef WITH_CUDA
+    AT_ERROR("No CUDA version supported");
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return fps_group_cpu(src, ptr, ratio, r, k, random_start);
+  }
+}
+
 static auto registry =
-    torch::RegisterOperators().op("torch_cluster::fps", &fps);
+    torch::RegisterOperators()
+        .op("torch_cluster::fps", &fps)
+        .op("torch_cluster::fps_group", &fps_group)
+        .op("torch_cluster::_fps_stats", &stats::collect)
+        .op("torch_cluster::_fps_enable_stats", &stats::enable);
@@ -4,6 +4,7 @@
 #include <torch/script.h>
 
 #include "cpu/graclus_cpu.h"
+#include "cpu/stats.h"
 
 #ifdef WITH_CUDA
 #include "cuda/graclus_cuda.h"
@@ -32,5 +33,42 @@ CLUSTER_API torch::Tensor graclus(torch::Tensor rowptr, torch::Tensor col,
   }
 }
 
+CLUSTER_API torch::Tensor
+graclus_parallel(torch::Tensor rowptr, torch::Tensor col,
+                 torch::optional<torch::Tensor> optional_weight) {
+  if (rowptr.device().is_cuda()) {
+#ifdef WITH_CUDA
+    return graclus_cuda(rowptr, col, optional_weight);
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return graclus_parallel_cpu(rowptr, col, optional_weight);
+  }
+}
+
+CLUSTER_API std::tuple<std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+                       std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+                       std::vector<torch::Tensor>>
+graclus_coarsen(torch::Tensor rowptr, torch::Tensor col,
+                torch::optional<torch::Tensor> optional_weight,
+                int64_t num_levels, bool parallel) {
+  if (rowptr.device().is_cuda()) {
+#ifdef WITH_CUDA
+    AT_ERROR("No CUDA version supported");
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return graclus_coarsen_cpu(rowptr, col, optional_weight, num_levels,
+                               parallel);
+  }
+}
+
 static auto registry =
-    torch::RegisterOperators().op("torch_cluster::graclus", &graclus);
+    torch::RegisterOperators()
+        .op("torch_cluster::graclus", &graclus)
+        .op("torch_cluster::graclus_parallel", &graclus_parallel)
+        .op("torch_cluster::graclus_coarsen", &graclus_coarsen)
+        .op("torch_cluster::_graclus_stats", &stats::collect)
+        .op("torch_cluster::_graclus_enable_stats", &stats::enable);
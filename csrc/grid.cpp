@@ -4,6 +4,7 @@
 #include <torch/script.h>
 
 #include "cpu/grid_cpu.h"
+#include "cpu/stats.h"
 
 #ifdef WITH_CUDA
 #include "cuda/grid_cuda.h"
@@ -21,17 +22,59 @@ PyMODINIT_FUNC PyInit__grid_cpu(void) { return NULL; }
 
 CLUSTER_API torch::Tensor grid(torch::Tensor pos, torch::Tensor size,
                    torch::optional<torch::Tensor> optional_start,
-                   torch::optional<torch::Tensor> optional_end) {
+                   torch::optional<torch::Tensor> optional_end,
+                   torch::optional<torch::Tensor> optional_batch,
+                   torch::optional<int64_t> optional_batch_size) {
   if (pos.device().is_cuda()) {
 #ifdef WITH_CUDA
-    return grid_cuda(pos, size, optional_start, optional_end);
+    return grid_cuda(pos, size, optional_start, optional_end, optional_batch,
+                     optional_batch_size);
 #else
     AT_ERROR("Not compiled with CUDA support");
 #endif
   } else {
-    return grid_cpu(pos, size, optional_start, optional_end);
+    return grid_cpu(pos, size, optional_start, optional_end, optional_batch,
+                    optional_batch_size);
+  }
+}
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor, torch::Tensor,
+                       torch::Tensor, torch::Tensor>
+grid_pool(torch::Tensor pos, torch::Tensor size,
+          torch::optional<torch::Tensor> optional_start,
+          torch::optional<torch::Tensor> optional_batch,
+          torch::optional<torch::Tensor> optional_x, std::string reduce) {
+  if (pos.device().is_cuda()) {
+#ifdef WITH_CUDA
+    return grid_pool_cuda(pos, size, optional_start, optional_batch,
+                          optional_x, reduce);
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return grid_pool_cpu(pos, size, optional_start, optional_batch,
+                         optional_x, reduce);
+  }
+}
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+sparse_grid(torch::Tensor pos, torch::Tensor size,
+            torch::optional<torch::Tensor> optional_start) {
+  if (pos.device().is_cuda()) {
+#ifdef WITH_CUDA
+    return sparse_grid_cuda(pos, size, optional_start);
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return sparse_grid_cpu(pos, size, optional_start);
   }
 }
 
 static auto registry =
-    torch::RegisterOperators().op("torch_cluster::grid", &grid);
+    torch::RegisterOperators()
+        .op("torch_cluster::grid", &grid)
+        .op("torch_cluster::grid_pool", &grid_pool)
+        .op("torch_cluster::sparse_grid", &sparse_grid)
+        .op("torch_cluster::_grid_stats", &stats::collect)
+        .op("torch_cluster::_grid_enable_stats", &stats::enable);
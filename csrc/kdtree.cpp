@@ -0,0 +1,70 @@
+#ifdef WITH_PYTHON
+#include <Python.h>
+#endif
+#include <torch/script.h>
+
+#include "cpu/kdtree_cpu.h"
+#include "cpu/stats.h"
+
+#ifdef _WIN32
+#ifdef WITH_PYTHON
+#ifdef WITH_CUDA
+PyMODINIT_FUNC PyInit__kdtree_cuda(void) { return NULL; }
+#else
+PyMODINIT_FUNC PyInit__kdtree_cpu(void) { return NULL; }
+#endif
+#endif
+#endif
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor, torch::Tensor,
+                       torch::Tensor>
+kd_tree(torch::Tensor pos, int64_t leaf_size) {
+  if (pos.device().is_cuda()) {
+#ifdef WITH_CUDA
+    AT_ERROR("No CUDA version supported");
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return kd_tree_cpu(pos, leaf_size);
+  }
+}
+
+CLUSTER_API torch::Tensor kd_tree_knn(torch::Tensor pos, torch::Tensor perm,
+                                      torch::Tensor node, torch::Tensor split,
+                                      torch::Tensor bbox, torch::Tensor y,
+                                      int64_t k) {
+  if (y.device().is_cuda()) {
+#ifdef WITH_CUDA
+    AT_ERROR("No CUDA version supported");
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return kd_tree_knn_cpu(pos, perm, node, split, bbox, y, k);
+  }
+}
+
+CLUSTER_API torch::Tensor
+kd_tree_radius(torch::Tensor pos, torch::Tensor perm, torch::Tensor node,
+               torch::Tensor split, torch::Tensor bbox, torch::Tensor y,
+               double r, int64_t max_num_neighbors) {
+  if (y.device().is_cuda()) {
+#ifdef WITH_CUDA
+    AT_ERROR("No CUDA version supported");
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return kd_tree_radius_cpu(pos, perm, node, split, bbox, y, r,
+                              max_num_neighbors);
+  }
+}
+
+static auto registry =
+    torch::RegisterOperators()
+        .op("torch_cluster::kd_tree", &kd_tree)
+        .op("torch_cluster::kd_tree_knn", &kd_tree_knn)
+        .op("torch_cluster::kd_tree_radius", &kd_tree_radius)
+        .op("torch_cluster::_kdtree_stats", &stats::collect)
+        .op("torch_cluster::_kdtree_enable_stats", &stats::enable);
@@ -4,6 +4,7 @@
 #include <torch/script.h>
 
 #include "cpu/knn_cpu.h"
+#include "cpu/stats.h"
 
 #ifdef WITH_CUDA
 #include "cuda/knn_cuda.h"
@@ -37,4 +38,7 @@ CLUSTER_API torch::Tensor knn(torch::Tensor x, torch::Tensor y,
 }
 
 static auto registry =
-    torch::RegisterOperators().op("torch_cluster::knn", &knn);
+    torch::RegisterOperators()
+        .op("torch_cluster::knn", &knn)
+        .op("torch_cluster::_knn_stats", &stats::collect)
+        .op("torch_cluster::_knn_enable_stats", &stats::enable);
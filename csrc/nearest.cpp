@@ -3,7 +3,8 @@
 #endif
 #include <torch/script.h>
 
-#include "extensions.h"
+#include "cpu/nearest_cpu.h"
+#include "cpu/stats.h"
 
 #ifdef WITH_CUDA
 #include "cuda/nearest_cuda.h"
@@ -28,9 +29,12 @@ CLUSTER_API torch::Tensor nearest(torch::Tensor x, torch::Tensor y, torch::Tenso
     AT_ERROR("Not compiled with CUDA support");
 #endif
   } else {
-    AT_ERROR("No CPU version supported");
+    return nearest_cpu(x, y, ptr_x, ptr_y);
   }
 }
 
 static auto registry =
-    torch::RegisterOperators().op("torch_cluster::nearest", &nearest);
+    torch::RegisterOperators()
+        .op("torch_cluster::nearest", &nearest)
+        .op("torch_cluster::_nearest_stats", &stats::collect)
+        .op("torch_cluster::_nearest_enable_stats", &stats::enable);
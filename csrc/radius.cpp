@@ -4,6 +4,7 @@
 #include <torch/script.h>
 
 #include "cpu/radius_cpu.h"
+#include "cpu/stats.h"
 
 #ifdef WITH_CUDA
 #include "cuda/radius_cuda.h"
@@ -35,4 +36,7 @@ CLUSTER_API torch::Tensor radius(torch::Tensor x, torch::Tensor y,
 }
 
 static auto registry =
-    torch::RegisterOperators().op("torch_cluster::radius", &radius);
+    torch::RegisterOperators()
+        .op("torch_cluster::radius", &radius)
+        .op("torch_cluster::_radius_stats", &stats::collect)
+        .op("torch_cluster::_radius_enable_stats", &stats::enable);
@@ -4,6 +4,7 @@
 #include <torch/script.h>
 
 #include "cpu/rw_cpu.h"
+#include "cpu/stats.h"
 
 #ifdef WITH_CUDA
 #include "cuda/rw_cuda.h"
@@ -33,5 +34,103 @@ random_walk(torch::Tensor rowptr, torch::Tensor col, torch::Tensor start,
   }
 }
 
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+alias_table(torch::Tensor rowptr, torch::Tensor weight) {
+  if (rowptr.device().is_cuda()) {
+#ifdef WITH_CUDA
+    return alias_table_cuda(rowptr, weight);
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return alias_table_cpu(rowptr, weight);
+  }
+}
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+weighted_random_walk(torch::Tensor rowptr, torch::Tensor col,
+                     torch::Tensor prob, torch::Tensor alias,
+                     torch::Tensor start, int64_t walk_length, double p,
+                     double q) {
+  if (rowptr.device().is_cuda()) {
+#ifdef WITH_CUDA
+    return weighted_random_walk_cuda(rowptr, col, prob, alias, start,
+                                     walk_length, p, q);
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return weighted_random_walk_cpu(rowptr, col, prob, alias, start,
+                                    walk_length, p, q);
+  }
+}
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+skipgram(torch::Tensor rowptr, torch::Tensor col,
+         torch::optional<torch::Tensor> optional_prob,
+         torch::optional<torch::Tensor> optional_alias, torch::Tensor start,
+         int64_t walk_length, double p, double q, int64_t window_size,
+         int64_t num_negatives,
+         torch::optional<torch::Tensor> optional_neg_prob,
+         torch::optional<torch::Tensor> optional_neg_alias) {
+  if (rowptr.device().is_cuda()) {
+#ifdef WITH_CUDA
+    return skipgram_cuda(rowptr, col, optional_prob, optional_alias, start,
+                         walk_length, p, q, window_size, num_negatives,
+                         optional_neg_prob, optional_neg_alias);
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return skipgram_cpu(rowptr, col, optional_prob, optional_alias, start,
+                        walk_length, p, q, window_size, num_negatives,
+                        optional_neg_prob, optional_neg_alias);
+  }
+}
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+ppr(torch::Tensor rowptr, torch::Tensor col,
+    torch::optional<torch::Tensor> optional_prob,
+    torch::optional<torch::Tensor> optional_alias, torch::Tensor start,
+    double alpha, int64_t num_walks, int64_t topk) {
+  if (rowptr.device().is_cuda()) {
+#ifdef WITH_CUDA
+    return ppr_cuda(rowptr, col, optional_prob, optional_alias, start, alpha,
+                    num_walks, topk);
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return ppr_cpu(rowptr, col, optional_prob, optional_alias, start, alpha,
+                   num_walks, topk);
+  }
+}
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor, torch::Tensor>
+saint_subgraph(torch::Tensor rowptr, torch::Tensor col,
+               torch::optional<torch::Tensor> optional_prob,
+               torch::optional<torch::Tensor> optional_alias,
+               torch::Tensor start, int64_t walk_length) {
+  if (rowptr.device().is_cuda()) {
+#ifdef WITH_CUDA
+    return saint_subgraph_cuda(rowptr, col, optional_prob, optional_alias,
+                               start, walk_length);
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return saint_subgraph_cpu(rowptr, col, optional_prob, optional_alias,
+                              start, walk_length);
+  }
+}
+
 static auto registry =
-    torch::RegisterOperators().op("torch_cluster::random_walk", &random_walk);
+    torch::RegisterOperators()
+        .op("torch_cluster::random_walk", &random_walk)
+        .op("torch_cluster::alias_table", &alias_table)
+        .op("torch_cluster::weighted_random_walk", &weighted_random_walk)
+        .op("torch_cluster::skipgram", &skipgram)
+        .op("torch_cluster::ppr", &ppr)
+        .op("torch_cluster::saint_subgraph", &saint_subgraph)
+        .op("torch_cluster::_rw_stats", &stats::collect)
+        .op("torch_cluster::_rw_enable_stats", &stats::enable);
@@ -4,6 +4,7 @@
 #include <torch/script.h>
 
 #include "cpu/sampler_cpu.h"
+#include "cpu/stats.h"
 
 #ifdef _WIN32
 #ifdef WITH_PYTHON
@@ -28,5 +29,57 @@ CLUSTER_API torch::Tensor neighbor_sampler(torch::Tensor start, torch::Tensor ro
   }
 }
 
-static auto registry = torch::RegisterOperators().op(
-    "torch_cluster::neighbor_sampler", &neighbor_sampler);
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+neighbor_sampler_prob(torch::Tensor start, torch::Tensor rowptr, int64_t count,
+                      double factor) {
+  if (rowptr.device().is_cuda()) {
+#ifdef WITH_CUDA
+    AT_ERROR("No CUDA version supported");
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return neighbor_sampler_prob_cpu(start, rowptr, count, factor);
+  }
+}
+
+CLUSTER_API std::tuple<torch::Tensor, torch::Tensor>
+weighted_neighbor_sampler(torch::Tensor start, torch::Tensor rowptr,
+                          torch::Tensor weight, int64_t count, double factor) {
+  if (rowptr.device().is_cuda()) {
+#ifdef WITH_CUDA
+    AT_ERROR("No CUDA version supported");
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return weighted_neighbor_sampler_cpu(start, rowptr, weight, count, factor);
+  }
+}
+
+CLUSTER_API std::tuple<std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+                       std::vector<torch::Tensor>, std::vector<torch::Tensor>,
+                       std::vector<torch::Tensor>>
+multi_hop_sampler(torch::Tensor rowptr, torch::Tensor col,
+                  torch::optional<torch::Tensor> optional_weight,
+                  torch::Tensor seed, std::vector<int64_t> sizes) {
+  if (rowptr.device().is_cuda()) {
+#ifdef WITH_CUDA
+    AT_ERROR("No CUDA version supported");
+#else
+    AT_ERROR("Not compiled with CUDA support");
+#endif
+  } else {
+    return multi_hop_sampler_cpu(rowptr, col, optional_weight, seed, sizes);
+  }
+}
+
+static auto registry =
+    torch::RegisterOperators()
+        .op("torch_cluster::neighbor_sampler", &neighbor_sampler)
+        .op("torch_cluster::neighbor_sampler_prob", &neighbor_sampler_prob)
+        .op("torch_cluster::weighted_neighbor_sampler",
+            &weighted_neighbor_sampler)
+        .op("torch_cluster::multi_hop_sampler", &multi_hop_sampler)
+        .op("torch_cluster::_sampler_stats", &stats::collect)
+        .op("torch_cluster::_sampler_enable_stats", &stats::enable);
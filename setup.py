@@ -106,13 +106,12 @@ def get_extensions():
     return extensions
 
 
-install_requires = [
-    'scipy',
-]
+install_requires = []
 
 test_requires = [
     'pytest',
     'pytest-cov',
+    'scipy',
 ]
 
 # work-around hipify abs paths
@@ -0,0 +1,60 @@
+import pytest
+import torch
+from torch import Tensor
+from torch_cluster import CSRGraph, graclus_cluster, random_walk
+from torch_cluster.testing import devices, tensor
+
+
+@pytest.mark.parametrize('device', devices)
+def test_csr_graph(device):
+    row = tensor([1, 0, 1, 2, 1, 3, 3, 4, 4, 1], torch.long, device)
+    col = tensor([0, 1, 2, 1, 3, 1, 4, 3, 2, 1], torch.long, device)
+    weight = torch.arange(10, dtype=torch.float, device=device)
+
+    graph = CSRGraph.from_edge_index(row, col, weight)
+    assert graph.num_nodes == 5
+    assert graph.num_edges == 10
+    assert graph.rowptr.tolist() == [0, 1, 5, 6, 8, 10]
+    assert graph.col.tolist() == [1, 0, 1, 2, 3, 1, 1, 4, 2, 3]
+    assert graph.weight.tolist() == [1, 0, 9, 2, 4, 3, 5, 6, 8, 7]
+
+    prob, alias = graph.alias_table()
+    assert prob.numel() == alias.numel() == 10
+    assert graph.alias_table()[0].data_ptr() == prob.data_ptr()
+
+    # Validation:
+    CSRGraph(graph.rowptr, graph.col, graph.weight)
+    with pytest.raises(ValueError):
+        CSRGraph(graph.rowptr[:-1], graph.col)
+    with pytest.raises(ValueError):
+        CSRGraph(tensor([0, 2, 1, 10], torch.long, device), graph.col)
+    with pytest.raises(ValueError):
+        CSRGraph(graph.rowptr, graph.col + 1)
+    with pytest.raises(ValueError):
+        CSRGraph(graph.rowptr, graph.col, graph.weight[:-1])
+
+
+@torch.jit.script
+def jit_walk(rowptr: Tensor, col: Tensor, start: Tensor) -> Tensor:
+    graph = CSRGraph(rowptr, col)
+    out = random_walk(graph, None, start, 4)
+    assert isinstance(out, Tensor)
+    return out
+
+
+@torch.jit.script
+def jit_graclus(rowptr: Tensor, col: Tensor) -> Tensor:
+    return graclus_cluster(CSRGraph(rowptr, col))
+
+
+@pytest.mark.parametrize('device', devices)
+def test_csr_graph_jit(device):
+    rowptr = tensor([0, 1, 2, 2], torch.long, device)
+    col = tensor([1, 0], torch.long, device)
+    start = tensor([0, 1, 2], torch.long, device)
+
+    out = jit_walk(rowptr, col, start)
+    assert out.tolist() == [[0, 1, 0, 1, 0], [1, 0, 1, 0, 1], [2, 2, 2, 2, 2]]
+
+    out = jit_graclus(rowptr, col)
+    assert out.tolist() == [0, 0, 2]
@@ -3,7 +3,7 @@ from itertools import product
 import pytest
 import torch
 from torch import Tensor
-from torch_cluster import fps
+from torch_cluster import fps, fps_group
 from torch_cluster.testing import devices, grad_dtypes, tensor
 
 
@@ -74,3 +74,63 @@ def test_random_fps(device):
         batch = torch.cat([batch_1, batch_2])
         idx = fps(pos, batch, ratio=0.5)
         assert idx.min() >= 0 and idx.max() < 2 * N
+
+
+@pytest.mark.parametrize('dtype', grad_dtypes)
+def test_fps_group(dtype):
+    x = tensor([
+        [-1, -1],
+        [-1, +1],
+        [+1, +1],
+        [+1, -1],
+        [-2, -2],
+        [-2, +2],
+        [+2, +2],
+        [+2, -2],
+    ], dtype, 'cpu')
+    batch = tensor([0, 0, 0, 0, 1, 1, 1, 1], torch.long, 'cpu')
+
+    out = fps_group(x, [0.5, 0.5], [4, 2], r=[2.5, -1], batch=batch,
+                    random_start=False)
+    assert len(out) == 2
+
+    (index1, neighbor1, ptr1), (index2, neighbor2, ptr2) = out
+    assert index1.tolist() == [0, 2, 4, 6]
+    assert ptr1.tolist() == [0, 2, 4]
+    assert neighbor1[:2, 0].tolist() == [0, 2]
+    assert neighbor1[:2, 1:3].sort(dim=1)[0].tolist() == [[1, 3], [1, 3]]
+    assert neighbor1[:2, 3].tolist() == [-1, -1]
+    assert neighbor1[2:].tolist() == [[4, -1, -1, -1], [6, -1, -1, -1]]
+    assert index2.tolist() == [0, 2]
+    assert neighbor2.tolist() == [[0, 1], [2, 3]]
+    assert ptr2.tolist() == [0, 1, 2]
+
+    jit = torch.jit.script(fps_group)
+    out = jit(x, [0.5], [4], r=[2.5], ptr=[0, 4, 8], random_start=False)
+    assert out[0][0].tolist() == [0, 2, 4, 6]
+    assert torch.equal(out[0][1], neighbor1)
+
+
+@pytest.mark.parametrize('r', [None, [0.5]])
+def test_fps_group_large(r):
+    pos = torch.randn(512, 3)
+    batch = torch.arange(2).repeat_interleave(256)
+
+    (index, neighbor, ptr), = fps_group(pos, [0.25], [16], r=r, batch=batch,
+                                        random_start=False)
+    assert index.tolist() == fps(pos, batch, 0.25, False).tolist()
+    assert ptr.tolist() == [0, 64, 128]
+
+    dist = torch.cdist(pos[index], pos,
+                       compute_mode='donot_use_mm_for_euclid_dist')
+    dist[batch[index].view(-1, 1) != batch.view(1, -1)] = float('inf')
+    if r is not None:
+        dist[dist > r[0]] = float('inf')
+    expected = dist.topk(16, dim=1, largest=False)[0]
+
+    mask = neighbor >= 0
+    assert torch.equal(mask, expected.isfinite())
+    assert bool((batch[neighbor[mask]] == batch[index].view(-1, 1)
+                 .expand_as(neighbor)[mask]).all())
+    out = (pos[neighbor.clamp(min=0)] - pos[index].view(-1, 1, 3)).norm(dim=-1)
+    assert torch.allclose(out[mask], expected[mask], atol=1e-5)
@@ -2,7 +2,8 @@ from itertools import product
 
 import pytest
 import torch
-from torch_cluster import graclus_cluster
+from torch_cluster import (CSRGraph, graclus_cluster, graclus_coarsen,
+                           matching_ratio)
 from torch_cluster.testing import devices, dtypes, tensor
 
 tests = [{
@@ -54,3 +55,116 @@ def test_graclus_cluster(test, dtype, device):
     jit = torch.jit.script(graclus_cluster)
     cluster = jit(row, col, weight)
     assert_correct(row, col, cluster)
+
+    graph = CSRGraph.from_edge_index(row, col, weight)
+    cluster = graclus_cluster(graph)
+    assert_correct(row, col, cluster)
+
+
+@pytest.mark.parametrize('test,dtype,device', product(tests, dtypes, devices))
+def test_graclus_cluster_parallel(test, dtype, device):
+    if dtype == torch.bfloat16 and device == torch.device('cuda:0'):
+        return
+
+    row = tensor(test['row'], torch.long, device)
+    col = tensor(test['col'], torch.long, device)
+    weight = tensor(test.get('weight'), dtype, device)
+
+    cluster = graclus_cluster(row, col, weight, parallel=True)
+    assert_correct(row, col, cluster)
+    ratio = matching_ratio(cluster)
+    assert ratio == 2 * (cluster != torch.arange(4, device=device)).sum() / 4
+
+    jit = torch.jit.script(graclus_cluster)
+    cluster = jit(row, col, weight, parallel=True)
+    assert_correct(row, col, cluster)
+
+    graph = CSRGraph.from_edge_index(row, col, weight)
+    cluster = graclus_cluster(graph, parallel=True)
+    assert_correct(row, col, cluster)
+
+
+def test_graclus_cluster_parallel_quality():
+    torch.manual_seed(12345)
+    row, col = torch.randint(0, 200, (2, 1000))
+    idx = torch.unique(torch.cat([row * 200 + col, col * 200 + row]))
+    row, col = idx // 200, idx % 200
+    mask = row != col
+    row, col = row[mask], col[mask]
+    weight = torch.rand(200, 200)
+    weight = (weight + weight.t())[row, col]
+
+    def matching_weight(cluster):
+        mask = (cluster[row] == cluster[col]) & (row < col)
+        return float(weight[mask].sum())
+
+    for w in [None, weight]:
+        cluster = graclus_cluster(row, col, w, parallel=True)
+        assert_correct(row, col, cluster)
+        assert matching_ratio(cluster) > 0.8
+
+        expected = graclus_cluster(row, col, w)
+        if w is not None:
+            assert matching_weight(cluster) >= 0.9 * matching_weight(expected)
+
+
+@pytest.mark.parametrize('device', devices)
+def test_graclus_cluster_csr(device):
+    # A sorted CSR graph with self-loops: The neighbor order needs to be
+    # randomized internally to not always match the same pairs.
+    row = tensor([0, 0, 0, 0, 1, 1, 2, 2, 3, 3], torch.long, device)
+    col = tensor([0, 1, 2, 3, 0, 1, 0, 2, 0, 3], torch.long, device)
+    rowptr = tensor([0, 4, 6, 8, 10], torch.long, device)
+    graph = CSRGraph(rowptr, col, validate=False)
+    mask = row != col
+
+    clusters = set()
+    for _ in range(50):
+        cluster = graclus_cluster(graph)
+        assert_correct(row[mask], col[mask], cluster)
+        clusters.add(tuple(cluster.tolist()))
+    assert len(clusters) > 1
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_graclus_coarsen(parallel):
+    torch.manual_seed(12345)
+    row, col = torch.randint(0, 50, (2, 200))
+    idx = torch.unique(torch.cat([row * 50 + col, col * 50 + row]))
+    row, col = idx // 50, idx % 50
+    mask = row != col
+    row, col = row[mask], col[mask]
+    weight = torch.rand(50, 50)
+    weight = (weight + weight.t())[row, col]
+
+    for w in [None, weight]:
+        graph = CSRGraph.from_edge_index(row, col, w, num_nodes=50)
+        levels = graclus_coarsen(graph, num_levels=3, parallel=parallel)
+        assert len(levels) == 3
+
+        level_row, level_col, level_weight = row, col, w
+        num_nodes = 50
+        if level_weight is None:
+            level_weight = torch.ones(row.numel())
+        for cluster, perm, coarse in levels:
+            assert cluster.numel() == num_nodes
+            assert_correct(level_row, level_col, cluster)
+            assert cluster.unique().tolist() == list(range(coarse.num_nodes))
+            assert perm.sort()[0].tolist() == list(range(num_nodes))
+            assert (cluster[perm][1:] >= cluster[perm][:-1]).all()
+
+            # Compare against coarsening in COO format:
+            c_row, c_col = cluster[level_row], cluster[level_col]
+            mask = c_row != c_col
+            n = coarse.num_nodes
+            dense = torch.zeros(n, n)
+            dense.index_put_((c_row[mask], c_col[mask]), level_weight[mask],
+                             accumulate=True)
+            out_row = torch.repeat_interleave(
+                torch.arange(n), coarse.rowptr[1:] - coarse.rowptr[:-1])
+            assert coarse.col.numel() == int((dense > 0).sum())
+            assert torch.allclose(dense[out_row, coarse.col], coarse.weight)
+
+            level_row, level_col = out_row, coarse.col
+            level_weight = coarse.weight
+            num_nodes = n
@@ -2,7 +2,7 @@ from itertools import product
 
 import pytest
 import torch
-from torch_cluster import grid_cluster
+from torch_cluster import grid_cluster, grid_pool, sparse_grid_cluster
 from torch_cluster.testing import devices, dtypes, tensor
 
 tests = [{
@@ -41,3 +41,107 @@ def test_grid_cluster(test, dtype, device):
 
     jit = torch.jit.script(grid_cluster)
     assert torch.equal(jit(pos, size, start, end), cluster)
+
+
+@pytest.mark.parametrize('dtype,device', product(dtypes, devices))
+def test_grid_cluster_batch(dtype, device):
+    if dtype == torch.bfloat16 and device == torch.device('cuda:0'):
+        return
+
+    pos1 = tensor([[0, 0], [11, 9], [2, 8], [2, 2], [8, 3]], dtype, device)
+    pos2 = tensor([[103, 101], [109, 109], [101, 104]], dtype, device)
+    size = tensor([5, 5], dtype, device)
+
+    pos = torch.cat([pos1, pos2], dim=0)
+    batch = tensor([0, 0, 0, 0, 0, 1, 1, 1], torch.long, device)
+
+    # Each example is aligned to its own origin and offset by the number of
+    # voxels of previous examples (3 x 2 voxels in the first example):
+    cluster = grid_cluster(pos, size, batch=batch)
+    assert cluster.tolist() == [0, 5, 3, 0, 1, 6, 9, 6]
+    expected = torch.cat([grid_cluster(pos1, size), grid_cluster(pos2, size)])
+    assert torch.equal(cluster[:5], expected[:5])
+    assert torch.equal(cluster[5:] - 6, expected[5:])
+
+    start = tensor([0, 0], dtype, device)
+    end = tensor([19, 19], dtype, device)
+    cluster = grid_cluster(pos1, size, start, end, batch=batch[:5])
+    assert cluster.tolist() == [0, 6, 4, 0, 1]
+
+    cluster = grid_cluster(pos, size, batch=batch)
+    assert torch.equal(grid_cluster(pos, size, ptr=[0, 5, 8]), cluster)
+
+    jit = torch.jit.script(grid_cluster)
+    assert torch.equal(jit(pos, size, None, None, batch), cluster)
+    ptr = tensor([0, 5, 8], torch.long, device)
+    assert torch.equal(jit(pos, size, ptr=ptr), cluster)
+
+
+@pytest.mark.parametrize('reduce,device', product(['mean', 'max'], devices))
+def test_grid_pool(reduce, device):
+    pos = torch.rand(100, 3, device=device) * 10
+    x = torch.randn(100, 8, device=device)
+    batch = torch.randint(0, 3, (100, ), device=device)
+    size = torch.tensor([2., 2., 2.], device=device)
+
+    cluster, count, out_pos, out_x, out_batch = grid_pool(
+        pos, size, x, batch, reduce=reduce)
+
+    # Clusters need to correspond one-to-one to occupied voxels per example:
+    voxel = grid_cluster(pos, size, batch=batch)
+    num_voxels = voxel.unique().numel()
+    assert count.numel() == num_voxels
+    assert torch.stack([voxel, cluster]).unique(dim=1).size(1) == num_voxels
+    assert torch.equal(count, torch.bincount(cluster))
+    assert torch.equal(out_batch[cluster], batch)
+
+    # Clusters are consecutive in order of their first occurrence:
+    first = torch.full_like(count, 100)
+    arange = torch.arange(100, device=device)
+    first.scatter_reduce_(0, cluster, arange, 'amin')
+    assert (first[1:] > first[:-1]).all()
+
+    op = 'amax' if reduce == 'max' else 'mean'
+    for src, out in [(pos, out_pos), (x, out_x)]:
+        index = cluster.view(-1, 1).expand_as(src)
+        expected = src.new_zeros(out.size())
+        expected.scatter_reduce_(0, index, src, op, include_self=False)
+        assert torch.allclose(out, expected)
+
+    cluster, count, out_pos, out_x, out_batch = grid_pool(pos, size)
+    assert count.numel() == grid_cluster(pos, size).unique().numel()
+    assert out_x is None and out_batch is None
+
+    jit = torch.jit.script(grid_pool)
+    assert torch.equal(jit(pos, size)[0], cluster)
+
+
+@pytest.mark.parametrize('test,dtype,device', product(tests, dtypes, devices))
+def test_sparse_grid_cluster(test, dtype, device):
+    if dtype == torch.bfloat16 and device == torch.device('cuda:0'):
+        return
+
+    pos = tensor(test['pos'], dtype, device)
+    size = tensor(test['size'], dtype, device)
+    start = tensor(test.get('start'), dtype, device)
+
+    cluster, voxel = sparse_grid_cluster(pos, size, start)
+    expected = grid_cluster(pos, size, start)
+    num_voxels = expected.unique().numel()
+    assert voxel.size() == (num_voxels, size.numel())
+    assert torch.stack([expected, cluster]).unique(dim=1).size(1) == num_voxels
+
+    jit = torch.jit.script(sparse_grid_cluster)
+    assert torch.equal(jit(pos, size, start)[0], cluster)
+
+
+@pytest.mark.parametrize('device', devices)
+def test_sparse_grid_cluster_large_extent(device):
+    pos = torch.tensor([[0, 0, 0], [1e7, 1e7, 1e7], [1e-7, 0, 0], [2, 2, 2]],
+                       dtype=torch.double, device=device)
+    size = torch.tensor([1e-6, 1e-6, 1e-6], dtype=torch.double, device=device)
+
+    cluster, voxel = sparse_grid_cluster(pos, size)
+    assert cluster.tolist() == [0, 1, 0, 2]
+    assert voxel[0].tolist() == [0, 0, 0]
+    assert voxel[2].tolist() == [2000000, 2000000, 2000000]
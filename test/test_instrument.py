@@ -0,0 +1,49 @@
+import torch
+import torch_cluster
+from torch_cluster import knn_graph, radius_graph, random_walk
+
+
+def test_stats():
+    x = torch.randn(200, 3)
+    row = torch.tensor([0, 1, 1, 1, 2, 2, 3, 3, 4, 4])
+    col = torch.tensor([1, 0, 2, 3, 1, 4, 1, 4, 2, 3])
+    start = torch.arange(5).repeat(20)
+
+    torch_cluster.reset_stats()
+    assert not torch_cluster.enable_stats(False)
+    knn_graph(x, k=4)
+    assert all(value == 0 for value in torch_cluster.stats().values())
+
+    assert not torch_cluster.enable_stats()
+    try:
+        knn_graph(x, k=4)
+        radius_graph(x, r=0.5, batch=torch.arange(200) // 50)
+        random_walk(row, col, start, walk_length=10, p=0.25, q=4)
+
+        stats = torch_cluster.stats(reset=True)
+        assert stats['knn.num_calls'] == 1
+        assert stats['knn.num_queries'] == 200
+        assert stats['knn.num_neighbors'] == 200 * 5
+        assert stats['knn.build_index_ns'] > 0
+        assert stats['knn.query_ns'] > 0
+        assert stats['radius.num_examples'] == 4
+        assert stats['radius.num_brute_force_examples'] == 4
+        assert stats['radius.examples_ns'] > 0
+        assert stats['rw.num_walks'] == 100
+        assert stats['rw.num_steps'] == 1000
+        assert stats['rw.num_rejections'] > 0
+
+        assert all(value == 0 for value in torch_cluster.stats().values())
+    finally:
+        torch_cluster.enable_stats(False)
+
+
+def test_profiler_ranges():
+    x = torch.randn(200, 3)
+    with torch.profiler.profile() as prof:
+        knn_graph(x, k=4)
+    names = {event.name for event in prof.events()}
+    assert 'torch_cluster::knn' in names
+    assert 'torch_cluster::knn::build_index' in names
+    assert 'torch_cluster::knn::query' in names
+    assert 'torch_cluster::knn::output' in names
@@ -0,0 +1,150 @@
+from itertools import product
+
+import pytest
+import torch
+from torch_cluster import DynamicKDTree, KDTree, knn, nearest, radius
+
+
+def to_set(edge_index):
+    return set([(i, j) for i, j in edge_index.t().tolist()])
+
+
+@pytest.mark.parametrize('dtype,dim',
+                         product([torch.float, torch.double], [1, 3]))
+def test_kd_tree(dtype, dim):
+    x = torch.randn(1000, dim).to(dtype)
+    y = torch.randn(100, dim).to(dtype)
+    tree = KDTree(x)
+
+    assert to_set(tree.knn(y, 5)) == to_set(knn(x, y, 5))
+    assert tree.knn(y, 5)[0].tolist() == [i for i in range(100)
+                                          for _ in range(5)]
+    assert to_set(tree.radius(y, 0.5, 1000)) == to_set(
+        radius(x, y, 0.5, max_num_neighbors=1000))
+    assert tree.nearest(y).tolist() == nearest(y, x).tolist()
+
+    row, _ = tree.radius(y, 1.0, max_num_neighbors=3)
+    assert bool((row.bincount(minlength=100) <= 3).all())
+
+    with pytest.raises(RuntimeError, match="same type"):
+        tree.knn(y.to(torch.long), 5)
+
+
+def test_kd_tree_save_load(tmp_path):
+    x = torch.randn(1000, 3)
+    y = torch.randn(100, 3)
+    tree = KDTree(x, leaf_size=4)
+
+    path = str(tmp_path / 'tree.pt')
+    tree.save(path)
+
+    for mmap in [True, False]:
+        loaded = KDTree.load(path, mmap=mmap)
+        assert loaded.leaf_size == 4
+        assert torch.equal(loaded.node, tree.node)
+        assert torch.equal(loaded.knn(y, 5), tree.knn(y, 5))
+        assert torch.equal(loaded.radius(y, 0.5), tree.radius(y, 0.5))
+
+    data = torch.load(path, weights_only=True)
+    data['version'] = 0
+    torch.save(data, path)
+    with pytest.raises(ValueError, match="version"):
+        KDTree.load(path)
+
+
+def test_kd_tree_load_corrupted(tmp_path):
+    tree = KDTree(torch.randn(100, 3), leaf_size=4)
+    path = str(tmp_path / 'tree.pt')
+    leaf = int((tree.node[:, 0] < 0).nonzero()[0])
+    inner = int((tree.node[:, 0] >= 0).nonzero()[-1])
+    num_nodes = tree.node.size(0)
+
+    def corrupt(key, index, value):
+        tree.save(path)
+        data = torch.load(path, weights_only=True)
+        if index is None:
+            data[key] = value
+        else:
+            data[key][index] = value
+        torch.save(data, path)
+        return path
+
+    # Types and shapes are always checked:
+    for key, value in [
+        ('split', tree.split.float()),
+        ('split', tree.split[:-1]),
+        ('bbox', tree.bbox[:2]),
+        ('perm', tree.perm[:-1]),
+        ('node', tree.node[:, :2]),
+    ]:
+        with pytest.raises(ValueError, match=f"'{key}' of type"):
+            KDTree.load(corrupt(key, None, value))
+    with pytest.raises(ValueError, match="points of type"):
+        KDTree.load(corrupt('pos', None, tree.pos.double()))
+
+    # Indices are only bounds-checked on request:
+    for key, index, value in [
+        ('perm', 5, 10**9),
+        ('perm', 5, -1),
+        ('node', (leaf, 2), 101),
+        ('node', (leaf, 1), -1),
+        ('node', (inner, 1), num_nodes),
+        ('node', (inner, 2), 0),  # Cycle.
+        ('node', (inner, 0), 3),
+    ]:
+        KDTree.load(corrupt(key, index, value))
+        with pytest.raises(ValueError, match=f"'{key}' with indices out"):
+            KDTree.load(path, validate=True)
+
+    loaded = KDTree.load(corrupt('perm', 5, int(tree.perm[5])), validate=True)
+    assert torch.equal(loaded.knn(tree.pos, 1), tree.knn(tree.pos, 1))
+
+
+def test_kd_tree_empty():
+    tree = KDTree(torch.empty(0, 3))
+    assert tree.knn(torch.randn(4, 3), 2).size() == (2, 0)
+    assert tree.radius(torch.randn(4, 3), 1.0).size() == (2, 0)
+
+
+@pytest.mark.parametrize('compact_ratio', [0.5, 1.0])
+def test_dynamic_kd_tree(compact_ratio):
+    tree = DynamicKDTree(compact_ratio=compact_ratio)
+    assert tree.knn(torch.randn(4, 3), 2).size() == (2, 0)
+
+    pos = torch.randn(2000, 3)
+    index = torch.cat([tree.insert(chunk) for chunk in pos.split(100)])
+    assert index.tolist() == list(range(2000))
+    assert len(tree) == 2000
+    assert len(tree.trees) <= 11
+
+    alive = torch.ones(2000, dtype=torch.bool)
+    alive[torch.randperm(2000)[:1200]] = False
+    tree.remove((~alive).nonzero().view(-1))
+    tree.remove(torch.tensor([int((~alive).nonzero()[0])]))
+    assert len(tree) == 800
+
+    y = torch.randn(100, 3)
+    perm = alive.nonzero().view(-1)
+    row, col = knn(pos[perm], y, 5)
+    assert to_set(tree.knn(y, 5)) == to_set(torch.stack([row, perm[col]]))
+    assert tree.nearest(y).tolist() == perm[nearest(y, pos[perm])].tolist()
+
+    row, col = radius(pos[perm], y, 0.5, max_num_neighbors=1000)
+    expected = to_set(torch.stack([row, perm[col]]))
+    assert to_set(tree.radius(y, 0.5, 1000)) == expected
+
+    row, col = tree.radius(y, 1.0, max_num_neighbors=3)
+    assert bool((row.bincount(minlength=100) <= 3).all())
+    assert bool(alive[col].all())
+    row, _ = radius(pos[perm], y, 1.0, max_num_neighbors=1000)
+    expected_deg = row.bincount(minlength=100).clamp(max=3)
+    assert torch.equal(tree.radius(y, 1.0, 3)[0].bincount(minlength=100),
+                       expected_deg)
+
+    tree.compact()
+    assert len(tree.trees) == 1 and len(tree) == 800
+    assert to_set(tree.radius(y, 0.5, 1000)) == expected
+
+    index = tree.insert(torch.randn(10, 3))
+    assert index.tolist() == list(range(2000, 2010))
+    assert len(tree) == 810
@@ -41,6 +41,14 @@ def test_knn(dtype, device):
     edge_index = knn(x, y, 2, batch_x, batch_y)
     assert to_set(edge_index) == set([(0, 2), (0, 3), (1, 4), (1, 5)])
 
+    edge_index = knn(x, y, 2, ptr_x=[0, 4, 8], ptr_y=[0, 1, 2])
+    assert to_set(edge_index) == set([(0, 2), (0, 3), (1, 4), (1, 5)])
+
+    ptr_x = tensor([0, 4, 8], torch.long, device)
+    ptr_y = tensor([0, 1, 2], torch.long, device)
+    edge_index = jit(x, y, 2, ptr_x=ptr_x, ptr_y=ptr_y)
+    assert to_set(edge_index) == set([(0, 2), (0, 3), (1, 4), (1, 5)])
+
     if x.is_cuda:
         edge_index = knn(x, y, 2, batch_x, batch_y, cosine=True)
         assert to_set(edge_index) == set([(0, 2), (0, 3), (1, 4), (1, 5)])
@@ -74,6 +82,9 @@ def test_knn_graph(dtype, device):
     assert to_set(edge_index) == set([(1, 0), (3, 0), (0, 1), (2, 1), (1, 2),
                                       (3, 2), (0, 3), (2, 3)])
 
+    edge_index = knn_graph(x, k=1, ptr=[0, 2, 4])
+    assert to_set(edge_index) == set([(1, 0), (0, 1), (3, 2), (2, 3)])
+
 
 @pytest.mark.parametrize('dtype,device', product([torch.float], devices))
 def test_knn_graph_large(dtype, device):
@@ -86,3 +97,45 @@ def test_knn_graph_large(dtype, device):
     truth = set([(i, j) for i, ns in enumerate(col) for j in ns])
 
     assert to_set(edge_index.cpu()) == truth
+
+
+@pytest.mark.parametrize('dtype,device', product([torch.float], devices))
+def test_knn_graph_many_examples(dtype, device):
+    count = torch.randint(1, 100, (200, ))
+    batch = torch.arange(200).repeat_interleave(count).to(device)
+    x = torch.randn(batch.numel(), 3, dtype=dtype, device=device)
+
+    edge_index = knn_graph(x, k=5, batch=batch, flow='target_to_source',
+                           loop=True)
+
+    truth = set()
+    offset = 0
+    for n in count.tolist():
+        tree = scipy.spatial.cKDTree(x[offset:offset + n].cpu().numpy())
+        _, col = tree.query(x[offset:offset + n].cpu(), k=min(n, 5))
+        col = col.reshape(n, -1)
+        truth |= set([(offset + i, offset + j) for i, ns in enumerate(col)
+                      for j in ns])
+        offset += n
+
+    assert to_set(edge_index.cpu()) == truth
+
+
+@pytest.mark.parametrize('sort', [True, False])
+def test_knn_1d(sort):
+    batch = torch.arange(4).repeat_interleave(250)
+    x = torch.rand(1000) * 100 + batch * 100
+    if sort:
+        x = x.sort()[0]
+    batch_y = torch.arange(4).repeat_interleave(25)
+    y = torch.rand(100) * 100 + batch_y * 100
+
+    row, col = knn(x, y, 5, batch, batch_y)
+
+    dist = (y.view(-1, 1) - x.view(1, -1)).abs()
+    dist[batch_y.view(-1, 1) != batch.view(1, -1)] = float('inf')
+    expected = dist.topk(5, dim=1, largest=False)[0]
+
+    assert row.tolist() == torch.arange(100).repeat_interleave(5).tolist()
+    assert bool((batch[col] == batch_y[row]).all())
+    assert torch.allclose((y[row] - x[col]).abs().view(100, 5), expected)
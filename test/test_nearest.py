@@ -34,6 +34,14 @@ def test_nearest(dtype, device):
     out = nearest(x, y)
     assert out.tolist() == [0, 0, 1, 1, 2, 2, 3, 3]
 
+    out = nearest(x, y, ptr_x=[0, 4, 8], ptr_y=[0, 2, 4])
+    assert out.tolist() == [0, 0, 1, 1, 2, 2, 3, 3]
+
+    jit = torch.jit.script(nearest)
+    ptr_x = tensor([0, 4, 8], torch.long, device)
+    ptr_y = tensor([0, 2, 4], torch.long, device)
+    assert jit(x, y, ptr_x=ptr_x, ptr_y=ptr_y).tolist() == out.tolist()
+
     # Invalid input: instance 1 only in batch_x
     batch_x = tensor([0, 0, 0, 0, 1, 1, 1, 1], torch.long, device)
     batch_y = tensor([0, 0, 0, 0], torch.long, device)
@@ -62,3 +70,35 @@ def test_nearest(dtype, device):
     batch_y = tensor([0, 0, 1, 0], torch.long, device)
     with pytest.raises(ValueError):
         nearest(x, y, batch_x, batch_y)
+
+
+@pytest.mark.parametrize('dim,device', product([3, 32], devices))
+def test_nearest_large(dim, device):
+    x = torch.randn(1000, dim, device=device)
+    y = torch.randn(200, dim, device=device)
+    batch_x = torch.arange(2, device=device).repeat_interleave(500)
+    batch_y = torch.arange(2, device=device).repeat_interleave(100)
+
+    out = nearest(x, y, batch_x, batch_y)
+    dist = torch.cdist(x, y)
+    dist[batch_x.view(-1, 1) != batch_y.view(1, -1)] = float('inf')
+    assert torch.equal(out, dist.argmin(dim=1))
+
+    jit = torch.jit.script(nearest)
+    assert torch.equal(jit(x, y, batch_x, batch_y), out)
+
+
+@pytest.mark.parametrize('device', devices)
+def test_nearest_empty(device):
+    x = torch.empty(0, 2, device=device)
+    y = torch.randn(4, 2, device=device)
+    batch_y = torch.tensor([0, 0, 1, 1], device=device)
+
+    for out in [
+            nearest(x, y),
+            nearest(x, y, torch.empty(0, dtype=torch.long, device=device),
+                    batch_y),
+            nearest(x, y, ptr_x=[0, 0, 0], ptr_y=[0, 2, 4]),
+    ]:
+        assert out.tolist() == []
+        assert out.dtype == torch.long
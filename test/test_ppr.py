@@ -0,0 +1,111 @@
+import pytest
+import torch
+from torch_cluster import CSRGraph, ppr
+from torch_cluster.testing import devices, tensor
+
+
+def exact_ppr(row, col, num_nodes, alpha):
+    adj = torch.zeros(num_nodes, num_nodes, dtype=torch.double)
+    adj[row, col] = 1
+    adj = adj / adj.sum(dim=1, keepdim=True)
+    eye = torch.eye(num_nodes, dtype=torch.double)
+    return alpha * torch.linalg.inv(eye - (1 - alpha) * adj)
+
+
+@pytest.mark.parametrize('device', devices)
+def test_ppr(device):
+    row = tensor([0, 1, 1, 1, 2, 2, 3, 3, 4, 4], torch.long, device)
+    col = tensor([1, 0, 2, 3, 1, 4, 1, 4, 2, 3], torch.long, device)
+    graph = CSRGraph.from_edge_index(row, col)
+    start = tensor([0, 1, 2, 3, 4], torch.long, device)
+
+    edge_index, score = ppr(graph, start, alpha=0.2, num_walks=20000, topk=5)
+    assert edge_index.size() == (2, 25)
+    assert score.size() == (25, )
+
+    out = torch.zeros(5, 5)
+    out[edge_index[0].cpu(), edge_index[1].cpu()] = score.cpu()
+    expected = exact_ppr(row.cpu(), col.cpu(), 5, alpha=0.2).to(torch.float)
+    assert torch.allclose(out, expected, atol=0.02)
+
+    edge_index, score = ppr(graph, start, alpha=0.2, num_walks=100, topk=2)
+    assert edge_index.size() == (2, 10)
+    assert edge_index[0].tolist() == [0, 0, 1, 1, 2, 2, 3, 3, 4, 4]
+    assert (score[::2] >= score[1::2]).all()
+
+
+@pytest.mark.parametrize('device', devices)
+def test_ppr_dead_end(device):
+    # Walks that reach a dead end continue at their start node:
+    row = tensor([0], torch.long, device)
+    col = tensor([1], torch.long, device)
+    graph = CSRGraph.from_edge_index(row, col, num_nodes=3)
+    start = tensor([1, 2], torch.long, device)
+
+    edge_index, score = ppr(graph, start, alpha=0.5, num_walks=10000, topk=4)
+    assert edge_index.tolist() == [[0, 1], [1, 2]]
+    assert torch.allclose(score.cpu(), torch.tensor([1., 1.]), atol=0.05)
+
+    # Node 1 and node 2 are sinks:
+    weight = tensor([1, 3], torch.float, device)
+    graph = CSRGraph.from_edge_index(tensor([0, 0], torch.long, device),
+                                     tensor([1, 2], torch.long, device),
+                                     weight)
+    start = tensor([0], torch.long, device)
+    edge_index, score = ppr(graph, start, alpha=0.5, num_walks=20000, topk=4)
+    assert edge_index[1].tolist() == [0, 2, 1]
+    assert torch.allclose(score.cpu(), torch.tensor([2 / 3, 1 / 4, 1 / 12]),
+                          atol=0.01)
+
+    # Node 4 is a sink:
+    row = tensor([0, 0, 1, 2, 2, 3], torch.long, device)
+    col = tensor([1, 2, 2, 3, 4, 0], torch.long, device)
+    graph = CSRGraph.from_edge_index(row, col, num_nodes=5)
+    start = tensor([0, 4], torch.long, device)
+    edge_index, score = ppr(graph, start, alpha=0.2, num_walks=20000, topk=5)
+
+    out = torch.zeros(2, 5)
+    out[edge_index[0].cpu(), edge_index[1].cpu()] = score.cpu()
+    # Walks from node 0 behave as if node 4 linked back to node 0:
+    row = torch.cat([row.cpu(), torch.tensor([4])])
+    col = torch.cat([col.cpu(), torch.tensor([0])])
+    expected = exact_ppr(row, col, 5, alpha=0.2)[0].to(torch.float)
+    assert torch.allclose(out[0], expected, atol=0.02)
+    assert torch.allclose(out[1], torch.tensor([0., 0., 0., 0., 1.]),
+                          atol=0.02)
+    assert torch.allclose(out.sum(dim=1), torch.ones(2), atol=0.02)
+
+
+@pytest.mark.parametrize('device', devices)
+def test_ppr_many_visited_nodes(device):
+    # Node 0 links to 4000 leaves, which all link to node 4001, which links
+    # back to node 0, so that walks visit more than 2048 distinct nodes:
+    num_leaves = 4000
+    leaves = torch.arange(1, num_leaves + 1)
+    hub = num_leaves + 1
+    row = torch.cat([torch.zeros(num_leaves, dtype=torch.long), leaves,
+                     torch.tensor([hub])])
+    col = torch.cat([leaves, torch.full((num_leaves, ), hub),
+                     torch.tensor([0])])
+    num_nodes = num_leaves + 2
+
+    out = []
+    for dev in ['cpu', device]:
+        graph = CSRGraph.from_edge_index(row.to(dev), col.to(dev))
+        start = torch.tensor([0], device=dev)
+        edge_index, score = ppr(graph, start, alpha=0.2, num_walks=10000,
+                                topk=num_nodes)
+        assert edge_index.size(1) > 3900
+        assert edge_index[1, :2].tolist() == [0, hub]
+        dense = torch.zeros(num_nodes)
+        dense[edge_index[1].cpu()] = score.cpu()
+        out.append(dense)
+
+    # Expected visits `x_0 = 1 + 0.8^3 * x_0` of node 0:
+    x_0 = 0.2 / (1 - 0.8**3)
+    expected = torch.tensor([x_0, 0.64 * x_0])
+    for dense in out:
+        assert torch.allclose(dense[[0, hub]], expected, atol=0.02)
+        assert abs(dense[leaves].sum() - 0.8 * x_0) < 0.02
+        assert abs(dense.sum() - 1) < 0.02
+    assert torch.allclose(out[0], out[1], atol=0.02)
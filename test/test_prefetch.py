@@ -0,0 +1,49 @@
+import time
+
+import pytest
+import torch
+from torch_cluster import CSRGraph, PrefetchLoader, multi_hop_sampler
+
+
+def test_prefetch_loader():
+    row = torch.tensor([0, 1, 1, 1, 2, 2, 3, 3, 4, 4])
+    col = torch.tensor([1, 0, 2, 3, 1, 4, 1, 4, 2, 3])
+    graph = CSRGraph.from_edge_index(row, col)
+
+    loader = PrefetchLoader(
+        lambda seed: multi_hop_sampler(seed, graph, sizes=[2, 2]),
+        torch.arange(5).split(2), depth=2, num_workers=2)
+    assert str(loader) == 'PrefetchLoader(depth=2, num_workers=2)'
+
+    for _ in range(2):  # Loaders can be iterated multiple times:
+        seeds = []
+        for blocks in loader:
+            assert len(blocks) == 2
+            seeds.append(blocks[0][3][:blocks[0][0].numel() - 1].tolist())
+        assert seeds == [[0, 1], [2, 3], [4]]
+
+        stats = loader.stats()
+        assert stats['num_batches'] == 3
+        assert stats['wait_time'] >= 0 and stats['compute_time'] >= 0
+
+
+def test_prefetch_loader_order_and_depth():
+    def sample_fn(i):
+        time.sleep(0.01 * (5 - i))
+        return torch.tensor([i])
+
+    loader = PrefetchLoader(sample_fn, range(5), depth=3, num_workers=3)
+    assert [int(x) for x in loader] == [0, 1, 2, 3, 4]
+    assert loader.stats()['compute_time'] > 0.1
+
+    # Breaking early does not block or leak pending work:
+    for x in PrefetchLoader(sample_fn, range(5), depth=3):
+        break
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason='CUDA not found')
+def test_prefetch_loader_pin_memory():
+    loader = PrefetchLoader(lambda i: (torch.tensor([i]), [torch.ones(2)]),
+                            range(3), pin_memory=True)
+    for x, (y, ) in loader:
+        assert x.is_pinned() and y.is_pinned()
@@ -44,6 +44,12 @@ def test_radius(dtype, device):
     assert to_set(edge_index) == set([(0, 0), (0, 1), (0, 2), (0, 3), (1, 5),
                                       (1, 6)])
 
+    ptr_x = tensor([0, 4, 8], torch.long, device)
+    ptr_y = tensor([0, 1, 2], torch.long, device)
+    edge_index = jit(x, y, 2, max_num_neighbors=4, ptr_x=ptr_x, ptr_y=ptr_y)
+    assert to_set(edge_index) == set([(0, 0), (0, 1), (0, 2), (0, 3), (1, 5),
+                                      (1, 6)])
+
     # Skipping a batch
     batch_x = tensor([0, 0, 0, 0, 2, 2, 2, 2], torch.long, device)
     batch_y = tensor([0, 2], torch.long, device)
@@ -74,6 +80,9 @@ def test_radius_graph(dtype, device):
     assert to_set(edge_index) == set([(1, 0), (3, 0), (0, 1), (2, 1), (1, 2),
                                       (3, 2), (0, 3), (2, 3)])
 
+    edge_index = radius_graph(x, r=2.5, ptr=[0, 2, 4])
+    assert to_set(edge_index) == set([(1, 0), (0, 1), (3, 2), (2, 3)])
+
 
 @pytest.mark.parametrize('dtype,device', product([torch.float], devices))
 def test_radius_graph_large(dtype, device):
@@ -90,3 +99,45 @@ def test_radius_graph_large(dtype, device):
     truth = set([(i, j) for i, ns in enumerate(col) for j in ns])
 
     assert to_set(edge_index.cpu()) == truth
+
+
+@pytest.mark.parametrize('dtype,device', product([torch.float], devices))
+def test_radius_graph_many_examples(dtype, device):
+    count = torch.randint(1, 100, (200, ))
+    batch = torch.arange(200).repeat_interleave(count).to(device)
+    x = torch.randn(batch.numel(), 3, dtype=dtype, device=device)
+
+    edge_index = radius_graph(x, r=0.5, batch=batch, flow='target_to_source',
+                              loop=True, max_num_neighbors=2000)
+
+    truth = set()
+    offset = 0
+    for n in count.tolist():
+        tree = scipy.spatial.cKDTree(x[offset:offset + n].cpu().numpy())
+        col = tree.query_ball_point(x[offset:offset + n].cpu(), r=0.5)
+        truth |= set([(offset + i, offset + j) for i, ns in enumerate(col)
+                      for j in ns])
+        offset += n
+
+    assert to_set(edge_index.cpu()) == truth
+
+
+@pytest.mark.parametrize('sort', [True, False])
+def test_radius_1d(sort):
+    batch = torch.arange(4).repeat_interleave(250)
+    x = torch.rand(1000) * 100 + batch * 100
+    if sort:
+        x = x.sort()[0]
+    batch_y = torch.arange(4).repeat_interleave(25)
+    y = torch.rand(100) * 100 + batch_y * 100
+
+    edge_index = radius(x, y, 1.0, batch, batch_y, max_num_neighbors=1000)
+
+    dist = (y.view(-1, 1) - x.view(1, -1)).abs()
+    dist[batch_y.view(-1, 1) != batch.view(1, -1)] = float('inf')
+    truth = set([(i, j) for i, j in (dist < 1.0).nonzero().tolist()])
+    assert to_set(edge_index) == truth
+
+    row, col = radius(x, y, 1.0, batch, batch_y, max_num_neighbors=2)
+    assert bool((row.bincount(minlength=100) <= 2).all())
+    assert bool(((y[row] - x[col]).abs() < 1.0).all())
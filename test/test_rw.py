@@ -1,6 +1,6 @@
 import pytest
 import torch
-from torch_cluster import random_walk
+from torch_cluster import CSRGraph, alias_table, random_walk
 from torch_cluster.testing import devices, tensor
 
 
@@ -34,6 +34,9 @@ def test_rw_small(device):
     jit = torch.jit.script(random_walk)
     assert torch.equal(jit(row, col, start, walk_length, num_nodes=3), out)
 
+    graph = CSRGraph.from_edge_index(row, col, num_nodes=3)
+    assert torch.equal(random_walk(graph, None, start, walk_length), out)
+
 
 @pytest.mark.parametrize('device', devices)
 def test_rw_large_with_edge_indices(device):
@@ -85,3 +88,59 @@ def test_rw_small_with_edge_indices(device):
         [1, 0, 1, 0],
         [-1, -1, -1, -1],
     ]
+
+
+@pytest.mark.parametrize('device', devices)
+def test_rw_weighted(device):
+    row = tensor([0, 0, 1, 1, 1, 2, 2, 3, 3, 4, 4], torch.long, device)
+    col = tensor([1, 2, 0, 2, 3, 0, 1, 1, 4, 0, 3], torch.long, device)
+    weight = tensor([1, 0, 1, 0, 2, 0, 1, 1, 3, 1, 0], torch.float, device)
+    start = torch.arange(5, device=device).repeat(20)
+    walk_length = 10
+
+    for p, q in [(1, 1), (0.5, 2), (4, 0.25)]:
+        node_seq, edge_seq = random_walk(row, col, start, walk_length, p, q,
+                                         edge_weight=weight,
+                                         return_edge_indices=True)
+        assert node_seq[:, 0].tolist() == start.tolist()
+
+        # Edges with zero weight are never traversed:
+        assert weight[edge_seq.view(-1)].min() > 0
+
+        for n in range(start.size(0)):
+            cur = node_seq[n, 0].item()
+            for i in range(1, walk_length + 1):
+                assert node_seq[n, i].item() in col[row == cur].tolist()
+                cur = node_seq[n, i].item()
+
+    jit = torch.jit.script(random_walk)
+    assert jit(row, col, start, walk_length, edge_weight=weight).size() == (
+        start.numel(), walk_length + 1)
+
+
+@pytest.mark.parametrize('device', devices)
+def test_rw_weighted_distribution(device):
+    row = tensor([0, 0, 0, 1, 2, 3], torch.long, device)
+    col = tensor([1, 2, 3, 0, 0, 0], torch.long, device)
+    weight = tensor([1, 2, 5, 1, 1, 1], torch.float, device)
+    start = torch.zeros(10000, dtype=torch.long, device=device)
+
+    alias = alias_table(row, col, weight)
+    out = random_walk(row, col, start, 1, alias=alias)
+
+    count = torch.bincount(out[:, 1], minlength=4).cpu()
+    assert count[0] == 0
+    expected = torch.tensor([0.125, 0.25, 0.625])
+    assert torch.allclose(count[1:] / 10000., expected, atol=0.02)
+
+
+@pytest.mark.parametrize('device', devices)
+def test_rw_weighted_csr(device):
+    row = tensor([0, 0, 1, 2, 2], torch.long, device)
+    col = tensor([1, 2, 2, 0, 1], torch.long, device)
+    weight = tensor([1, 0, 1, 0, 1], torch.float, device)
+    start = tensor([0, 1, 2], torch.long, device)
+
+    graph = CSRGraph.from_edge_index(row, col, weight)
+    out = random_walk(graph, None, start, 3)
+    assert out.tolist() == [[0, 1, 2, 1], [1, 2, 1, 2], [2, 1, 2, 1]]
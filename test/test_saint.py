@@ -0,0 +1,43 @@
+import pytest
+import torch
+from torch_cluster import CSRGraph, saint_norm, saint_subgraph
+from torch_cluster.testing import devices, tensor
+
+
+@pytest.mark.parametrize('device', devices)
+def test_saint_subgraph(device):
+    row = tensor([0, 1, 1, 1, 2, 2, 3, 3, 4, 4], torch.long, device)
+    col = tensor([1, 0, 2, 3, 1, 4, 1, 4, 2, 3], torch.long, device)
+    graph = CSRGraph.from_edge_index(row, col)
+
+    node, edge_index, edge_id = saint_subgraph(graph, tensor([0], torch.long,
+                                                             device), 0)
+    assert node.tolist() == [0]
+    assert edge_index.size() == (2, 0) and edge_id.numel() == 0
+
+    for _ in range(10):
+        start = tensor([0, 3], torch.long, device)
+        node, edge_index, edge_id = saint_subgraph(graph, start, 2)
+
+        assert node.tolist() == sorted(set(node.tolist()))
+        assert set(start.tolist()) <= set(node.tolist())
+
+        mask = torch.zeros(5, dtype=torch.bool, device=device)
+        mask[node] = True
+        expected = (mask[row] & mask[col]).nonzero().view(-1)
+        assert edge_id.tolist() == expected.tolist()
+        assert node[edge_index[0]].tolist() == row[edge_id].tolist()
+        assert node[edge_index[1]].tolist() == col[edge_id].tolist()
+
+
+@pytest.mark.parametrize('device', devices)
+def test_saint_norm(device):
+    row = tensor([0, 1, 1, 2], torch.long, device)
+    col = tensor([1, 0, 2, 1], torch.long, device)
+    graph = CSRGraph.from_edge_index(row, col)
+
+    node_count, edge_count = saint_norm(graph, num_roots=3, walk_length=2,
+                                        num_samples=20)
+    assert node_count.size() == (3, ) and edge_count.size() == (4, )
+    assert node_count.max() <= 20 and node_count.sum() > 0
+    assert edge_count.max() <= node_count.max()
@@ -1,6 +1,6 @@
 import torch
 
-from torch_cluster import neighbor_sampler
+from torch_cluster import CSRGraph, multi_hop_sampler, neighbor_sampler
 
 
 def test_neighbor_sampler():
@@ -10,7 +10,144 @@ def test_neighbor_sampler():
     cumdeg = torch.tensor([0, 3, 7])
 
     e_id = neighbor_sampler(start, cumdeg, size=1.0)
-    assert e_id.tolist() == [0, 2, 1, 5, 6, 3, 4]
+    assert e_id.tolist() == [0, 1, 2, 3, 4, 5, 6]
 
     e_id = neighbor_sampler(start, cumdeg, size=3)
-    assert e_id.tolist() == [1, 0, 2, 4, 5, 6]
+    assert e_id[:3].tolist() == [0, 1, 2]
+    assert len(set(e_id[3:].tolist())) == 3
+    assert set(e_id[3:].tolist()) <= {3, 4, 5, 6}
+
+    e_id = neighbor_sampler(start, cumdeg, size=0.5)
+    assert e_id.numel() == 4
+    assert set(e_id[:2].tolist()) <= {0, 1, 2}
+    assert len(set(e_id[2:].tolist())) == 2
+    assert set(e_id[2:].tolist()) <= {3, 4, 5, 6}
+
+    torch.manual_seed(1234)
+    out = neighbor_sampler(start, cumdeg, size=2)
+    torch.manual_seed(1234)
+    assert torch.equal(neighbor_sampler(start, cumdeg, size=2), out)
+
+    graph = CSRGraph(cumdeg, torch.tensor([0, 1, 1, 0, 0, 1, 1]))
+    e_id = neighbor_sampler(start, graph, size=1.0)
+    assert e_id.sort()[0].tolist() == [0, 1, 2, 3, 4, 5, 6]
+
+
+def test_neighbor_sampler_large():
+    start = torch.arange(3)
+    cumdeg = torch.tensor([0, 1000, 1100, 1100])
+
+    for size in [10, 100, 500]:
+        e_id = neighbor_sampler(start, cumdeg, size=size)
+        assert e_id.numel() == size + min(size, 100)
+        first = e_id[:size]
+        assert first.unique().numel() == size
+        assert first.min() >= 0 and first.max() < 1000
+        second = e_id[size:]
+        assert second.unique().numel() == second.numel()
+        assert second.min() >= 1000 and second.max() < 1100
+
+    # Samples are drawn uniformly:
+    count = torch.zeros(100, dtype=torch.long)
+    for _ in range(200):
+        e_id = neighbor_sampler(torch.tensor([1]), cumdeg, size=10) - 1000
+        count += torch.bincount(e_id, minlength=100)
+    assert count.min() > 0 and count.max() < 60
+
+
+def test_multi_hop_sampler():
+    row = torch.tensor([0, 0, 1, 1, 1, 2, 2, 3, 3, 4, 4, 5])
+    col = torch.tensor([1, 2, 0, 3, 4, 0, 5, 1, 4, 1, 3, 2])
+    graph = CSRGraph.from_edge_index(row, col)
+    seed = torch.tensor([0, 5])
+
+    blocks = multi_hop_sampler(seed, graph, sizes=[-1, -1])
+    assert len(blocks) == 2
+
+    rowptr, col_, e_id, node = blocks[0]
+    assert rowptr.tolist() == [0, 2, 3]
+    assert e_id.tolist() == [0, 1, 11]
+    assert node.tolist() == [0, 5, 1, 2]
+    assert col_.tolist() == [2, 3, 3]
+
+    rowptr, col_, e_id, node = blocks[1]
+    assert rowptr.tolist() == [0, 2, 3, 6, 8]
+    assert node.tolist() == [0, 5, 1, 2, 3, 4]
+    assert node[col_].tolist() == graph.col[e_id].tolist()
+
+    for _ in range(10):
+        blocks = multi_hop_sampler(seed, graph, sizes=[1, 2])
+        targets = seed
+        for (rowptr, col_, e_id, node), size in zip(blocks, [1, 2]):
+            assert node[:targets.numel()].tolist() == targets.tolist()
+            assert rowptr.numel() == targets.numel() + 1
+            deg = rowptr[1:] - rowptr[:-1]
+            full = graph.rowptr[targets + 1] - graph.rowptr[targets]
+            assert deg.tolist() == full.clamp(max=size).tolist()
+            assert node[col_].tolist() == graph.col[e_id].tolist()
+            src = torch.repeat_interleave(targets, deg)
+            assert src.tolist() == row[e_id].tolist()
+            assert node.unique().numel() == node.numel()
+            targets = node
+
+
+def test_weighted_neighbor_sampler():
+    start = torch.tensor([0, 1])
+    cumdeg = torch.tensor([0, 3, 7])
+    weight = torch.tensor([1., 0., 3., 1., 1., 1., 5.])
+
+    e_id, prob = neighbor_sampler(start, cumdeg, 5, weight, return_prob=True)
+    assert e_id[:2].sort()[0].tolist() == [0, 2]
+    assert e_id[2:].sort()[0].tolist() == [3, 4, 5, 6]
+    assert prob.tolist() == [1.] * 6
+
+    count = torch.zeros(7)
+    for _ in range(2000):
+        e_id = neighbor_sampler(start, cumdeg, 0.1, weight)
+        assert e_id.numel() == 2
+        count[e_id] += 1
+    assert count[1] == 0
+    assert torch.allclose(count / 2000, weight / torch.tensor([4.] * 3 +
+                                                              [8.] * 4),
+                          atol=0.05)
+
+    e_id, prob = neighbor_sampler(start, cumdeg, 1.0, return_prob=True)
+    assert prob.tolist() == [1.] * 7
+    e_id, prob = neighbor_sampler(start, cumdeg, 3, return_prob=True)
+    assert torch.allclose(prob, torch.tensor([1.] * 3 + [0.75] * 3))
+    e_id, prob = neighbor_sampler(start, cumdeg, 0.5, return_prob=True)
+    assert torch.allclose(prob, torch.tensor([2 / 3] * 2 + [0.5] * 2))
+    # Fractional sizes that are not exactly representable:
+    e_id, prob = neighbor_sampler(torch.tensor([0]), torch.tensor([0, 50]),
+                                  0.3, return_prob=True)
+    assert prob.numel() == e_id.numel()
+    assert torch.allclose(prob, torch.full_like(prob, e_id.numel() / 50))
+
+    # Inclusion probabilities yield unbiased Horvitz-Thompson estimators:
+    estimate = 0.
+    for _ in range(2000):
+        e_id, prob = neighbor_sampler(start, cumdeg, 2, weight,
+                                      return_prob=True)
+        assert ((prob > 0) & (prob <= 1)).all()
+        estimate += (e_id.float() / prob).sum().item() / 2000
+    assert abs(estimate - (weight > 0).float() @ torch.arange(7.)) < 1.5
+
+    row = torch.tensor([0, 0, 0, 1, 2, 3])
+    col = torch.tensor([1, 2, 3, 0, 0, 0])
+    graph = CSRGraph.from_edge_index(row, col)
+    weight = torch.tensor([0., 1., 1., 1., 1., 1.])
+    blocks, probs = multi_hop_sampler(torch.tensor([0]), graph, [-1, 1],
+                                      weight, return_prob=True)
+    assert blocks[0][2].sort()[0].tolist() == [1, 2]
+    assert probs[0].tolist() == [1., 1.]
+    assert blocks[1][0].tolist() == [0, 1, 2, 3]
+    assert 0 < probs[1][0] < 1
+    assert probs[1][1:].tolist() == [1., 1.]
+
+    # Weights of graph handles are used by default:
+    graph = CSRGraph.from_edge_index(row, col, weight=weight)
+    for _ in range(20):
+        e_id = neighbor_sampler(torch.tensor([0]), graph, 2)
+        assert e_id.sort()[0].tolist() == [1, 2]
+        blocks = multi_hop_sampler(torch.tensor([0]), graph, [1])
+        assert blocks[0][2].item() in [1, 2]
@@ -0,0 +1,59 @@
+import os
+import os.path as osp
+
+import pytest
+import torch
+from torch_cluster import knn_graph, sharded_knn_graph
+
+
+def to_set(edge_index):
+    return set([(i, j) for i, j in edge_index.t().tolist()])
+
+
+@pytest.mark.parametrize('loop', [True, False])
+def test_sharded_knn_graph(loop):
+    x = torch.randn(500, 3)
+
+    expected = knn_graph(x, k=5, loop=loop)
+    out = sharded_knn_graph(x, k=5, num_shards=7, loop=loop)
+    assert out.size() == (2, 500 * 5)
+    assert to_set(out) == to_set(expected)
+
+    out = sharded_knn_graph(x, k=5, num_shards=7, loop=loop,
+                            flow='target_to_source')
+    assert to_set(out) == to_set(expected.flip([0]))
+
+    out = sharded_knn_graph(x[:3], k=5, num_shards=2, loop=loop)
+    assert out.size(1) == (9 if loop else 6)
+
+
+def test_sharded_knn_graph_checkpoint(tmp_path):
+    x = torch.randn(500, 3)
+    expected = to_set(knn_graph(x, k=5))
+
+    path = str(tmp_path)
+    out = sharded_knn_graph(x, k=5, num_shards=4, checkpoint_dir=path)
+    assert to_set(out) == expected
+    assert sorted(os.listdir(path)) == [
+        'index.bin', 'meta.json', 'shard_0.done', 'shard_1.done',
+        'shard_2.done', 'shard_3.done'
+    ]
+
+    # Simulate a job that got killed while processing the last shard:
+    index = torch.from_file(osp.join(path, 'index.bin'), shared=True,
+                            size=500 * 5, dtype=torch.long)
+    index[375 * 5:] = 0
+    os.remove(osp.join(path, 'shard_3.done'))
+
+    out = sharded_knn_graph(x, k=5, num_shards=4, checkpoint_dir=path)
+    assert to_set(out) == expected
+
+    with pytest.raises(ValueError, match="different job"):
+        sharded_knn_graph(x, k=6, num_shards=4, checkpoint_dir=path)
+
+
+def test_sharded_knn_graph_workers():
+    x = torch.randn(500, 3)
+
+    out = sharded_knn_graph(x, k=5, num_shards=4, num_workers=2)
+    assert to_set(out) == to_set(knn_graph(x, k=5))
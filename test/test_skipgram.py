@@ -0,0 +1,68 @@
+import pytest
+import torch
+from torch_cluster import CSRGraph, SkipGramLoader, skipgram
+from torch_cluster.testing import devices, tensor
+
+
+def window_pairs(walk, window_size):
+    out = set()
+    for i in range(len(walk)):
+        for j in range(len(walk)):
+            if i != j and abs(i - j) <= window_size:
+                out.add((walk[i], walk[j]))
+    return out
+
+
+@pytest.mark.parametrize('device', devices)
+def test_skipgram(device):
+    # A directed cycle makes walks deterministic:
+    row = tensor([0, 1, 2, 3, 4], torch.long, device)
+    col = tensor([1, 2, 3, 4, 0], torch.long, device)
+    graph = CSRGraph.from_edge_index(row, col)
+    start = tensor([0, 2], torch.long, device)
+
+    pos, neg = skipgram(graph, start, walk_length=3, window_size=2)
+    assert pos.size() == (2, 2 * (2 + 4 + 4))
+    assert neg.size() == (2, 0)
+    assert set(map(tuple, pos[:, :10].t().tolist())) == window_pairs(
+        [0, 1, 2, 3], 2)
+    assert set(map(tuple, pos[:, 10:].t().tolist())) == window_pairs(
+        [2, 3, 4, 0], 2)
+
+    pos, neg = skipgram(graph, start, 3, 2, num_negatives=3)
+    assert neg.size() == (2, 3 * pos.size(1))
+    assert neg[0].tolist() == pos[0].repeat_interleave(3).tolist()
+    assert neg[1].min() >= 0 and neg[1].max() < 5
+
+
+@pytest.mark.parametrize('device', devices)
+def test_skipgram_negative_distribution(device):
+    # Node 0 has degree 16, all other nodes have degree 1:
+    row = tensor([0] * 16 + [1, 2], torch.long, device)
+    col = tensor(list(range(16)) + [0, 0], torch.long, device)
+    graph = CSRGraph.from_edge_index(row, col)
+    start = torch.zeros(2000, dtype=torch.long, device=device)
+
+    _, neg = skipgram(graph, start, 1, 1, num_negatives=5)
+    count = torch.bincount(neg[1], minlength=16).cpu()
+    assert count[3:].sum() == 0
+    assert torch.allclose(count[0] / count.sum(), torch.tensor(8. / 10.),
+                          atol=0.02)
+
+
+@pytest.mark.parametrize('device', devices)
+def test_skipgram_loader(device):
+    row = tensor([0, 1, 1, 2, 2, 3], torch.long, device)
+    col = tensor([1, 0, 2, 1, 3, 2], torch.long, device)
+    graph = CSRGraph.from_edge_index(row, col)
+
+    loader = SkipGramLoader(graph, walk_length=4, window_size=2,
+                            num_negatives=2, batch_size=3, walks_per_node=2)
+    assert len(loader) == 3
+
+    sizes = []
+    for pos, neg in loader:
+        assert neg.size(1) == 2 * pos.size(1)
+        assert (pos[0] != pos[1]).sum() > 0
+        sizes.append(pos.size(1))
+    assert sizes == [42, 42, 28]
@@ -7,7 +7,7 @@ __version__ = '1.6.3'
 
 for library in [
         '_version', '_grid', '_graclus', '_fps', '_rw', '_sampler', '_nearest',
-        '_knn', '_radius'
+        '_knn', '_radius', '_kdtree'
 ]:
     cuda_spec = importlib.machinery.PathFinder().find_spec(
         f'{library}_cuda', [osp.dirname(__file__)])
@@ -36,25 +36,53 @@ if torch.version.cuda is not None and cuda_version != -1:  # pragma: no cover
             f'{major}.{minor}. Please reinstall the torch_cluster that '
             f'matches your PyTorch install.')
 
-from .fps import fps  # noqa
-from .graclus import graclus_cluster  # noqa
-from .grid import grid_cluster  # noqa
+from .csr import CSRGraph  # noqa
+from .fps import fps, fps_group  # noqa
+from .graclus import graclus_cluster, graclus_coarsen, matching_ratio  # noqa
+from .grid import grid_cluster, grid_pool, sparse_grid_cluster  # noqa
+from .instrument import enable_stats, reset_stats, stats  # noqa
+from .kdtree import DynamicKDTree, KDTree  # noqa
 from .knn import knn, knn_graph  # noqa
 from .nearest import nearest  # noqa
+from .ppr import ppr  # noqa
+from .prefetch import PrefetchLoader  # noqa
 from .radius import radius, radius_graph  # noqa
-from .rw import random_walk  # noqa
-from .sampler import neighbor_sampler  # noqa
+from .rw import alias_table, random_walk  # noqa
+from .saint import saint_norm, saint_subgraph  # noqa
+from .sampler import multi_hop_sampler, neighbor_sampler  # noqa
+from .sharded import sharded_knn_graph  # noqa
+from .skipgram import SkipGramLoader, skipgram  # noqa
 
 __all__ = [
+    'CSRGraph',
     'graclus_cluster',
+    'matching_ratio',
+    'graclus_coarsen',
     'grid_cluster',
+    'grid_pool',
+    'sparse_grid_cluster',
     'fps',
+    'fps_group',
     'nearest',
+    'KDTree',
+    'DynamicKDTree',
     'knn',
     'knn_graph',
+    'sharded_knn_graph',
     'radius',
     'radius_graph',
     'random_walk',
+    'alias_table',
+    'ppr',
+    'saint_subgraph',
+    'saint_norm',
     'neighbor_sampler',
+    'multi_hop_sampler',
+    'PrefetchLoader',
+    'skipgram',
+    'SkipGramLoader',
+    'stats',
+    'enable_stats',
+    'reset_stats',
     '__version__',
 ]
@@ -0,0 +1,125 @@
+from typing import Optional, Tuple
+
+import torch
+from torch import Tensor
+
+
+class CSRGraph:
+    r"""A graph in compressed sparse row (CSR) representation, which can be
+    passed directly to :meth:`random_walk`, :meth:`graclus_cluster` and
+    :meth:`neighbor_sampler`.
+    The input is validated once on construction, so that the operators can
+    skip any sorting, CSR conversion and validation, and never need to
+    synchronize to infer the number of nodes.
+    The class is TorchScript-compatible.
+
+    Args:
+        rowptr (LongTensor): Compressed source nodes of shape
+            :obj:`[num_nodes + 1]`.
+        col (LongTensor): Target nodes of shape :obj:`[num_edges]`.
+        weight (Tensor, optional): Edge weights of shape :obj:`[num_edges]`.
+            (default: :obj:`None`)
+        validate (bool, optional): If set to :obj:`False`, will skip input
+            validation. (default: :obj:`True`)
+
+    .. code-block:: python
+
+        import torch
+        from torch_cluster import CSRGraph, random_walk
+
+        row = torch.tensor([0, 1, 1, 1, 2, 2, 3, 3, 4, 4])
+        col = torch.tensor([1, 0, 2, 3, 1, 4, 1, 4, 2, 3])
+        graph = CSRGraph.from_edge_index(row, col)
+        walk = random_walk(graph, None, torch.tensor([0, 1]), walk_length=3)
+    """
+    def __init__(
+        self,
+        rowptr: Tensor,
+        col: Tensor,
+        weight: Optional[Tensor] = None,
+        validate: bool = True,
+    ):
+        if validate:
+            if rowptr.dim() != 1 or rowptr.numel() == 0:
+                raise ValueError("'rowptr' needs to be a non-empty vector")
+            if col.dim() != 1:
+                raise ValueError("'col' needs to be a vector")
+            if rowptr.dtype != torch.long or col.dtype != torch.long:
+                raise ValueError("'rowptr' and 'col' need to be of type long")
+            if rowptr.device != col.device:
+                raise ValueError("'rowptr' and 'col' need to be on the same "
+                                 "device")
+            if int(rowptr[0]) != 0 or int(rowptr[-1]) != col.numel():
+                raise ValueError("'rowptr' does not describe 'col'")
+            if bool((rowptr[1:] < rowptr[:-1]).any()):
+                raise ValueError("'rowptr' is not sorted")
+            if col.numel() > 0 and (int(col.min()) < 0
+                                    or int(col.max()) >= rowptr.numel() - 1):
+                raise ValueError("'col' contains invalid node indices")
+            if weight is not None:
+                if weight.dim() != 1 or weight.numel() != col.numel():
+                    raise ValueError("'weight' needs to be a vector holding "
+                                     "a value for each edge")
+                if weight.device != col.device:
+                    raise ValueError("'weight' needs to be on the same "
+                                     "device as 'col'")
+
+        self.rowptr = rowptr.contiguous()
+        self.col = col.contiguous()
+        self.weight = None if weight is None else weight.contiguous()
+        self.num_nodes = rowptr.numel() - 1
+        self.num_edges = col.numel()
+        self._alias = torch.jit.annotate(Optional[Tuple[Tensor, Tensor]], None)
+
+    @staticmethod
+    def from_edge_index(
+        row: Tensor,
+        col: Tensor,
+        weight: Optional[Tensor] = None,
+        num_nodes: Optional[int] = None,
+        coalesced: bool = True,
+    ) -> 'CSRGraph':
+        r"""Creates a :class:`CSRGraph` from a graph given by
+        :obj:`(row, col)`.
+
+        Args:
+            row (LongTensor): Source nodes.
+            col (LongTensor): Target nodes.
+            weight (Tensor, optional): Edge weights. (default: :obj:`None`)
+            num_nodes (int, optional): The number of nodes.
+                (default: :obj:`None`)
+            coalesced (bool, optional): If set to :obj:`True`, will
+                coalesce/sort the graph given by :obj:`(row, col)` according
+                to :obj:`row`. (default: :obj:`True`)
+        """
+        if num_nodes is None:
+            num_nodes = max(int(row.max()), int(col.max())) + 1
+
+        if coalesced:
+            perm = torch.argsort(row * num_nodes + col)
+            row, col = row[perm], col[perm]
+            if weight is not None:
+                weight = weight[perm]
+
+        deg = row.new_zeros(num_nodes)
+        deg.scatter_add_(0, row, torch.ones_like(row))
+        rowptr = row.new_zeros(num_nodes + 1)
+        torch.cumsum(deg, 0, out=rowptr[1:])
+
+        return CSRGraph(rowptr, col, weight, validate=False)
+
+    def alias_table(self) -> Tuple[Tensor, Tensor]:
+        r"""Returns the per-node alias tables for weighted sampling, which
+        are computed on first access and cached afterwards."""
+        alias = self._alias
+        if alias is None:
+            weight = self.weight
+            assert weight is not None
+            alias = torch.ops.torch_cluster.alias_table(self.rowptr, weight)
+            self._alias = alias
+        return alias
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return (f'CSRGraph(num_nodes={self.num_nodes}, '
+                f'num_edges={self.num_edges}, '
+                f'weighted={self.weight is not None})')
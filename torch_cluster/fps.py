@@ -1,9 +1,10 @@
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 import torch
 from torch import Tensor
 
 import torch_cluster.typing
+from torch_cluster.utils import batch_to_ptr, to_ptr
 
 
 @torch.jit._overload  # noqa
@@ -93,15 +94,86 @@ def fps(  # noqa
 
     if batch is not None:
         assert src.size(0) == batch.numel()
-        if batch_size is None:
-            batch_size = int(batch.max()) + 1
+        ptr_vec = batch_to_ptr(batch, batch_size)
+    else:
+        ptr_vec = torch.tensor([0, src.size(0)], device=src.device)
+
+    return torch.ops.torch_cluster.fps(src, ptr_vec, r, random_start)
+
 
-        deg = src.new_zeros(batch_size, dtype=torch.long)
-        deg.scatter_add_(0, batch, torch.ones_like(batch))
+def fps_group(
+    src: Tensor,
+    ratio: List[float],
+    k: List[int],
+    r: Optional[List[float]] = None,
+    batch: Optional[Tensor] = None,
+    random_start: bool = True,
+    batch_size: Optional[int] = None,
+    ptr: Optional[Union[Tensor, List[int]]] = None,
+) -> List[Tuple[Tensor, Tensor, Tensor]]:
+    r"""The fused sampling and grouping step of the set abstraction levels in
+    the `"PointNet++: Deep Hierarchical Feature Learning on Point Sets in a
+    Metric Space" <https://arxiv.org/abs/1706.02413>`_ paper.
+    For each level, samples centroids via :meth:`fps` and groups their
+    :obj:`k` nearest neighbors (or up to :obj:`k` nearest neighbors within
+    distance :obj:`r`) against a single KD-tree per example.
+    The centroids of one level form the points of the next level, so that a
+    whole hierarchy is computed in a single call.
 
-        ptr_vec = deg.new_zeros(batch_size + 1)
-        torch.cumsum(deg, 0, out=ptr_vec[1:])
+    Args:
+        src (Tensor): Point feature matrix
+            :math:`\mathbf{X} \in \mathbb{R}^{N \times F}`.
+        ratio ([float]): Sampling ratios of each level.
+        k ([int]): Number of neighbors of each level.
+        r ([float], optional): Radii of each level. Levels with a
+            non-positive radius (or all levels in case :obj:`r` is
+            :obj:`None`) group via :math:`k`-nearest neighbors instead of
+            ball queries. (default: :obj:`None`)
+        batch (LongTensor, optional): Batch vector
+            :math:`\mathbf{b} \in {\{ 0, \ldots, B-1\}}^N`, which assigns each
+            node to a specific example. (default: :obj:`None`)
+        random_start (bool, optional): If set to :obj:`False`, use the first
+            node of each example as starting node. (default: obj:`True`)
+        batch_size (int, optional): The number of examples :math:`B`.
+            Automatically calculated if not given. (default: :obj:`None`)
+        ptr (torch.Tensor or [int], optional): If given, batch assignment will
+            be determined based on boundaries in CSR representation, *e.g.*,
+            :obj:`batch=[0,0,1,1,1,2]` translates to :obj:`ptr=[0,2,5,6]`.
+            (default: :obj:`None`)
+
+    Returns a list holding a tuple :obj:`(index, neighbor, ptr)` for each
+    level: :obj:`index` of shape :obj:`[S]` and :obj:`neighbor` of shape
+    :obj:`[S, k]` refer to the points of the previous level (*i.e.*, the
+    centroids of the previous level or :obj:`src` for the first one), and
+    :obj:`ptr` holds the example boundaries of the :obj:`S` centroids.
+    Neighbors are sorted by distance, and missing ones are set to :obj:`-1`.
+
+    :rtype: [(:class:`LongTensor`, :class:`LongTensor`, :class:`LongTensor`)]
+
+    .. code-block:: python
+
+        import torch
+        from torch_cluster import fps_group
+
+        pos = torch.randn(1024, 3)
+        batch = torch.zeros(1024, dtype=torch.long)
+        out = fps_group(pos, ratio=[0.5, 0.25], k=[32, 32], r=[0.2, 0.4],
+                        batch=batch)
+        (index1, neighbor1, ptr1), (index2, neighbor2, ptr2) = out
+    """
+    if ptr is not None:
+        ptr_vec = to_ptr(ptr, src.device)
+    elif batch is not None:
+        assert src.size(0) == batch.numel()
+        ptr_vec = batch_to_ptr(batch, batch_size)
     else:
         ptr_vec = torch.tensor([0, src.size(0)], device=src.device)
 
-    return torch.ops.torch_cluster.fps(src, ptr_vec, r, random_start)
+    radius: List[float] = []
+    if r is not None:
+        radius = r
+
+    index, neighbor, out_ptr = torch.ops.torch_cluster.fps_group(
+        src, ptr_vec, ratio, radius, k, random_start)
+
+    return [(index[i], neighbor[i], out_ptr[i]) for i in range(len(index))]
@@ -1,22 +1,41 @@
-from typing import Optional
+from typing import List, Optional, Tuple, Union
 
 import torch
 
+from torch_cluster.csr import CSRGraph
+
 
 def graclus_cluster(
-    row: torch.Tensor,
-    col: torch.Tensor,
+    row: Union[torch.Tensor, CSRGraph],
+    col: Optional[torch.Tensor] = None,
     weight: Optional[torch.Tensor] = None,
     num_nodes: Optional[int] = None,
+    parallel: bool = False,
 ) -> torch.Tensor:
     """A greedy clustering algorithm of picking an unmarked vertex and matching
     it with one its unmarked neighbors (that maximizes its edge weight).
 
     Args:
-        row (LongTensor): Source nodes.
-        col (LongTensor): Target nodes.
+        row (LongTensor or CSRGraph): Source nodes, or a
+            :class:`torch_cluster.CSRGraph` holding the graph (and its
+            optional edge weights) in CSR format, in which case all
+            preprocessing is skipped. Use
+            :obj:`CSRGraph(rowptr, col, weight, validate=False)` to pass
+            existing CSR tensors without any copies. Neighbor order gets
+            randomized inside the kernel, so CSR inputs do not need to be
+            shuffled.
+        col (LongTensor, optional): Target nodes. Needs to be :obj:`None` in
+            case :obj:`row` is a :class:`torch_cluster.CSRGraph`.
+            (default: :obj:`None`)
         weight (Tensor, optional): Edge weights. (default: :obj:`None`)
         num_nodes (int, optional): The number of nodes. (default: :obj:`None`)
+        parallel (bool, optional): If set to :obj:`True`, will compute the
+            matching via multi-threaded handshaking rounds on the CPU instead
+            of a sequential greedy pass: In every round, each unmatched node
+            proposes to its heaviest unmatched neighbor, and mutual proposals
+            get matched. This yields a maximal matching of the same
+            approximation quality as the greedy algorithm. On the GPU, the
+            matching is always computed in parallel. (default: :obj:`False`)
 
     :rtype: :class:`LongTensor`
 
@@ -31,6 +50,39 @@ def graclus_cluster(
         cluster = graclus_cluster(row, col, weight)
     """
 
+    if isinstance(row, CSRGraph):
+        assert col is None and weight is None
+        rowptr, col, weight = row.rowptr, row.col, row.weight
+    else:
+        assert col is not None
+        rowptr, col, weight = to_csr(row, col, weight, num_nodes)
+
+    if parallel:
+        return torch.ops.torch_cluster.graclus_parallel(rowptr, col, weight)
+
+    return torch.ops.torch_cluster.graclus(rowptr, col, weight)
+
+
+def matching_ratio(cluster: torch.Tensor) -> float:
+    r"""Returns the fraction of nodes that got matched with a neighbor in a
+    clustering computed by :meth:`graclus_cluster`.
+
+    Args:
+        cluster (LongTensor): The cluster assignment.
+
+    :rtype: :obj:`float`
+    """
+    arange = torch.arange(cluster.numel(), device=cluster.device)
+    num_matched = int((cluster != arange).sum())
+    return 2 * num_matched / max(cluster.numel(), 1)
+
+
+def to_csr(
+    row: torch.Tensor,
+    col: torch.Tensor,
+    weight: Optional[torch.Tensor],
+    num_nodes: Optional[int],
+) -> Tuple[torch.Tensor, torch.Tensor, Optional[torch.Tensor]]:
     if num_nodes is None:
         num_nodes = max(int(row.max()), int(col.max())) + 1
 
@@ -41,11 +93,6 @@ def graclus_cluster(
     if weight is not None:
         weight = weight[mask]
 
-    # Randomly shuffle nodes.
-    if weight is None:
-        perm = torch.randperm(row.size(0), dtype=torch.long, device=row.device)
-        row, col = row[perm], col[perm]
-
     # To CSR.
     perm = torch.argsort(row)
     row, col = row[perm], col[perm]
@@ -58,4 +105,54 @@ def graclus_cluster(
     rowptr = row.new_zeros(num_nodes + 1)
     torch.cumsum(deg, 0, out=rowptr[1:])
 
-    return torch.ops.torch_cluster.graclus(rowptr, col, weight)
+    return rowptr, col, weight
+
+
+def graclus_coarsen(
+    graph: CSRGraph,
+    num_levels: int,
+    parallel: bool = False,
+) -> List[Tuple[torch.Tensor, torch.Tensor, CSRGraph]]:
+    r"""Computes :obj:`num_levels` levels of graclus matching (see
+    :meth:`graclus_cluster`) and graph coarsening in a single call, as used
+    for hierarchical pooling in the `"Convolutional Neural Networks on Graphs
+    with Fast Localized Spectral Filtering"
+    <https://arxiv.org/abs/1606.09375>`_ paper.
+    Coarsened graphs drop edges within clusters and sum up the weights of
+    parallel edges. Coarsened graphs of unweighted inputs are weighted by
+    the number of merged edges.
+
+    Args:
+        graph (CSRGraph): The graph (without self-loops).
+        num_levels (int): The number of coarsening levels.
+        parallel (bool, optional): If set to :obj:`True`, will use the
+            parallel matching algorithm (see :meth:`graclus_cluster`).
+            (default: :obj:`False`)
+
+    :rtype: [(:class:`LongTensor`, :class:`LongTensor`,
+        :class:`torch_cluster.CSRGraph`)]
+
+    Returns a tuple :obj:`(cluster, perm, coarse_graph)` for each level:
+    :obj:`cluster` maps the nodes of the level to consecutive node indices of
+    :obj:`coarse_graph`, and :obj:`perm` sorts the nodes of the level by
+    :obj:`cluster`, such that pooling reduces over (at most two) consecutive
+    entries of :obj:`x[perm]`.
+
+    .. code-block:: python
+
+        import torch
+        from torch_cluster import CSRGraph, graclus_coarsen
+
+        row = torch.tensor([0, 1, 1, 2, 2, 3])
+        col = torch.tensor([1, 0, 2, 1, 3, 2])
+        graph = CSRGraph.from_edge_index(row, col)
+        levels = graclus_coarsen(graph, num_levels=2)
+    """
+    out = torch.ops.torch_cluster.graclus_coarsen(graph.rowptr, graph.col,
+                                                  graph.weight, num_levels,
+                                                  parallel)
+    clusters, perms, rowptrs, cols, weights = out
+
+    return [(clusters[i], perms[i],
+             CSRGraph(rowptrs[i], cols[i], weights[i], validate=False))
+            for i in range(num_levels)]
@@ -1,15 +1,19 @@
-from typing import Optional
+from typing import List, Optional, Tuple, Union
 
 import torch
 
+from torch_cluster.utils import to_ptr
+
 
 def grid_cluster(
     pos: torch.Tensor,
     size: torch.Tensor,
     start: Optional[torch.Tensor] = None,
     end: Optional[torch.Tensor] = None,
+    batch: Optional[torch.Tensor] = None,
+    ptr: Optional[Union[torch.Tensor, List[int]]] = None,
 ) -> torch.Tensor:
-    """A clustering algorithm, which overlays a regular grid of user-defined
+    r"""A clustering algorithm, which overlays a regular grid of user-defined
     size over a point cloud and clusters all points within a voxel.
 
     Args:
@@ -19,6 +23,17 @@ def grid_cluster(
             dimension). (default: :obj:`None`)
         end (Tensor, optional): End position of the grid (in each
             dimension). (default: :obj:`None`)
+        batch (LongTensor, optional): Batch vector
+            :math:`\mathbf{b} \in {\{ 0, \ldots, B-1\}}^N`, which assigns each
+            point to a specific example. If given, each example gets its own
+            grid, whose start and end positions default to the minimum and
+            maximum position of points within the example, and clusters are
+            unique across examples. (default: :obj:`None`)
+        ptr (LongTensor or [int], optional): If given, batch assignment will
+            be determined based on boundaries in CSR representation, *e.g.*,
+            :obj:`batch=[0,0,1,1,1,2]` translates to :obj:`ptr=[0,2,5,6]`,
+            in which case no device synchronization is required.
+            (default: :obj:`None`)
 
     :rtype: :class:`LongTensor`
 
@@ -31,4 +46,100 @@ def grid_cluster(
         size = torch.Tensor([5, 5])
         cluster = grid_cluster(pos, size)
     """
-    return torch.ops.torch_cluster.grid(pos, size, start, end)
+    batch_size: Optional[int] = None
+    if ptr is not None:
+        ptr_vec = to_ptr(ptr, pos.device)
+        batch_size = ptr_vec.numel() - 1
+        arange = torch.arange(batch_size, device=pos.device)
+        batch = arange.repeat_interleave(ptr_vec[1:] - ptr_vec[:-1],
+                                         output_size=pos.size(0))
+
+    return torch.ops.torch_cluster.grid(pos, size, start, end, batch,
+                                        batch_size)
+
+
+def grid_pool(
+    pos: torch.Tensor,
+    size: torch.Tensor,
+    x: Optional[torch.Tensor] = None,
+    batch: Optional[torch.Tensor] = None,
+    start: Optional[torch.Tensor] = None,
+    reduce: str = 'mean',
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, Optional[torch.Tensor],
+           Optional[torch.Tensor]]:
+    """Voxel grid pooling, which clusters all points within a voxel (see
+    :meth:`grid_cluster`) and pools their positions and features in a single
+    native pass.
+    In contrast to :meth:`grid_cluster`, voxels are identified by hashing
+    their integer coordinates (see :meth:`sparse_grid_cluster`), so that the
+    returned clusters are already consecutive (in order of their first
+    occurrence) and no additional sorting via :meth:`torch.unique` is
+    required.
+
+    Args:
+        pos (Tensor): D-dimensional position of points.
+        size (Tensor): Size of a voxel in each dimension.
+        x (Tensor, optional): Point features. (default: :obj:`None`)
+        batch (LongTensor, optional): Batch vector, which assigns each point
+            to a specific example. Points of different examples never share
+            a voxel. (default: :obj:`None`)
+        start (Tensor, optional): Start position of the grid (in each
+            dimension). Defaults to the minimum position of points within
+            each example. (default: :obj:`None`)
+        reduce (str, optional): The reduction to pool positions and features
+            within a voxel (:obj:`"mean"` or :obj:`"max"`).
+            (default: :obj:`"mean"`)
+
+    :rtype: (:class:`LongTensor`, :class:`LongTensor`, :class:`Tensor`,
+        :class:`Tensor`, :class:`LongTensor`) holding the consecutive cluster
+        of each point, the number of points in each voxel, the pooled
+        positions and features, and the batch vector of voxels. The latter
+        two are :obj:`None` in case :obj:`x` or :obj:`batch` are not given.
+
+    .. code-block:: python
+
+        import torch
+        from torch_cluster import grid_pool
+
+        pos = torch.Tensor([[0, 0], [11, 9], [2, 8], [2, 2], [8, 3]])
+        size = torch.Tensor([5, 5])
+        cluster, count, pos, _, _ = grid_pool(pos, size)
+    """
+    cluster, count, out_pos, out_x, out_batch = torch.ops.torch_cluster.\
+        grid_pool(pos, size, start, batch, x, reduce)
+    return (cluster, count, out_pos, out_x if x is not None else None,
+            out_batch if batch is not None else None)
+
+
+def sparse_grid_cluster(
+    pos: torch.Tensor,
+    size: torch.Tensor,
+    start: Optional[torch.Tensor] = None,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """A sparse variant of :meth:`grid_cluster` for point clouds with huge
+    extents, in which the total number of voxels of a dense grid may overflow
+    or lead to cluster indices that are far too sparse.
+    Instead of computing linear voxel indices, integer voxel coordinates are
+    hashed into a compact table, so that memory only grows with the number
+    of points rather than with the extent of the grid.
+
+    Args:
+        pos (Tensor): D-dimensional position of points.
+        size (Tensor): Size of a voxel in each dimension.
+        start (Tensor, optional): Start position of the grid (in each
+            dimension). (default: :obj:`None`)
+
+    :rtype: (:class:`LongTensor`, :class:`LongTensor`) holding the
+        consecutive cluster of each point (in order of first occurrence) and
+        the integer coordinates of occupied voxels.
+
+    .. code-block:: python
+
+        import torch
+        from torch_cluster import sparse_grid_cluster
+
+        pos = torch.Tensor([[0, 0], [11, 9], [2, 8], [2, 2], [8, 3]])
+        size = torch.Tensor([5, 5])
+        cluster, voxel = sparse_grid_cluster(pos, size)
+    """
+    return torch.ops.torch_cluster.sparse_grid(pos, size, start)
@@ -0,0 +1,77 @@
+from typing import Dict
+
+import torch
+
+# Extension libraries that own counters. Each exposes its counters via the
+# `_{library}_stats` and `_{library}_enable_stats` operators, and counter
+# names are unique across libraries.
+LIBRARIES = [
+    'fps', 'graclus', 'grid', 'kdtree', 'knn', 'nearest', 'radius', 'rw',
+    'sampler'
+]
+
+
+def enable_stats(enabled: bool = True) -> bool:
+    r"""Enables (or disables) the counters of native CPU kernels, which can
+    be read via :meth:`torch_cluster.stats`. Counters are disabled by
+    default, in which case their overhead is a single atomic load per
+    kernel phase.
+
+    Args:
+        enabled (bool, optional): Whether to enable counters.
+            (default: :obj:`True`)
+
+    :rtype: :obj:`bool` (the previous state)
+    """
+    # Libraries may share a single set of counters (*e.g.*, when linked into
+    # one library), in which case only the first call sees the previous state.
+    previous = [
+        getattr(torch.ops.torch_cluster, f'_{library}_enable_stats')(enabled)
+        for library in LIBRARIES
+    ]
+    return previous[0]
+
+
+def stats(reset: bool = False) -> Dict[str, int]:
+    r"""Returns the counters of native CPU kernels, keyed by
+    :obj:`"{library}.{counter}"`.
+    Counters ending in :obj:`_ns` hold the time (in nanoseconds) spent in a
+    kernel phase (*e.g.*, :obj:`"knn.build_index_ns"`), summed over all
+    threads for phases that run in parallel. All other counters hold event
+    counts (*e.g.*, :obj:`"rw.num_rejections"` for rejected proposals of
+    node2vec walks).
+    Counters are only incremented while enabled via
+    :meth:`torch_cluster.enable_stats`.
+    Independently of counters, kernel phases are always reported as
+    sub-ranges of operators in :obj:`torch.profiler` traces (*e.g.*,
+    :obj:`"torch_cluster::knn::build_index"`).
+
+    Args:
+        reset (bool, optional): If set to :obj:`True`, will reset all
+            counters to zero after reading them. (default: :obj:`False`)
+
+    :rtype: :obj:`Dict[str, int]`
+
+    .. code-block:: python
+
+        import torch
+        import torch_cluster
+
+        x = torch.randn(100000, 3)
+        torch_cluster.enable_stats()
+        edge_index = torch_cluster.radius_graph(x, r=0.1)
+        print(torch_cluster.stats(reset=True))
+    """
+    out: Dict[str, int] = {}
+    for library in LIBRARIES:
+        fn = getattr(torch.ops.torch_cluster, f'_{library}_stats')
+        for key, value in fn(reset).items():
+            # Shared counters are reported by every library, but only the
+            # first call sees their values in case they get reset.
+            out[key] = out.get(key, 0) + value if reset else value
+    return dict(sorted(out.items()))
+
+
+def reset_stats():
+    r"""Resets all counters of native CPU kernels to zero."""
+    stats(reset=True)
@@ -0,0 +1,436 @@
+import inspect
+from typing import Any, Dict, List, Optional
+
+import torch
+from torch import Tensor
+
+# Memory-mapped loading requires PyTorch 2.1 or later:
+WITH_MMAP = 'mmap' in inspect.signature(torch.load).parameters
+
+
+class KDTree:
+    r"""A KD-tree over a fixed set of points, which can be queried via
+    :meth:`knn`, :meth:`radius` and :meth:`nearest` without being rebuilt.
+    The tree is stored in flat tensors (the permuted point indices, the node
+    array and the split values), so that it can be saved to a file via
+    :meth:`save` and memory-mapped via :meth:`load` in constant time.
+    Memory-mapped trees are read-only and shared across forked worker
+    processes.
+
+    Args:
+        pos (Tensor): Point feature matrix
+            :math:`\mathbf{X} \in \mathbb{R}^{N \times F}` on the CPU.
+        leaf_size (int, optional): The maximum number of points in a leaf.
+            (default: :obj:`10`)
+
+    .. code-block:: python
+
+        import torch
+        from torch_cluster import KDTree
+
+        tree = KDTree(torch.randn(1000000, 3))
+        tree.save('map.pt')
+
+        # In every worker:
+        tree = KDTree.load('map.pt')
+        edge_index = tree.knn(torch.randn(100, 3), k=8)
+    """
+    version: int = 1
+
+    def __init__(self, pos: Tensor, leaf_size: int = 10):
+        pos = pos.view(-1, 1) if pos.dim() == 1 else pos
+        self.pos = pos.contiguous()
+        self.leaf_size = leaf_size
+        self.perm, self.node, self.split, self.bbox = \
+            torch.ops.torch_cluster.kd_tree(self.pos, leaf_size)
+
+    def knn(self, y: Tensor, k: int) -> Tensor:
+        r"""Finds for each element in :obj:`y` the :obj:`k` nearest indexed
+        points (see :meth:`torch_cluster.knn`).
+
+        :rtype: :class:`LongTensor`
+        """
+        y = y.view(-1, 1) if y.dim() == 1 else y
+        return torch.ops.torch_cluster.kd_tree_knn(self.pos, self.perm,
+                                                   self.node, self.split,
+                                                   self.bbox, y, k)
+
+    def radius(self, y: Tensor, r: float,
+               max_num_neighbors: int = 32) -> Tensor:
+        r"""Finds for each element in :obj:`y` all indexed points within
+        distance :obj:`r` (see :meth:`torch_cluster.radius`).
+
+        :rtype: :class:`LongTensor`
+        """
+        y = y.view(-1, 1) if y.dim() == 1 else y
+        return torch.ops.torch_cluster.kd_tree_radius(self.pos, self.perm,
+                                                      self.node, self.split,
+                                                      self.bbox, y, r,
+                                                      max_num_neighbors)
+
+    def nearest(self, y: Tensor) -> Tensor:
+        r"""Finds for each element in :obj:`y` its nearest indexed point (see
+        :meth:`torch_cluster.nearest`).
+
+        :rtype: :class:`LongTensor`
+        """
+        return self.knn(y, 1)[1]
+
+    def save(self, path: str):
+        r"""Saves the tree together with its points to :obj:`path`."""
+        torch.save(
+            {
+                'version': self.version,
+                'dtype': str(self.pos.dtype),
+                'leaf_size': self.leaf_size,
+                'pos': self.pos,
+                'perm': self.perm,
+                'node': self.node,
+                'split': self.split,
+                'bbox': self.bbox,
+            }, path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True,
+             validate: bool = False) -> 'KDTree':
+        r"""Loads a tree saved via :meth:`save`. If :obj:`mmap` is set to
+        :obj:`True`, the file is memory-mapped instead of being read (which
+        requires PyTorch 2.1 or later, and is ignored otherwise).
+        Shapes and types of the stored tensors are always checked, while
+        indices are only bounds-checked if :obj:`validate` is set to
+        :obj:`True`, since doing so reads the whole file.
+        Raises a :class:`ValueError` in case the file holds an incompatible or
+        corrupted tree."""
+        kwargs = {'mmap': mmap} if WITH_MMAP else {}
+        data: Dict[str, Any] = torch.load(path, weights_only=True, **kwargs)
+
+        if data.get('version') != cls.version:
+            raise ValueError(f"'{path}' holds a KD-tree of version "
+                             f"{data.get('version')}, expected version "
+                             f"{cls.version}")
+        pos, perm, node = data['pos'], data['perm'], data['node']
+        if str(pos.dtype) != data['dtype'] or pos.dim() != 2:
+            raise ValueError(f"'{path}' holds points of type {pos.dtype} and "
+                             f"shape {tuple(pos.size())}, expected "
+                             f"{data['dtype']}")
+
+        # Expected types and shapes, as read by the search kernels:
+        if pos.dtype in [torch.half, torch.bfloat16]:
+            acc_dtype = torch.float
+        elif pos.dtype.is_floating_point:
+            acc_dtype = torch.double
+        else:
+            acc_dtype = torch.long
+        expected = {
+            'perm': (torch.long, (pos.size(0), )),
+            'node': (torch.long, (node.size(0), 3)),
+            'split': (acc_dtype, (node.size(0), 2)),
+            'bbox': (acc_dtype, (pos.size(1), 2)),
+        }
+        for key, (dtype, size) in expected.items():
+            if data[key].dtype != dtype or tuple(data[key].size()) != size:
+                raise ValueError(f"'{path}' holds '{key}' of type "
+                                 f"{data[key].dtype} and shape "
+                                 f"{tuple(data[key].size())}, expected type "
+                                 f"{dtype} and shape {size}")
+        if pos.size(0) > 0 and node.size(0) == 0:
+            raise ValueError(f"'{path}' holds no tree nodes")
+
+        if validate:
+            if perm.numel() > 0 and (perm.min() < 0
+                                     or perm.max() >= perm.numel()):
+                raise ValueError(f"'{path}' holds 'perm' with indices out of "
+                                 f"range [0, {perm.numel()})")
+            feat, child1, child2 = node.unbind(dim=1)
+            leaf = feat < 0
+            # Leaves hold point ranges `[left, right)` of `perm`, while inner
+            # nodes hold children that come after them in pre-order:
+            index = torch.arange(node.size(0))
+            leaf_valid = (child1 >= 0) & (child1 <= child2)
+            leaf_valid &= child2 <= perm.numel()
+            inner_valid = (feat < pos.size(1)) & (child1 > index)
+            inner_valid &= (child2 > index) & (child1 < node.size(0))
+            inner_valid &= child2 < node.size(0)
+            if not torch.where(leaf, leaf_valid, inner_valid).all():
+                raise ValueError(f"'{path}' holds 'node' with indices out of "
+                                 "range")
+
+        tree = cls.__new__(cls)
+        tree.pos, tree.leaf_size = data['pos'], data['leaf_size']
+        tree.perm, tree.node = data['perm'], data['node']
+        tree.split, tree.bbox = data['split'], data['bbox']
+        return tree
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return (f'KDTree(num_points={self.pos.size(0)}, '
+                f'dim={self.pos.size(1)}, num_nodes={self.node.size(0)})')
+
+
+class _ForestTree:
+    def __init__(self, uid: int, tree: KDTree, ids: Tensor):
+        self.uid = uid
+        self.tree = tree
+        self.ids = ids
+        self.num_deleted = 0
+
+
+class DynamicKDTree:
+    r"""A KD-tree that supports inserting and removing points, while
+    answering :meth:`knn`, :meth:`radius` and :meth:`nearest` queries against
+    the current set of points in the same output format as
+    :meth:`torch_cluster.knn` and :meth:`torch_cluster.radius`.
+    Points are held in a logarithmic forest of static :class:`KDTree`
+    instances: Every insertion adds a new tree, and trees are merged as long
+    as a tree is at least as large as its predecessor, leading to amortized
+    :math:`\mathcal{O}(\log N)` rebuilds per point.
+    Removals are lazy, and a tree is rebuilt once the ratio of its removed
+    points exceeds :obj:`compact_ratio`.
+
+    Points are identified by the indices returned from :meth:`insert`, which
+    count all inserted points and never change.
+
+    Args:
+        pos (Tensor, optional): Initial points
+            :math:`\mathbf{X} \in \mathbb{R}^{N \times F}` on the CPU.
+            (default: :obj:`None`)
+        leaf_size (int, optional): The maximum number of points in a leaf.
+            (default: :obj:`10`)
+        compact_ratio (float, optional): The ratio of removed points at which
+            a tree gets rebuilt. (default: :obj:`0.5`)
+
+    .. code-block:: python
+
+        import torch
+        from torch_cluster import DynamicKDTree
+
+        tree = DynamicKDTree()
+        index = tree.insert(torch.randn(1000, 3))
+        tree.remove(index[:100])
+        edge_index = tree.knn(torch.randn(10, 3), k=8)
+    """
+    def __init__(
+        self,
+        pos: Optional[Tensor] = None,
+        leaf_size: int = 10,
+        compact_ratio: float = 0.5,
+    ):
+        self.leaf_size = leaf_size
+        self.compact_ratio = compact_ratio
+        self.trees: List[_ForestTree] = []
+        self.pos: Optional[Tensor] = None
+        self.alive = torch.empty(0, dtype=torch.bool)
+        self.tree_of = torch.empty(0, dtype=torch.long)
+        self.num_inserted = 0
+        self.num_deleted = 0
+        self._next_uid = 0
+
+        if pos is not None:
+            self.insert(pos)
+
+    @property
+    def num_points(self) -> int:
+        r"""The number of points currently held."""
+        return self.num_inserted - self.num_deleted
+
+    def __len__(self) -> int:
+        return self.num_points
+
+    def _build(self, ids: Tensor) -> _ForestTree:
+        assert self.pos is not None
+        tree = KDTree(self.pos[ids], self.leaf_size)
+        entry = _ForestTree(self._next_uid, tree, ids)
+        self.tree_of[ids] = self._next_uid
+        self._next_uid += 1
+        return entry
+
+    def _alive_ids(self, entry: _ForestTree) -> Tensor:
+        if entry.num_deleted == 0:
+            return entry.ids
+        return entry.ids[self.alive[entry.ids]]
+
+    def insert(self, pos: Tensor) -> Tensor:
+        r"""Inserts the points :obj:`pos` and returns their indices.
+
+        :rtype: :class:`LongTensor`
+        """
+        pos = pos.view(-1, 1) if pos.dim() == 1 else pos
+        num_points = pos.size(0)
+        start = self.num_inserted
+
+        # Grow the storage geometrically to amortize copies.
+        if self.pos is None:
+            self.pos = pos.new_empty(max(num_points, 16), pos.size(1))
+        if start + num_points > self.pos.size(0):
+            capacity = max(start + num_points, 2 * self.pos.size(0))
+            buf = self.pos.new_empty(capacity, self.pos.size(1))
+            buf[:start] = self.pos[:start]
+            self.pos = buf
+        if start + num_points > self.alive.numel():
+            capacity = self.pos.size(0)
+            alive = self.alive.new_zeros(capacity)
+            alive[:start] = self.alive[:start]
+            tree_of = self.tree_of.new_full((capacity, ), -1)
+            tree_of[:start] = self.tree_of[:start]
+            self.alive, self.tree_of = alive, tree_of
+
+        self.pos[start:start + num_points] = pos
+        self.alive[start:start + num_points] = True
+        self.num_inserted += num_points
+
+        ids = torch.arange(start, start + num_points)
+        if num_points == 0:
+            return ids
+
+        # Merge trees of the forest as long as they do not shrink.
+        while len(self.trees) > 0:
+            last = self.trees[-1]
+            if last.ids.numel() - last.num_deleted > ids.numel():
+                break
+            ids = torch.cat([self._alive_ids(self.trees.pop()), ids])
+        self.trees.append(self._build(ids))
+
+        return torch.arange(start, start + num_points)
+
+    def remove(self, index: Tensor):
+        r"""Removes the points with indices :obj:`index`. Points that have
+        already been removed are ignored."""
+        index = index.view(-1)
+        index = index.unique()
+        index = index[self.alive[index]]
+        if index.numel() == 0:
+            return
+
+        self.alive[index] = False
+        self.num_deleted += index.numel()
+
+        uids, counts = self.tree_of[index].unique(return_counts=True)
+        num_deleted = dict(zip(uids.tolist(), counts.tolist()))
+        for i, entry in enumerate(self.trees):
+            if entry.uid not in num_deleted:
+                continue
+            entry.num_deleted += num_deleted[entry.uid]
+            if entry.num_deleted > self.compact_ratio * entry.ids.numel():
+                ids = self._alive_ids(entry)
+                self.trees[i] = self._build(ids)
+
+        self.trees = [entry for entry in self.trees if entry.ids.numel() > 0]
+
+    def compact(self):
+        r"""Rebuilds all points into a single tree."""
+        if len(self.trees) == 0:
+            return
+        ids = torch.cat([self._alive_ids(entry) for entry in self.trees])
+        self.trees = [self._build(ids)] if ids.numel() > 0 else []
+
+    def _tree_knn(self, entry: _ForestTree, y: Tensor, k: int):
+        # Returns the `k` nearest alive points of a single tree (padded with
+        # infinite distances). Since removed points are only filtered after
+        # the search, the number of searched neighbors is doubled for all
+        # queries that did not find enough alive points yet.
+        num_points = entry.ids.numel()
+        index = torch.full((y.size(0), k), -1, dtype=torch.long)
+        dist = torch.full((y.size(0), k), float('inf'))
+
+        todo = torch.arange(y.size(0))
+        num_neighbors = min(k, num_points)
+        while todo.numel() > 0:
+            query = y[todo]
+            _, col = entry.tree.knn(query, num_neighbors)
+            col = col.view(todo.numel(), num_neighbors)
+            d = (query.unsqueeze(1) - entry.tree.pos[col]).pow(2).sum(dim=-1)
+            d = d.to(torch.float)
+            col = entry.ids[col]
+            d.masked_fill_(~self.alive[col], float('inf'))
+
+            count = min(k, num_neighbors)
+            d, perm = d.topk(count, dim=1, largest=False)
+            col = col.gather(1, perm)
+            done = d.isfinite().sum(dim=1) == count
+            if num_neighbors == num_points:
+                done.fill_(True)
+
+            index[todo[done], :count] = col[done]
+            dist[todo[done], :count] = d[done]
+            todo = todo[~done]
+            num_neighbors = min(2 * num_neighbors, num_points)
+
+        return index, dist
+
+    def knn(self, y: Tensor, k: int) -> Tensor:
+        r"""Finds for each element in :obj:`y` the :obj:`k` nearest points
+        (see :meth:`torch_cluster.knn`).
+
+        :rtype: :class:`LongTensor`
+        """
+        y = y.view(-1, 1) if y.dim() == 1 else y
+        if len(self.trees) == 0:
+            return torch.empty(2, 0, dtype=torch.long)
+
+        # Merge the lists of all trees by distance.
+        out = [self._tree_knn(entry, y, k) for entry in self.trees]
+        index = torch.cat([o[0] for o in out], dim=1)
+        dist = torch.cat([o[1] for o in out], dim=1)
+        dist, perm = dist.topk(k, dim=1, largest=False)
+        index = index.gather(1, perm)
+
+        row = torch.arange(y.size(0)).view(-1, 1).expand_as(index)
+        mask = dist.isfinite()
+        return torch.stack([row[mask], index[mask]], dim=0)
+
+    def radius(self, y: Tensor, r: float,
+               max_num_neighbors: int = 32) -> Tensor:
+        r"""Finds for each element in :obj:`y` all points within distance
+        :obj:`r` (see :meth:`torch_cluster.radius`).
+
+        :rtype: :class:`LongTensor`
+        """
+        y = y.view(-1, 1) if y.dim() == 1 else y
+
+        rows: List[Tensor] = []
+        cols: List[Tensor] = []
+        for entry in self.trees:
+            # Search again with a larger limit for all queries that hit the
+            # limit before finding enough alive points.
+            todo = torch.arange(y.size(0))
+            limit = max_num_neighbors
+            while todo.numel() > 0:
+                row, col = entry.tree.radius(y[todo], r, limit)
+                col = entry.ids[col]
+                mask = self.alive[col]
+
+                deg = row.bincount(minlength=todo.numel())
+                alive = row[mask].bincount(minlength=todo.numel())
+                done = (deg < limit) | (alive >= max_num_neighbors)
+                if limit >= entry.ids.numel():
+                    done.fill_(True)
+
+                mask &= done[row]
+                rows.append(todo[row[mask]])
+                cols.append(col[mask])
+                todo = todo[~done]
+                limit *= 2
+
+        if len(rows) == 0:
+            return torch.empty(2, 0, dtype=torch.long)
+
+        row, col = torch.cat(rows), torch.cat(cols)
+        row, perm = row.sort(stable=True)
+        col = col[perm]
+
+        # Keep at most `max_num_neighbors` neighbors per query.
+        deg = row.bincount(minlength=y.size(0))
+        ptr = deg.cumsum(0) - deg
+        mask = torch.arange(row.numel()) - ptr[row] < max_num_neighbors
+        return torch.stack([row[mask], col[mask]], dim=0)
+
+    def nearest(self, y: Tensor) -> Tensor:
+        r"""Finds for each element in :obj:`y` its nearest point (see
+        :meth:`torch_cluster.nearest`).
+
+        :rtype: :class:`LongTensor`
+        """
+        return self.knn(y, 1)[1]
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return (f'DynamicKDTree(num_points={self.num_points}, '
+                f'num_trees={len(self.trees)})')
@@ -1,7 +1,9 @@
-from typing import Optional
+from typing import List, Optional, Union
 
 import torch
 
+from torch_cluster.utils import batch_to_ptr, to_ptr
+
 
 def knn(
     x: torch.Tensor,
@@ -12,6 +14,8 @@ def knn(
     cosine: bool = False,
     num_workers: int = 1,
     batch_size: Optional[int] = None,
+    ptr_x: Optional[Union[torch.Tensor, List[int]]] = None,
+    ptr_y: Optional[Union[torch.Tensor, List[int]]] = None,
 ) -> torch.Tensor:
     r"""Finds for each element in :obj:`y` the :obj:`k` nearest points in
     :obj:`x`.
@@ -38,6 +42,15 @@ def knn(
             :obj:`None`, or the input lies on the GPU. (default: :obj:`1`)
         batch_size (int, optional): The number of examples :math:`B`.
             Automatically calculated if not given. (default: :obj:`None`)
+        ptr_x (LongTensor or [int], optional): If given, batch assignment of
+            :obj:`x` will be determined based on boundaries in CSR
+            representation, *e.g.*, :obj:`batch_x=[0,0,1,1,1,2]` translates
+            to :obj:`ptr_x=[0,2,5,6]`. Needs to be given together with
+            :obj:`ptr_y`, in which case no device synchronization is
+            required. (default: :obj:`None`)
+        ptr_y (LongTensor or [int], optional): If given, batch assignment of
+            :obj:`y` will be determined based on boundaries in CSR
+            representation. (default: :obj:`None`)
 
     :rtype: :class:`LongTensor`
 
@@ -59,6 +72,12 @@ def knn(
     y = y.view(-1, 1) if y.dim() == 1 else y
     x, y = x.contiguous(), y.contiguous()
 
+    if ptr_x is not None or ptr_y is not None:
+        assert ptr_x is not None and ptr_y is not None
+        return torch.ops.torch_cluster.knn(x, y, to_ptr(ptr_x, x.device),
+                                           to_ptr(ptr_y, y.device), k, cosine,
+                                           num_workers)
+
     if batch_size is None:
         batch_size = 1
         if batch_x is not None:
@@ -69,16 +88,15 @@ def knn(
             batch_size = max(batch_size, int(batch_y.max()) + 1)
     assert batch_size > 0
 
-    ptr_x: Optional[torch.Tensor] = None
-    ptr_y: Optional[torch.Tensor] = None
+    ptr_x_vec: Optional[torch.Tensor] = None
+    ptr_y_vec: Optional[torch.Tensor] = None
     if batch_size > 1:
         assert batch_x is not None
         assert batch_y is not None
-        arange = torch.arange(batch_size + 1, device=x.device)
-        ptr_x = torch.bucketize(arange, batch_x)
-        ptr_y = torch.bucketize(arange, batch_y)
+        ptr_x_vec = batch_to_ptr(batch_x, batch_size)
+        ptr_y_vec = batch_to_ptr(batch_y, batch_size)
 
-    return torch.ops.torch_cluster.knn(x, y, ptr_x, ptr_y, k, cosine,
+    return torch.ops.torch_cluster.knn(x, y, ptr_x_vec, ptr_y_vec, k, cosine,
                                        num_workers)
 
 
@@ -91,6 +109,7 @@ def knn_graph(
     cosine: bool = False,
     num_workers: int = 1,
     batch_size: Optional[int] = None,
+    ptr: Optional[Union[torch.Tensor, List[int]]] = None,
 ) -> torch.Tensor:
     r"""Computes graph edges to the nearest :obj:`k` points.
 
@@ -115,6 +134,11 @@ def knn_graph(
             on the GPU. (default: :obj:`1`)
         batch_size (int, optional): The number of examples :math:`B`.
             Automatically calculated if not given. (default: :obj:`None`)
+        ptr (LongTensor or [int], optional): If given, batch assignment will
+            be determined based on boundaries in CSR representation, *e.g.*,
+            :obj:`batch=[0,0,1,1,1,2]` translates to :obj:`ptr=[0,2,5,6]`,
+            in which case no device synchronization is required.
+            (default: :obj:`None`)
 
     :rtype: :class:`LongTensor`
 
@@ -130,7 +154,7 @@ def knn_graph(
 
     assert flow in ['source_to_target', 'target_to_source']
     edge_index = knn(x, x, k if loop else k + 1, batch, batch, cosine,
-                     num_workers, batch_size)
+                     num_workers, batch_size, ptr, ptr)
 
     if flow == 'source_to_target':
         row, col = edge_index[1], edge_index[0]
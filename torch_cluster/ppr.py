@@ -0,0 +1,68 @@
+from typing import Optional, Tuple
+
+import torch
+from torch import Tensor
+
+from torch_cluster.csr import CSRGraph
+
+
+def ppr(
+    graph: CSRGraph,
+    start: Tensor,
+    alpha: float = 0.15,
+    num_walks: int = 1000,
+    topk: int = 32,
+) -> Tuple[Tensor, Tensor]:
+    r"""Approximates personalized PageRank (PPR) scores of all node indices in
+    :obj:`start` via Monte-Carlo random walks with restart, as used in the
+    `"Predict then Propagate: Graph Neural Networks meet Personalized
+    PageRank" <https://arxiv.org/abs/1810.05997>`_ and `"Scaling Graph Neural
+    Networks with Approximate PageRank" <https://arxiv.org/abs/2007.01570>`_
+    papers.
+    Each walk terminates with probability :obj:`alpha` after every step,
+    and visits are counted while walking, so that walks are never
+    materialized.
+    Walks that reach a node without outgoing edges continue at their start
+    node.
+    Only the :obj:`topk` highest scores of each start node are returned.
+    Edge weights of :obj:`graph` are respected.
+
+    Args:
+        graph (CSRGraph): The graph.
+        start (LongTensor): Nodes for which to compute PPR scores.
+        alpha (float, optional): The restart probability.
+            (default: :obj:`0.15`)
+        num_walks (int, optional): The number of walks per start node.
+            (default: :obj:`1000`)
+        topk (int, optional): The maximum number of nodes to return for each
+            start node. (default: :obj:`32`)
+
+    :rtype: (:class:`LongTensor`, :class:`Tensor`)
+
+    Returns the sparse PPR matrix in COO format, where
+    :obj:`edge_index[0]` refers to positions in :obj:`start`, and
+    :obj:`edge_index[1]` holds the corresponding node indices.
+
+    .. code-block:: python
+
+        import torch
+        from torch_cluster import CSRGraph, ppr
+
+        row = torch.tensor([0, 1, 1, 1, 2, 2, 3, 3, 4, 4])
+        col = torch.tensor([1, 0, 2, 3, 1, 4, 1, 4, 2, 3])
+        graph = CSRGraph.from_edge_index(row, col)
+        edge_index, score = ppr(graph, torch.tensor([0, 1]), topk=3)
+    """
+    prob: Optional[Tensor] = None
+    alias: Optional[Tensor] = None
+    if graph.weight is not None:
+        prob, alias = graph.alias_table()
+
+    index, score = torch.ops.torch_cluster.ppr(graph.rowptr, graph.col, prob,
+                                               alias, start, alpha, num_walks,
+                                               topk)
+
+    mask = index >= 0
+    row = torch.arange(index.size(0), device=index.device)
+    row = row.view(-1, 1).expand_as(index)[mask]
+    return torch.stack([row, index[mask]], dim=0), score[mask]
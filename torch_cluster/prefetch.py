@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator
+
+import torch
+
+
+def pin(data: Any) -> Any:
+    if isinstance(data, torch.Tensor):
+        return data.pin_memory()
+    if isinstance(data, tuple):
+        return tuple(pin(x) for x in data)
+    if isinstance(data, list):
+        return [pin(x) for x in data]
+    if isinstance(data, dict):
+        return {key: pin(value) for key, value in data.items()}
+    return data
+
+
+class PrefetchLoader:
+    r"""Runs a sampling function (*e.g.*, :meth:`neighbor_sampler`,
+    :meth:`multi_hop_sampler` or :meth:`random_walk`) on the next
+    :obj:`depth` mini-batches in the background, so that sampling overlaps
+    with training.
+    Sampling happens in a pool of :obj:`num_workers` threads.
+    Since all sampling operators release the GIL while running natively,
+    workers run in parallel to each other and to the training thread.
+    Results are delivered in order through a bounded queue.
+
+    Args:
+        sample_fn (callable): The function to call on every input.
+        inputs (iterable): The inputs of mini-batches, *e.g.*, chunks of seed
+            nodes.
+        depth (int, optional): The maximum number of mini-batches to sample
+            ahead. (default: :obj:`2`)
+        num_workers (int, optional): The number of sampling threads.
+            (default: :obj:`1`)
+        pin_memory (bool, optional): If set to :obj:`True`, will copy all
+            returned tensors into pinned memory within the worker threads.
+            (default: :obj:`False`)
+
+    .. code-block:: python
+
+        import torch
+        from torch_cluster import PrefetchLoader, multi_hop_sampler
+
+        loader = PrefetchLoader(
+            lambda seed: multi_hop_sampler(seed, graph, sizes=[10, 10]),
+            torch.randperm(graph.num_nodes).split(1024), depth=4)
+        for blocks in loader:
+            ...
+        print(loader.stats())
+    """
+    def __init__(
+        self,
+        sample_fn: Callable[[Any], Any],
+        inputs: Iterable[Any],
+        depth: int = 2,
+        num_workers: int = 1,
+        pin_memory: bool = False,
+    ):
+        assert depth >= 1 and num_workers >= 1
+        self.sample_fn = sample_fn
+        self.inputs = inputs
+        self.depth = depth
+        self.num_workers = num_workers
+        self.pin_memory = pin_memory
+
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.num_batches = 0
+        self.wait_time = 0.
+        self.compute_time = 0.
+
+    def _sample(self, inputs: Any) -> Any:
+        t = time.perf_counter()
+        out = self.sample_fn(inputs)
+        if self.pin_memory:
+            out = pin(out)
+        with self._lock:
+            self.compute_time += time.perf_counter() - t
+        return out
+
+    def __iter__(self) -> Iterator[Any]:
+        self._reset_stats()
+        inputs = iter(self.inputs)
+        queue: Deque[Future] = deque()
+
+        executor = ThreadPoolExecutor(self.num_workers)
+
+        def submit() -> bool:
+            try:
+                queue.append(executor.submit(self._sample, next(inputs)))
+                return True
+            except StopIteration:
+                return False
+
+        try:
+            while len(queue) < self.depth and submit():
+                pass
+
+            while len(queue) > 0:
+                future = queue.popleft()
+                t = time.perf_counter()
+                out = future.result()
+                self.wait_time += time.perf_counter() - t
+                self.num_batches += 1
+                submit()
+                yield out
+        finally:
+            for future in queue:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, float]:
+        r"""Returns the number of delivered mini-batches, the total time the
+        consumer waited for mini-batches to become ready, and the total time
+        spent for sampling in worker threads during the current (or last)
+        epoch."""
+        return {
+            'num_batches': self.num_batches,
+            'wait_time': self.wait_time,
+            'compute_time': self.compute_time,
+        }
+
+    def __repr__(self) -> str:
+        return (f'{self.__class__.__name__}(depth={self.depth}, '
+                f'num_workers={self.num_workers})')
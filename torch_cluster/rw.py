@@ -3,10 +3,44 @@ from typing import Optional, Tuple, Union
 import torch
 from torch import Tensor
 
+from torch_cluster.csr import CSRGraph
 
-def random_walk(
+
+def alias_table(
     row: Tensor,
     col: Tensor,
+    edge_weight: Tensor,
+    coalesced: bool = True,
+    num_nodes: Optional[int] = None,
+) -> Tuple[Tensor, Tensor]:
+    r"""Precomputes the per-node alias tables for weighted random walks, which
+    allow to sample a neighbor proportional to :obj:`edge_weight` in
+    :math:`\mathcal{O}(1)`.
+    The returned tables can be passed to :meth:`random_walk` via the
+    :obj:`alias` argument to re-use them across calls on the same graph.
+
+    Args:
+        row (LongTensor): Source nodes.
+        col (LongTensor): Target nodes.
+        edge_weight (Tensor): Non-negative edge weights.
+        coalesced (bool, optional): If set to :obj:`True`, will coalesce/sort
+            the graph given by :obj:`(row, col)` according to :obj:`row`.
+            Needs to match the value passed to :meth:`random_walk`.
+            (default: :obj:`True`)
+        num_nodes (int, optional): The number of nodes. (default: :obj:`None`)
+
+    :rtype: (:class:`Tensor`, :class:`LongTensor`)
+    """
+    assert row.numel() == edge_weight.numel()
+
+    graph = CSRGraph.from_edge_index(row, col, edge_weight, num_nodes,
+                                     coalesced)
+    return graph.alias_table()
+
+
+def random_walk(
+    row: Union[Tensor, CSRGraph],
+    col: Optional[Tensor],
     start: Tensor,
     walk_length: int,
     p: float = 1,
@@ -14,6 +48,8 @@ def random_walk(
     coalesced: bool = True,
     num_nodes: Optional[int] = None,
     return_edge_indices: bool = False,
+    edge_weight: Optional[Tensor] = None,
+    alias: Optional[Tuple[Tensor, Tensor]] = None,
 ) -> Union[Tensor, Tuple[Tensor, Tensor]]:
     """Samples random walks of length :obj:`walk_length` from all node indices
     in :obj:`start` in the graph given by :obj:`(row, col)` as described in the
@@ -23,8 +59,11 @@ def random_walk(
     :obj:`row` (use the :obj:`coalesced` attribute to force).
 
     Args:
-        row (LongTensor): Source nodes.
-        col (LongTensor): Target nodes.
+        row (LongTensor or CSRGraph): Source nodes, or a
+            :class:`torch_cluster.CSRGraph` holding the graph in CSR format
+            (in which case all preprocessing is skipped).
+        col (LongTensor, optional): Target nodes. Needs to be :obj:`None` in
+            case :obj:`row` is a :class:`torch_cluster.CSRGraph`.
         start (LongTensor): Nodes from where random walks start.
         walk_length (int): The walk length.
         p (float, optional): Likelihood of immediately revisiting a node in the
@@ -38,23 +77,40 @@ def random_walk(
         return_edge_indices (bool, optional): Whether to additionally return
             the indices of edges traversed during the random walk.
             (default: :obj:`False`)
+        edge_weight (Tensor, optional): Non-negative edge weights. If given,
+            transitions are sampled proportional to :obj:`edge_weight` (and
+            are further biased by :obj:`p` and :obj:`q`). Weights of a
+            :class:`torch_cluster.CSRGraph` are taken from its :obj:`weight`
+            attribute instead. (default: :obj:`None`)
+        alias ((Tensor, LongTensor), optional): Precomputed alias tables as
+            returned by :meth:`torch_cluster.alias_table`. If given,
+            :obj:`edge_weight` will be ignored. (default: :obj:`None`)
 
     :rtype: :class:`LongTensor`
     """
-    if num_nodes is None:
-        num_nodes = max(int(row.max()), int(col.max()), int(start.max())) + 1
-
-    if coalesced:
-        perm = torch.argsort(row * num_nodes + col)
-        row, col = row[perm], col[perm]
+    if isinstance(row, CSRGraph):
+        assert col is None and edge_weight is None
+        graph = row
+    else:
+        assert col is not None
+        if num_nodes is None:
+            num_nodes = max(int(row.max()), int(col.max()),
+                            int(start.max())) + 1
+        if alias is not None:
+            edge_weight = None
+        graph = CSRGraph.from_edge_index(row, col, edge_weight, num_nodes,
+                                         coalesced)
 
-    deg = row.new_zeros(num_nodes)
-    deg.scatter_add_(0, row, torch.ones_like(row))
-    rowptr = row.new_zeros(num_nodes + 1)
-    torch.cumsum(deg, 0, out=rowptr[1:])
+    if alias is None and graph.weight is not None:
+        alias = graph.alias_table()
 
-    node_seq, edge_seq = torch.ops.torch_cluster.random_walk(
-        rowptr, col, start, walk_length, p, q)
+    if alias is not None:
+        node_seq, edge_seq = torch.ops.torch_cluster.weighted_random_walk(
+            graph.rowptr, graph.col, alias[0], alias[1], start, walk_length,
+            p, q)
+    else:
+        node_seq, edge_seq = torch.ops.torch_cluster.random_walk(
+            graph.rowptr, graph.col, start, walk_length, p, q)
 
     if return_edge_indices:
         return node_seq, edge_seq
@@ -0,0 +1,84 @@
+from typing import Optional, Tuple
+
+import torch
+from torch import Tensor
+
+from torch_cluster.csr import CSRGraph
+
+
+def saint_subgraph(
+    graph: CSRGraph,
+    start: Tensor,
+    walk_length: int,
+) -> Tuple[Tensor, Tensor, Tensor]:
+    r"""Samples the subgraph induced by all nodes visited by random walks of
+    length :obj:`walk_length` from all node indices in :obj:`start`, as
+    described in the `"GraphSAINT: Graph Sampling Based Inductive Learning
+    Method" <https://arxiv.org/abs/1907.04931>`_ paper.
+    Edge weights of :obj:`graph` are respected.
+
+    Args:
+        graph (CSRGraph): The graph.
+        start (LongTensor): The root nodes of random walks.
+        walk_length (int): The walk length.
+
+    :rtype: (:class:`LongTensor`, :class:`LongTensor`, :class:`LongTensor`)
+
+    Returns the sorted node indices of the subgraph, its relabeled
+    :obj:`edge_index` and the indices of its edges in :obj:`graph`.
+
+    .. code-block:: python
+
+        import torch
+        from torch_cluster import CSRGraph, saint_subgraph
+
+        row = torch.tensor([0, 1, 1, 1, 2, 2, 3, 3, 4, 4])
+        col = torch.tensor([1, 0, 2, 3, 1, 4, 1, 4, 2, 3])
+        graph = CSRGraph.from_edge_index(row, col)
+        node, edge_index, edge_id = saint_subgraph(graph, torch.tensor([0]),
+                                                   walk_length=2)
+    """
+    prob: Optional[Tensor] = None
+    alias: Optional[Tensor] = None
+    if graph.weight is not None:
+        prob, alias = graph.alias_table()
+
+    return torch.ops.torch_cluster.saint_subgraph(graph.rowptr, graph.col,
+                                                  prob, alias, start,
+                                                  walk_length)
+
+
+def saint_norm(
+    graph: CSRGraph,
+    num_roots: int,
+    walk_length: int,
+    num_samples: int = 100,
+) -> Tuple[Tensor, Tensor]:
+    r"""Counts how often each node and edge is contained in
+    :obj:`num_samples` subgraphs sampled via :meth:`saint_subgraph` from
+    :obj:`num_roots` random root nodes each.
+    These counts are used to derive the loss and aggregation normalization
+    of the `"GraphSAINT: Graph Sampling Based Inductive Learning Method"
+    <https://arxiv.org/abs/1907.04931>`_ paper.
+
+    Args:
+        graph (CSRGraph): The graph.
+        num_roots (int): The number of root nodes per subgraph.
+        walk_length (int): The walk length.
+        num_samples (int, optional): The number of subgraphs to sample.
+            (default: :obj:`100`)
+
+    :rtype: (:class:`LongTensor`, :class:`LongTensor`)
+    """
+    device = graph.rowptr.device
+    node_count = torch.zeros(graph.num_nodes, dtype=torch.long, device=device)
+    edge_count = torch.zeros(graph.num_edges, dtype=torch.long, device=device)
+
+    for _ in range(num_samples):
+        start = torch.randint(0, graph.num_nodes, (num_roots, ),
+                              dtype=torch.long, device=device)
+        node, _, edge_id = saint_subgraph(graph, start, walk_length)
+        node_count[node] += 1
+        edge_count[edge_id] += 1
+
+    return node_count, edge_count
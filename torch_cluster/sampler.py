@@ -1,9 +1,46 @@
+from typing import List, Optional, Tuple, Union
+
 import torch
+from torch import Tensor
+
+from torch_cluster.csr import CSRGraph
+
 
+def neighbor_sampler(
+    start: torch.Tensor,
+    rowptr: Union[torch.Tensor, CSRGraph],
+    size: float,
+    edge_weight: Optional[Tensor] = None,
+    return_prob: bool = False,
+) -> Union[Tensor, Tuple[Tensor, Tensor]]:
+    r"""Samples up to :obj:`size` neighbors (or a fraction :obj:`size` of
+    neighbors in case :obj:`size <= 1`) without replacement for every node in
+    :obj:`start`, and returns the sampled edge indices.
 
-def neighbor_sampler(start: torch.Tensor, rowptr: torch.Tensor, size: float):
+    Args:
+        start (LongTensor): The nodes to sample neighbors for.
+        rowptr (LongTensor or CSRGraph): The compressed source nodes, or a
+            :class:`torch_cluster.CSRGraph`.
+        size (float): The number (or fraction) of neighbors to sample.
+        edge_weight (Tensor, optional): Non-negative edge weights. If given,
+            neighbors are sampled without replacement proportional to
+            :obj:`edge_weight`, and edges with zero weight are never sampled.
+            Defaults to the weights of :obj:`rowptr` in case it is a
+            :class:`torch_cluster.CSRGraph`. (default: :obj:`None`)
+        return_prob (bool, optional): If set to :obj:`True`, will additionally
+            return the inclusion probability of each sampled edge, which can
+            be used to debias (Horvitz-Thompson) estimators.
+            For weighted sampling, inclusion probabilities are conditioned on
+            the largest key that did not get sampled (rank conditioning).
+            (default: :obj:`False`)
+    """
     assert not start.is_cuda
 
+    if isinstance(rowptr, CSRGraph):
+        if edge_weight is None:
+            edge_weight = rowptr.weight
+        rowptr = rowptr.rowptr
+
     factor: float = -1.
     count: int = -1
     if size <= 1:
@@ -12,5 +49,84 @@ def neighbor_sampler(start: torch.Tensor, rowptr: torch.Tensor, size: float):
     else:
         count = int(size)
 
-    return torch.ops.torch_cluster.neighbor_sampler(start, rowptr, count,
-                                                    factor)
+    if edge_weight is not None:
+        e_id, prob = torch.ops.torch_cluster.weighted_neighbor_sampler(
+            start, rowptr, edge_weight, count, factor)
+    elif return_prob:
+        e_id, prob = torch.ops.torch_cluster.neighbor_sampler_prob(
+            start, rowptr, count, factor)
+    else:
+        return torch.ops.torch_cluster.neighbor_sampler(
+            start, rowptr, count, factor)
+
+    if return_prob:
+        return e_id, prob
+
+    return e_id
+
+
+def multi_hop_sampler(
+    seed: Tensor,
+    graph: CSRGraph,
+    sizes: List[int],
+    edge_weight: Optional[Tensor] = None,
+    return_prob: bool = False,
+) -> Union[List[Tuple[Tensor, Tensor, Tensor, Tensor]], Tuple[List[Tuple[
+        Tensor, Tensor, Tensor, Tensor]], List[Tensor]]]:
+    r"""Samples the multi-hop neighborhood of the (unique) nodes in
+    :obj:`seed` for mini-batch training of GNNs, as described in the
+    `"Inductive Representation Learning on Large Graphs"
+    <https://arxiv.org/abs/1706.02216>`_ paper.
+    In hop :obj:`l`, up to :obj:`sizes[l]` neighbors (or all neighbors for
+    :obj:`-1`) are sampled without replacement for every node discovered so
+    far.
+
+    Args:
+        seed (LongTensor): The seed nodes.
+        graph (CSRGraph): The graph.
+        sizes ([int]): The number of neighbors to sample per node in each hop.
+        edge_weight (Tensor, optional): Non-negative edge weights. If given,
+            neighbors are sampled without replacement proportional to
+            :obj:`edge_weight`, and edges with zero weight are never sampled.
+            Defaults to the weights of :obj:`graph`. (default: :obj:`None`)
+        return_prob (bool, optional): If set to :obj:`True`, will additionally
+            return the inclusion probability of each sampled edge for every
+            hop (see :meth:`neighbor_sampler`). (default: :obj:`False`)
+
+    :rtype: [(:class:`LongTensor`, :class:`LongTensor`, :class:`LongTensor`,
+        :class:`LongTensor`)]
+
+    Returns a block :obj:`(rowptr, col, e_id, node)` for each hop:
+    :obj:`rowptr` holds the compressed sampled edges of all target nodes of
+    the hop (which are the seed nodes or the :obj:`node` output of the
+    previous hop), :obj:`col` holds their relabeled source nodes, and
+    :obj:`e_id` holds their edge indices in :obj:`graph`.
+    :obj:`node` holds the global indices of all nodes discovered so far,
+    starting with the target nodes of the hop.
+
+    .. code-block:: python
+
+        import torch
+        from torch_cluster import CSRGraph, multi_hop_sampler
+
+        row = torch.tensor([0, 1, 1, 1, 2, 2, 3, 3, 4, 4])
+        col = torch.tensor([1, 0, 2, 3, 1, 4, 1, 4, 2, 3])
+        graph = CSRGraph.from_edge_index(row, col)
+        blocks = multi_hop_sampler(torch.tensor([0]), graph, sizes=[2, 2])
+    """
+    assert not seed.is_cuda
+
+    if edge_weight is None:
+        edge_weight = graph.weight
+
+    out = torch.ops.torch_cluster.multi_hop_sampler(graph.rowptr, graph.col,
+                                                    edge_weight, seed, sizes)
+    nodes, rowptrs, cols, e_ids, probs = out
+
+    blocks = [(rowptrs[i], cols[i], e_ids[i], nodes[i])
+              for i in range(len(sizes))]
+
+    if return_prob:
+        return blocks, probs
+
+    return blocks
@@ -0,0 +1,179 @@
+import json
+import os
+import os.path as osp
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import torch
+from torch import Tensor
+
+from torch_cluster.knn import knn
+
+_worker_state: Dict[str, Any] = {}
+
+
+def _open_index(path: str, num_nodes: int, k: int) -> Tensor:
+    # Memory-maps the `[num_nodes, k]` neighbor table, which is shared by all
+    # workers and persists on disk.
+    index = torch.from_file(osp.join(path, 'index.bin'), shared=True,
+                            size=num_nodes * k, dtype=torch.long)
+    return index.view(num_nodes, k)
+
+
+def _done_path(path: str, shard: int) -> str:
+    return osp.join(path, f'shard_{shard}.done')
+
+
+def _compute_shard(x: Tensor, bounds: List[int], k: int, loop: bool,
+                   path: str, shard: int):
+    start, end = bounds[shard], bounds[shard + 1]
+    y = x[start:end]
+    num_queries = end - start
+    num_neighbors = k if loop else k + 1
+
+    # Query all shards and keep their candidates together with distances.
+    cand_index: List[Tensor] = []
+    cand_dist: List[Tensor] = []
+    for i in range(len(bounds) - 1):
+        x_start, x_end = bounds[i], bounds[i + 1]
+        if x_start == x_end or num_queries == 0:
+            continue
+
+        _, col = knn(x[x_start:x_end], y, num_neighbors)
+        col = col.view(num_queries, -1) + x_start
+        dist = (y.unsqueeze(1) - x[col]).pow(2).sum(dim=-1).to(torch.float)
+        if not loop:
+            self_loop = torch.arange(start, end).view(-1, 1) == col
+            dist.masked_fill_(self_loop, float('inf'))
+        cand_index.append(col)
+        cand_dist.append(dist)
+
+    index = torch.full((num_queries, k), -1, dtype=torch.long)
+    dist = torch.full((num_queries, k), float('inf'))
+    if len(cand_index) > 0:
+        index = torch.cat(cand_index + [index], dim=1)
+        dist = torch.cat(cand_dist + [dist], dim=1)
+
+    # Merge the per-shard top-k lists exactly.
+    dist, perm = dist.topk(k, dim=1, largest=False)
+    index = index.gather(1, perm)
+    index.masked_fill_(dist.isinf(), -1)
+
+    _open_index(path, bounds[-1], k)[start:end] = index
+    open(_done_path(path, shard), 'w').close()
+
+
+def _init_worker(x: Tensor, bounds: List[int], k: int, loop: bool, path: str,
+                 num_threads: int):
+    torch.set_num_threads(num_threads)
+    _worker_state.update(x=x, bounds=bounds, k=k, loop=loop, path=path)
+
+
+def _run_shard(shard: int):
+    _compute_shard(shard=shard, **_worker_state)
+
+
+def sharded_knn_graph(
+    x: Tensor,
+    k: int,
+    num_shards: int,
+    loop: bool = False,
+    flow: str = 'source_to_target',
+    num_workers: int = 0,
+    checkpoint_dir: Optional[str] = None,
+) -> Tensor:
+    r"""Computes graph edges to the nearest :obj:`k` points (see
+    :meth:`torch_cluster.knn_graph`) for node feature matrices that are too
+    large to be handled in a single call.
+    :obj:`x` is partitioned into :obj:`num_shards` shards. For each shard, the
+    neighbors of its nodes are searched within every shard, and the per-shard
+    top-:obj:`k` lists are merged exactly.
+    Shards are processed in a pool of :obj:`num_workers` processes, which
+    share :obj:`x` via shared memory and write their results into a
+    memory-mapped neighbor table.
+    If :obj:`checkpoint_dir` is given, the neighbor table is kept in it, and
+    re-running an interrupted job only processes unfinished shards.
+
+    Args:
+        x (Tensor): Node feature matrix
+            :math:`\mathbf{X} \in \mathbb{R}^{N \times F}` on the CPU.
+        k (int): The number of neighbors.
+        num_shards (int): The number of shards.
+        loop (bool, optional): If :obj:`True`, the graph will contain
+            self-loops. (default: :obj:`False`)
+        flow (string, optional): The flow direction when used in combination
+            with message passing (:obj:`"source_to_target"` or
+            :obj:`"target_to_source"`). (default: :obj:`"source_to_target"`)
+        num_workers (int, optional): The number of worker processes. If set
+            to :obj:`0`, shards are processed in the main process.
+            (default: :obj:`0`)
+        checkpoint_dir (str, optional): The directory in which to keep
+            finished shards. A temporary directory is used if not given.
+            (default: :obj:`None`)
+
+    :rtype: :class:`LongTensor`
+
+    .. code-block:: python
+
+        import torch
+        from torch_cluster import sharded_knn_graph
+
+        x = torch.randn(1000000, 16)
+        edge_index = sharded_knn_graph(x, k=16, num_shards=32, num_workers=8,
+                                       checkpoint_dir='knn_checkpoint')
+    """
+    assert flow in ['source_to_target', 'target_to_source']
+    assert not x.is_cuda and k > 0 and num_shards > 0
+
+    x = x.view(-1, 1) if x.dim() == 1 else x
+    x = x.contiguous()
+    num_nodes = x.size(0)
+    bounds = [num_nodes * i // num_shards for i in range(num_shards + 1)]
+
+    tmp_dir: Optional[tempfile.TemporaryDirectory] = None
+    if checkpoint_dir is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        path = tmp_dir.name
+    else:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        path = checkpoint_dir
+
+    # Refuse to resume from checkpoints of a different job.
+    meta = dict(num_nodes=num_nodes, k=k, num_shards=num_shards, loop=loop)
+    meta_path = osp.join(path, 'meta.json')
+    if osp.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f) != meta:
+                raise ValueError(f"'{path}' holds checkpoints of a different "
+                                 "job")
+    else:
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+
+    index = _open_index(path, num_nodes, k)
+    todo = [
+        i for i in range(num_shards) if not osp.exists(_done_path(path, i))
+    ]
+
+    if num_workers > 0 and len(todo) > 0:
+        x.share_memory_()
+        num_threads = max(1, torch.get_num_threads() // num_workers)
+        ctx = torch.multiprocessing.get_context('spawn')
+        with ctx.Pool(num_workers, initializer=_init_worker,
+                      initargs=(x, bounds, k, loop, path,
+                                num_threads)) as pool:
+            for _ in pool.imap_unordered(_run_shard, todo):
+                pass
+    else:
+        for i in todo:
+            _compute_shard(x, bounds, k, loop, path, i)
+
+    center = torch.arange(num_nodes).view(-1, 1).expand(-1, k)
+    mask = index >= 0
+    row, col = index[mask], center[mask]
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+    if flow == 'source_to_target':
+        return torch.stack([row, col], dim=0)
+    return torch.stack([col, row], dim=0)
@@ -0,0 +1,163 @@
+from typing import Iterator, Optional, Tuple
+
+import torch
+from torch import Tensor
+
+from torch_cluster.csr import CSRGraph
+
+
+def negative_table(
+    graph: CSRGraph,
+    power: float = 0.75,
+) -> Tuple[Tensor, Tensor]:
+    r"""Precomputes the alias table to draw negative samples proportional to
+    :math:`\deg(v)^{0.75}`, as described in the `"Distributed Representations
+    of Words and Phrases and their Compositionality"
+    <https://arxiv.org/abs/1310.4546>`_ paper.
+
+    Args:
+        graph (CSRGraph): The graph.
+        power (float, optional): The exponent applied to node degrees.
+            (default: :obj:`0.75`)
+
+    :rtype: (:class:`Tensor`, :class:`LongTensor`)
+    """
+    deg = graph.rowptr[1:] - graph.rowptr[:-1]
+    ptr = torch.tensor([0, graph.num_nodes], device=graph.rowptr.device)
+    weight = deg.to(torch.float).pow(power)
+    return torch.ops.torch_cluster.alias_table(ptr, weight)
+
+
+def skipgram(
+    graph: CSRGraph,
+    start: Tensor,
+    walk_length: int,
+    window_size: int,
+    p: float = 1,
+    q: float = 1,
+    num_negatives: int = 0,
+    neg_table: Optional[Tuple[Tensor, Tensor]] = None,
+) -> Tuple[Tensor, Tensor]:
+    r"""Samples random walks of length :obj:`walk_length` from all node indices
+    in :obj:`start` (see :meth:`torch_cluster.random_walk`), and directly
+    returns the positive skip-gram pairs :obj:`(center, context)` of all nodes
+    within a distance of :obj:`window_size` in a walk, as used in the
+    `"DeepWalk: Online Learning of Social Representations"
+    <https://arxiv.org/abs/1403.6652>`_ and `"node2vec: Scalable Feature
+    Learning for Networks" <https://arxiv.org/abs/1607.00653>`_ papers.
+    Walks are never materialized.
+    Edge weights of :obj:`graph` are respected.
+
+    Args:
+        graph (CSRGraph): The graph.
+        start (LongTensor): Nodes from where random walks start.
+        walk_length (int): The walk length.
+        window_size (int): The context window size.
+        p (float, optional): Likelihood of immediately revisiting a node in the
+            walk. (default: :obj:`1`)
+        q (float, optional): Control parameter to interpolate between
+            breadth-first strategy and depth-first strategy (default: :obj:`1`)
+        num_negatives (int, optional): The number of negative pairs
+            :obj:`(center, negative)` to sample for each positive pair.
+            Negatives are drawn proportional to :math:`\deg(v)^{0.75}`.
+            (default: :obj:`0`)
+        neg_table ((Tensor, LongTensor), optional): The precomputed alias
+            table for negative sampling, as returned by
+            :meth:`torch_cluster.skipgram.negative_table`.
+            (default: :obj:`None`)
+
+    :rtype: (:class:`LongTensor`, :class:`LongTensor`)
+    """
+    alias: Optional[Tuple[Tensor, Tensor]] = None
+    if graph.weight is not None:
+        alias = graph.alias_table()
+
+    neg_prob: Optional[Tensor] = None
+    neg_alias: Optional[Tensor] = None
+    if num_negatives > 0:
+        if neg_table is None:
+            neg_table = negative_table(graph)
+        neg_prob, neg_alias = neg_table
+
+    prob: Optional[Tensor] = None
+    alias_index: Optional[Tensor] = None
+    if alias is not None:
+        prob, alias_index = alias
+
+    return torch.ops.torch_cluster.skipgram(graph.rowptr, graph.col, prob,
+                                            alias_index, start, walk_length,
+                                            p, q, window_size, num_negatives,
+                                            neg_prob, neg_alias)
+
+
+class SkipGramLoader:
+    r"""Streams positive and negative skip-gram pairs (see
+    :meth:`torch_cluster.skipgram`) in fixed-size batches, so that neither
+    walks nor pairs of the whole graph need to be held in memory at once.
+    Each batch is produced by :obj:`batch_size` walks.
+
+    Args:
+        graph (CSRGraph): The graph.
+        walk_length (int): The walk length.
+        window_size (int): The context window size.
+        p (float, optional): Likelihood of immediately revisiting a node in the
+            walk. (default: :obj:`1`)
+        q (float, optional): Control parameter to interpolate between
+            breadth-first strategy and depth-first strategy (default: :obj:`1`)
+        num_negatives (int, optional): The number of negative pairs to sample
+            for each positive pair. (default: :obj:`1`)
+        batch_size (int, optional): The number of walks per batch.
+            (default: :obj:`128`)
+        walks_per_node (int, optional): The number of walks to sample for each
+            node in an epoch. (default: :obj:`1`)
+        shuffle (bool, optional): If set to :obj:`True`, will shuffle start
+            nodes in every epoch. (default: :obj:`True`)
+
+    .. code-block:: python
+
+        loader = SkipGramLoader(graph, walk_length=20, window_size=5,
+                                num_negatives=1, batch_size=128)
+        for pos, neg in loader:
+            loss = model.loss(pos, neg)
+    """
+    def __init__(
+        self,
+        graph: CSRGraph,
+        walk_length: int,
+        window_size: int,
+        p: float = 1,
+        q: float = 1,
+        num_negatives: int = 1,
+        batch_size: int = 128,
+        walks_per_node: int = 1,
+        shuffle: bool = True,
+    ):
+        self.graph = graph
+        self.walk_length = walk_length
+        self.window_size = window_size
+        self.p = p
+        self.q = q
+        self.num_negatives = num_negatives
+        self.batch_size = batch_size
+        self.walks_per_node = walks_per_node
+        self.shuffle = shuffle
+
+        self.neg_table = None
+        if num_negatives > 0:
+            self.neg_table = negative_table(graph)
+
+    def __len__(self) -> int:
+        num_walks = self.graph.num_nodes * self.walks_per_node
+        return (num_walks + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self) -> Iterator[Tuple[Tensor, Tensor]]:
+        device = self.graph.rowptr.device
+        start = torch.arange(self.graph.num_nodes, device=device)
+        start = start.repeat(self.walks_per_node)
+        if self.shuffle:
+            start = start[torch.randperm(start.numel(), device=device)]
+
+        for batch in start.split(self.batch_size):
+            yield skipgram(self.graph, batch, self.walk_length,
+                           self.window_size, self.p, self.q,
+                           self.num_negatives, self.neg_table)
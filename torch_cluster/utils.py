@@ -0,0 +1,22 @@
+from typing import List, Optional, Union
+
+import torch
+from torch import Tensor
+
+
+def batch_to_ptr(batch: Tensor, batch_size: Optional[int] = None) -> Tensor:
+    r"""Converts a sorted batch vector into example boundaries in CSR
+    representation, *e.g.*, :obj:`batch=[0,0,1,1,1,2]` translates to
+    :obj:`ptr=[0,2,5,6]`.
+    Only synchronizes in case :obj:`batch_size` is not given."""
+    if batch_size is None:
+        batch_size = int(batch.max()) + 1 if batch.numel() > 0 else 1
+    arange = torch.arange(batch_size + 1, device=batch.device)
+    return torch.bucketize(arange, batch)
+
+
+def to_ptr(ptr: Union[Tensor, List[int]], device: torch.device) -> Tensor:
+    r"""Converts example boundaries given as a list into a tensor."""
+    if isinstance(ptr, list):
+        return torch.tensor(ptr, dtype=torch.long, device=device)
+    return ptr